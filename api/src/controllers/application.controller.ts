@@ -50,6 +50,7 @@ import { ApplicationCsvQueryParams } from '../dtos/applications/application-csv-
 import { MostRecentApplicationQueryParams } from '../dtos/applications/most-recent-application-query-params.dto';
 import { ExportLogInterceptor } from '../interceptors/export-log.interceptor';
 import { ApiKeyGuard } from '../guards/api-key.guard';
+import { getClientAddress } from '../guards/throttler.guard';
 import { PublicAppsViewQueryParams } from '../dtos/applications/public-apps-view-params.dto';
 import { PublicAppsViewResponse } from '../dtos/applications/public-apps-view-response.dto';
 
@@ -218,6 +219,7 @@ export class ApplicationController {
       dto,
       false,
       mapTo(User, req['user']),
+      getClientAddress(req),
     );
   }
 
@@ -241,7 +243,12 @@ export class ApplicationController {
     @Body() dto: ApplicationCreate,
   ): Promise<Application> {
     const user = mapTo(User, req['user']);
-    return await this.applicationService.create(dto, true, user);
+    return await this.applicationService.create(
+      dto,
+      true,
+      user,
+      getClientAddress(req),
+    );
   }
 
   @Post('verify')
@@ -40,6 +40,7 @@ import { HttpService } from '@nestjs/axios';
 import {
   getModelPrediction,
   mapDtoToModelInput,
+  modelCallerId,
 } from 'src/utilities/model.helper';
 
 export const view: Partial<
@@ -628,6 +629,7 @@ export class ApplicationService {
     dto: ApplicationCreate,
     forPublic: boolean,
     requestingUser: User,
+    clientAddress?: string,
   ): Promise<Application> {
     if (!forPublic) {
       await this.authorizeAction(
@@ -815,6 +817,7 @@ export class ApplicationService {
         const response = await getModelPrediction(
           this.httpService,
           features,
+          modelCallerId(requestingUser, clientAddress),
         );
 
         const { prediction, probability } = response;
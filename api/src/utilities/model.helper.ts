@@ -108,14 +108,35 @@ export interface ModelPrediction {
   probability: number;
 }
 
+// The model service rate-limits per X-Caller-Id, so name the end caller rather than this
+// API: the signed-in user, or else the applicant's client address
+export const modelCallerId = (
+  user?: { id?: string },
+  clientAddress?: string,
+): string | undefined => {
+  if (user?.id) {
+    return `user:${user.id}`;
+  }
+  return clientAddress ? `ip:${clientAddress}` : undefined;
+};
+
 export const getModelPrediction = async (
   httpService: HttpService,
   input: ModelInput,
+  callerId?: string,
 ): Promise<ModelPrediction> => {
   try {
     const flaskUrl = process.env.FLASK_URL || 'http://localhost:5000';
+    // The model service drops requests whose deadline passed while they were queued
+    const timeoutMs = Number(process.env.FLASK_TIMEOUT_MS) || 5000;
     const response = await firstValueFrom(
-      httpService.post(`${flaskUrl}/predict`, input),
+      httpService.post(`${flaskUrl}/predict`, input, {
+        timeout: timeoutMs,
+        headers: {
+          'X-Request-Deadline': String(Date.now() + timeoutMs),
+          ...(callerId && { 'X-Caller-Id': callerId }),
+        },
+      }),
     );
     return {
       prediction: response.data.label,
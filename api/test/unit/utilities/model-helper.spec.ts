@@ -0,0 +1,15 @@
+import { modelCallerId } from '../../../src/utilities/model.helper';
+describe('Testing model helpers', () => {
+  describe('Testing modelCallerId', () => {
+    it('should name the signed-in user', () => {
+      expect(modelCallerId({ id: 'abc' }, '10.0.0.1')).toBe('user:abc');
+    });
+    it('should fall back to the client address', () => {
+      expect(modelCallerId(undefined, '10.0.0.1')).toBe('ip:10.0.0.1');
+      expect(modelCallerId({}, '10.0.0.1')).toBe('ip:10.0.0.1');
+    });
+    it('should return undefined when neither is known', () => {
+      expect(modelCallerId(undefined, undefined)).toBeUndefined();
+    });
+  });
+});
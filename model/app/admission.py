@@ -0,0 +1,131 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+
+# Header carrying the caller's deadline, as Unix epoch milliseconds
+DEADLINE_HEADER = "X-Request-Deadline"
+# Header identifying the caller for rate limiting (falls back to the client address)
+CALLER_HEADER = "X-Caller-Id"
+
+
+class Rejected(Exception):
+    """
+    A request refused before any work was done.
+    status: HTTP status to answer with; reason: metric label and log reason;
+    retry_after: whole seconds for the Retry-After header (None to omit it)
+    """
+
+    def __init__(self, status, reason, message, retry_after=None):
+        super().__init__(message)
+        self.status = status
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def parse_deadline(value):
+    """Deadline header value -> time.time() seconds, or None if absent or malformed."""
+    if not value:
+        return None
+    try:
+        deadline = float(value) / 1000.0
+    except ValueError:
+        return None
+    return deadline if math.isfinite(deadline) else None
+
+
+def check_deadline(deadline, now=None):
+    """Raise Rejected (504) if the caller's deadline has already passed."""
+    if deadline is not None and deadline <= (time.time() if now is None else now):
+        raise Rejected(504, "expired", "Request deadline exceeded")
+
+
+class ConcurrencyLimiter:
+    """
+    Caps how many requests run at once and how many may wait for a slot.
+
+    A request arriving when max_queue requests are already waiting is refused at once; a
+    queued request gives up when queue_timeout elapses or its own deadline passes,
+    whichever comes first.
+    """
+
+    def __init__(self, max_concurrent, max_queue, queue_timeout, registry=None):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._cond = threading.Condition()
+        self._active = 0
+        self._waiting = 0
+        self._wait_ewma = None  # seconds queued requests took to get a slot
+        if registry is not None:
+            registry.gauge("risk_admission_active", "Requests holding an admission slot", fn=lambda: self._active)
+            registry.gauge("risk_admission_queued", "Requests waiting for an admission slot", fn=lambda: self._waiting)
+
+    def retry_after(self):
+        return max(1, math.ceil(self._wait_ewma or self.queue_timeout))
+
+    def acquire(self, deadline=None):
+        """Take a slot or raise Rejected: 503 if the queue is full or the wait times out, 504 if the deadline passes."""
+        with self._cond:
+            if self._active < self.max_concurrent:
+                self._active += 1
+                return
+            if self._waiting >= self.max_queue:
+                raise Rejected(503, "queue_full", "Server overloaded, retry later", self.retry_after())
+            start = time.monotonic()
+            give_up = start + self.queue_timeout
+            expires = None
+            if deadline is not None:
+                expires = start + (deadline - time.time())
+                give_up = min(give_up, expires)
+            self._waiting += 1
+            try:
+                while self._active >= self.max_concurrent:
+                    remaining = give_up - time.monotonic()
+                    if remaining <= 0:
+                        if expires is not None and expires <= give_up:
+                            raise Rejected(504, "expired", "Request deadline exceeded")
+                        raise Rejected(503, "queue_timeout", "Server overloaded, retry later", self.retry_after())
+                    self._cond.wait(remaining)
+            finally:
+                self._waiting -= 1
+            self._active += 1
+            waited = time.monotonic() - start
+            self._wait_ewma = waited if self._wait_ewma is None else 0.8 * self._wait_ewma + 0.2 * waited
+
+    def release(self):
+        with self._cond:
+            self._active -= 1
+            self._cond.notify()
+
+
+class RateLimiter:
+    """
+    Per-caller token buckets: each caller may make `burst` requests at once and `rate`
+    requests per second sustained. Buckets are kept for the max_callers most recently
+    seen callers; a forgotten caller starts again with a full bucket.
+    """
+
+    def __init__(self, rate, burst, max_callers=10_000, registry=None):
+        self.rate = rate
+        self.burst = burst
+        self.max_callers = max_callers
+        self._buckets = OrderedDict()  # caller -> (tokens, last refill time)
+        self._lock = threading.Lock()
+        if registry is not None:
+            registry.gauge("risk_rate_limit_callers", "Callers with a tracked token bucket", fn=lambda: len(self._buckets))
+
+    def check(self, caller, now=None):
+        """Spend one token for caller, or raise Rejected (429) with the seconds until one is available."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tokens, last = self._buckets.pop(caller, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[caller] = (tokens, now)
+            if len(self._buckets) > self.max_callers:
+                self._buckets.popitem(last=False)
+        if not allowed:
+            raise Rejected(429, "rate_limited", "Rate limit exceeded", max(1, math.ceil((1 - tokens) / self.rate)))
@@ -0,0 +1,10 @@
+import hashlib
+
+
+# Content hash identifying a model artifact
+def artifact_version(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:12]
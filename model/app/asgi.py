@@ -0,0 +1,37 @@
+import logging
+import os
+
+# ASGI entry point for the risk service, for running under uvicorn:
+#   uvicorn asgi:app --app-dir app --port 5000
+#
+# Serves the same Flask endpoints as main:app. The event loop handles connections and
+# request bodies; each request's Flask handler (validation, inference, serialization) runs
+# on a bounded thread pool. When every thread is busy and the queue is full, the request
+# is answered immediately with 503 and Retry-After instead of waiting.
+
+# Each inference thread runs the model single-threaded (as each gunicorn worker does);
+# set before main imports xgboost
+for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+    os.environ.setdefault(var, os.getenv("RISK_MODEL_THREADS", "1"))
+os.environ.setdefault("RISK_MODEL_THREADS", "1")
+
+import main  # loads the model and warms up (and puts ../common on sys.path)
+import metrics
+from asgi_support import BoundedExecutor, WsgiPoolApp
+
+logger = logging.getLogger(__name__)
+
+# Threads running Flask handlers; XGBoost releases the GIL while predicting
+INFERENCE_THREADS = int(os.getenv("RISK_INFERENCE_THREADS", 4))
+# Requests allowed to wait for a thread before new ones are refused with 503
+INFERENCE_QUEUE = int(os.getenv("RISK_INFERENCE_QUEUE", 64))
+
+pool = BoundedExecutor(
+    INFERENCE_THREADS,
+    INFERENCE_QUEUE,
+    name="risk-inference",
+    registry=metrics.REGISTRY,
+    metric_prefix="risk_inference",
+)
+app = WsgiPoolApp(main.app.wsgi_app, pool)
+logger.info(f"ASGI app serving with {INFERENCE_THREADS} inference thread(s), queue limit {INFERENCE_QUEUE}")
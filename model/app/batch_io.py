@@ -0,0 +1,195 @@
+import csv
+import itertools
+import json
+import logging
+import time
+import numpy as np
+from features import RAW_FIELDS
+
+logger = logging.getLogger(__name__)
+
+# Applicant fields every input record needs, and defaults for the optional ones. num_people is
+# only optional for models that don't read it (see required_fields)
+REQUIRED_FIELDS = ("age", "income", "veteran", "benefits")
+DEFAULTS = {"num_people": 1, "disabled": False}
+RESULT_FIELDS = ("prediction", "probability", "label", "error")
+
+# Accepted spellings of boolean flags (CSV cells arrive as strings; "t"/"f" is how Postgres exports booleans)
+FLAG_VALUES = {
+    True: 1.0, False: 0.0, 1: 1.0, 0: 0.0,
+    "true": 1.0, "false": 0.0, "1": 1.0, "0": 0.0, "yes": 1.0, "no": 0.0, "y": 1.0, "n": 0.0, "t": 1.0, "f": 0.0,
+}
+
+
+def _numeric_column(values, field, integer, errors):
+    try:
+        column = np.asarray(values, dtype=np.float64)  # numbers and numeric strings; None -> nan
+    except (TypeError, ValueError):
+        column = np.empty(len(values))
+        for i, value in enumerate(values):
+            try:
+                column[i] = float(value)
+            except (TypeError, ValueError):
+                column[i] = np.nan
+                errors[i] = errors[i] or f"Invalid {field}: {value!r}"
+    for i in np.flatnonzero(np.isnan(column)):
+        errors[i] = errors[i] or f"Missing or invalid {field}"
+    return np.trunc(column) if integer else column
+
+
+def _flag_column(values, field, errors):
+    column = np.empty(len(values))
+    for i, value in enumerate(values):
+        key = value.strip().lower() if isinstance(value, str) else value
+        flag = FLAG_VALUES.get(key) if isinstance(key, (str, bool, int)) else None
+        if flag is None:
+            column[i] = 0.0
+            errors[i] = errors[i] or (f"Missing {field}" if value is None else f"Invalid {field}: {value!r}")
+        else:
+            column[i] = flag
+    return column
+
+
+def required_fields(encoder):
+    """
+    Fields a record needs to be scored by encoder's model: REQUIRED_FIELDS, plus num_people
+    when the model reads it, as /predict requires it.
+    """
+    if "num_people" in encoder.raw_fields:
+        return REQUIRED_FIELDS + ("num_people",)
+    return REQUIRED_FIELDS
+
+
+def parse_columns(columns, n_rows, errors=None, required=REQUIRED_FIELDS):
+    """
+    Convert applicant columns into an (n_rows, 6) float32 array in RAW_FIELDS order.
+    columns: field name -> sequence of n_rows values (missing optional fields get defaults)
+    errors: optional list of per-row errors to extend (e.g. unparseable lines)
+    required: fields that must be present (see required_fields)
+    Returns (raw, errors) where errors[i] is None for valid rows.
+    """
+    errors = list(errors) if errors is not None else [None] * n_rows
+    missing = [f for f in required if f not in columns]
+    if missing:
+        return np.zeros((n_rows, len(RAW_FIELDS)), dtype=np.float32), [e or f"Missing fields: {missing}" for e in errors]
+
+    raw = np.empty((n_rows, len(RAW_FIELDS)), dtype=np.float32)
+    for j, field in enumerate(RAW_FIELDS):
+        values = columns.get(field)
+        if values is None:
+            raw[:, j] = DEFAULTS[field]
+        elif field in ("veteran", "benefits", "disabled"):
+            raw[:, j] = _flag_column(values, field, errors)
+        else:
+            raw[:, j] = _numeric_column(values, field, field in ("age", "num_people"), errors)
+    return raw, errors
+
+
+def parse_records(records, required=REQUIRED_FIELDS):
+    """parse_columns for a list of dict records; None marks a record that couldn't be read."""
+    errors = [None if r is not None else "Invalid JSON" for r in records]
+    present = set().union(*(r.keys() for r in records if r is not None)) if records else set()
+    columns = {}
+    for field in RAW_FIELDS:
+        if field in present or field in required:
+            default = None if field in required else DEFAULTS.get(field)
+            columns[field] = [r.get(field, default) if r is not None else DEFAULTS.get(field, 0) for r in records]
+    # Rows lacking a required field are reported per row, whatever else is in the chunk
+    return parse_columns(columns, len(records), errors, required)
+
+
+def read_jsonl_chunks(f, chunk_size):
+    """Yield lists of up to chunk_size records from a JSONL stream (None for unparseable lines)."""
+    lines = (line for line in f if line.strip())
+    while True:
+        chunk = list(itertools.islice(lines, chunk_size))
+        if not chunk:
+            return
+        records = []
+        for line in chunk:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                record = None
+            records.append(record if isinstance(record, dict) else None)
+        yield records
+
+
+def read_csv_chunks(f, chunk_size):
+    """Yield lists of up to chunk_size dict records from a CSV stream with a header row."""
+    reader = csv.DictReader(f)
+    while True:
+        chunk = list(itertools.islice(reader, chunk_size))
+        if not chunk:
+            return
+        # Empty cells count as absent so optional fields fall back to their defaults
+        yield [{k: v for k, v in row.items() if v not in ("", None)} for row in chunk]
+
+
+class JsonlWriter:
+    """Write each input record with its result fields merged in, one JSON object per line."""
+
+    def __init__(self, f):
+        self.f = f
+
+    def write(self, records, results):
+        self.f.write("".join(
+            json.dumps({**(record or {}), **result}) + "\n" for record, result in zip(records, results)
+        ))
+        self.f.flush()
+
+
+class CsvWriter:
+    """Write each input record's columns followed by the result columns."""
+
+    def __init__(self, f):
+        self.f = f
+        self._writer = None
+
+    def write(self, records, results):
+        if self._writer is None:
+            input_fields = list(dict.fromkeys(k for r in records if r is not None for k in r))
+            fieldnames = [k for k in input_fields if k not in RESULT_FIELDS] + list(RESULT_FIELDS)
+            self._writer = csv.DictWriter(self.f, fieldnames=fieldnames, extrasaction="ignore", restval="")
+            self._writer.writeheader()
+        self._writer.writerows({**(record or {}), **result} for record, result in zip(records, results))
+        self.f.flush()
+
+
+def format_results(probs, errors, threshold):
+    """Result dicts for a scored chunk; rows with errors get only an error field."""
+    results = []
+    preds = probs >= threshold
+    for prob, pred, error in zip(probs.tolist(), preds.tolist(), errors):
+        if error:
+            results.append({"error": error})
+        else:
+            results.append({
+                "prediction": int(pred),
+                "probability": round(prob, 4),
+                "label": "At risk" if pred else "Not at risk",
+            })
+    return results
+
+
+def score_chunks(chunks, encoder, predict_proba, writer, threshold=0.5):
+    """
+    Score record chunks with one predict_proba call each and write results as they come.
+    Memory stays bounded by the chunk size. Returns counts of rows read, scored and rejected.
+    """
+    stats = {"rows": 0, "scored": 0, "errors": 0}
+    start = time.perf_counter()
+    for records in chunks:
+        raw, errors = parse_records(records, required_fields(encoder))
+        valid = np.array([e is None for e in errors])
+        probs = np.zeros(len(records))
+        if valid.any():
+            probs[valid] = predict_proba(encoder.encode_batch(raw[valid]))
+        writer.write(records, format_results(probs, errors, threshold))
+
+        stats["rows"] += len(records)
+        stats["scored"] += int(valid.sum())
+        stats["errors"] += len(records) - int(valid.sum())
+        elapsed = time.perf_counter() - start
+        logger.info(f"Scored {stats['rows']} rows ({stats['errors']} rejected) at {stats['rows'] / elapsed:.0f} rows/s")
+    return stats
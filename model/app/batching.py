@@ -0,0 +1,140 @@
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Histogram buckets for time spent queued before a flush (seconds) and rows per flush
+WAIT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.002, 0.005, 0.01, 0.025, 0.05, 0.1)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+
+
+class MicroBatcher:
+    """
+    Coalesce concurrent single-row predictions into batched model calls.
+
+    Request threads submit one encoded row, with the predictor that must score it, and
+    block on a Future. A background thread takes the first queued row, keeps collecting
+    until max_wait_ms has passed since that row arrived or max_batch_size rows are gathered,
+    scores them with one predict_proba call per predictor, and resolves each caller's Future
+    with its own probability. Rows submitted without a predictor are scored by predict_fn.
+    """
+
+    def __init__(self, predict_fn, n_features, max_batch_size=64, max_wait_ms=2.0, registry=None):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._buffer = np.zeros((max_batch_size, n_features), dtype=np.float32)
+        self._queue = queue.Queue()
+        self._closed = False
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+        self.wait_seconds = self.batch_size = None
+        if registry is not None:
+            self.wait_seconds = registry.histogram(
+                "risk_microbatch_queue_wait_seconds",
+                "Time a request spent queued before its batch was scored",
+                WAIT_BUCKETS,
+            )
+            self.batch_size = registry.histogram(
+                "risk_microbatch_batch_size",
+                "Rows scored per coalesced model call",
+                SIZE_BUCKETS,
+            )
+            registry.gauge(
+                "risk_microbatch_queue_depth",
+                "Requests currently waiting to be batched",
+                fn=lambda: self._queue.qsize(),
+            )
+
+        logger.info(f"Micro-batching enabled (max_batch_size={max_batch_size}, max_wait_ms={max_wait_ms})")
+
+    def _ensure_started(self):
+        # The flush thread is started lazily in whichever process submits, because a
+        # batcher created before a fork (gunicorn preload_app) has no thread in the workers.
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._thread = threading.Thread(target=self._run, name="microbatcher", daemon=True)
+                self._thread.start()
+                self._pid = os.getpid()
+
+    def submit(self, row, predictor=None):
+        """Queue one encoded feature row; returns a Future resolving to its probability."""
+        if self._closed:
+            raise RuntimeError("MicroBatcher is closed")
+        if predictor is None and self.predict_fn is None:
+            raise ValueError("MicroBatcher has no predict_fn; submit rows with a predictor")
+        self._ensure_started()
+        future = Future()
+        self._queue.put((np.array(row, dtype=np.float32), future, time.perf_counter(), predictor))
+        return future
+
+    def predict(self, row, predictor=None, timeout=None):
+        """Blocking helper: submit a row and wait for its probability."""
+        return self.submit(row, predictor).result(timeout)
+
+    def close(self):
+        self._closed = True
+        if self._thread is not None and self._pid == os.getpid():
+            self._queue.put(None)
+            self._thread.join()
+
+    def _collect(self, first):
+        batch = [first]
+        deadline = first[2] + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)  # re-queue the shutdown marker for _run
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = self._collect(first)
+            flushed = time.perf_counter()
+            if self.wait_seconds is not None:
+                for _, _, enqueued, _ in batch:
+                    self.wait_seconds.observe(flushed - enqueued)
+
+            # Rows pinned to different models (a hot swap mid-window) are scored separately
+            groups = {}
+            for item in batch:
+                groups.setdefault(item[3], []).append(item)
+            for predictor, items in groups.items():
+                self._score(predictor, items)
+
+    def _score(self, predictor, items):
+        n_rows = len(items)
+        X = self._buffer[:n_rows]
+        for i, (row, _, _, _) in enumerate(items):
+            X[i] = row
+        if self.batch_size is not None:
+            self.batch_size.observe(n_rows)
+
+        try:
+            probs = predictor.predict_proba(X) if predictor is not None else self.predict_fn(X)
+        except Exception as e:
+            logger.error(f"Micro-batch prediction error: {e}")
+            for _, future, _, _ in items:
+                future.set_exception(e)
+            return
+        for (_, future, _, _), prob in zip(items, probs):
+            future.set_result(float(prob))
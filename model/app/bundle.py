@@ -0,0 +1,172 @@
+import datetime
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import zipfile
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Model bundle: a single uncompressed .npz holding everything inference needs, readable
+# with only NumPy and xgboost. Members:
+#   booster          uint8   XGBoost model in its native UBJSON format
+#   order            intp    input column feeding each booster feature
+#   center, scale    float64 RobustScaler constants per booster feature (0 / 1 for passthrough)
+#   iteration_range  int64   trees used for prediction (best_iteration when early stopping)
+#   feature_names    str     input columns, in the order the model expects them
+#   feature_types    str     "int", "float" or "bool" per input column ("" when unknown)
+#   manifest         str     JSON: format, format_version, created_at, library versions,
+#                            training metrics and the content hash of the other members
+BUNDLE_FORMAT = "risk-model-bundle"
+BUNDLE_FORMAT_VERSION = 1
+BUNDLE_ARRAYS = ("booster", "order", "center", "scale", "iteration_range", "feature_names", "feature_types")
+
+
+class ModelBundle:
+    """Arrays and manifest read from a bundle; numeric arrays may be read-only memory maps."""
+
+    def __init__(self, arrays, manifest):
+        self.arrays = arrays
+        self.manifest = manifest
+
+    def __getitem__(self, name):
+        return self.arrays[name]
+
+    @property
+    def content_hash(self):
+        return self.manifest["content_hash"]
+
+    @property
+    def feature_names(self):
+        return self.arrays["feature_names"].tolist()
+
+    @property
+    def metrics(self):
+        return self.manifest.get("metrics", {})
+
+
+def content_hash(arrays):
+    """SHA-256 over every bundle array's name, dtype, shape and bytes (manifest excluded)."""
+    digest = hashlib.sha256()
+    for name in BUNDLE_ARRAYS:
+        array = np.ascontiguousarray(arrays[name])
+        digest.update(f"{name}:{array.dtype.str}:{array.shape};".encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+def feature_type(dtype):
+    """Normalize a NumPy/pandas dtype to the bundle's feature type names."""
+    kind = np.dtype(dtype).kind
+    return {"b": "bool", "i": "int", "u": "int", "f": "float"}.get(kind, "")
+
+
+def write_bundle(path, booster, order, center, scale, feature_names, feature_types=None,
+                 iteration_range=(0, 0), metrics=None, **extra):
+    """
+    Write a model bundle to path (via a temporary file renamed into place) and return its manifest.
+    metrics: training/evaluation metrics recorded in the manifest
+    extra: additional JSON-serializable manifest fields
+    """
+    import xgboost as xgb
+
+    arrays = {
+        "booster": np.frombuffer(booster.save_raw(raw_format="ubj"), dtype=np.uint8),
+        "order": np.asarray(order, dtype=np.intp),
+        "center": np.asarray(center, dtype=np.float64),
+        "scale": np.asarray(scale, dtype=np.float64),
+        "iteration_range": np.asarray(iteration_range, dtype=np.int64),
+        "feature_names": np.array([str(n) for n in feature_names]),
+        "feature_types": np.array(list(feature_types) if feature_types is not None else [""] * len(feature_names)),
+    }
+    manifest = {
+        "format": BUNDLE_FORMAT,
+        "format_version": BUNDLE_FORMAT_VERSION,
+        "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "xgboost_version": xgb.__version__,
+        "numpy_version": np.__version__,
+        "objective": "binary:logistic",
+        "metrics": metrics or {},
+        **extra,
+        "content_hash": content_hash(arrays),
+    }
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        # Uncompressed, so the arrays can be memory-mapped straight out of the file
+        np.savez(f, manifest=json.dumps(manifest), **arrays)
+    os.replace(tmp_path, path)
+    logger.info(f"Saved model bundle {manifest['content_hash'][:12]} to {path}")
+    return manifest
+
+
+def is_bundle(path):
+    """True if path is a model bundle (as opposed to, e.g., a joblib pickle)."""
+    if not zipfile.is_zipfile(path):
+        return False
+    with zipfile.ZipFile(path) as zf:
+        return "manifest.npy" in zf.namelist()
+
+
+HEADER_READERS = {
+    (1, 0): np.lib.format.read_array_header_1_0,
+    (2, 0): np.lib.format.read_array_header_2_0,
+}
+
+
+def _mmap_members(path):
+    """Map every uncompressed .npy member of an .npz file without copying it."""
+    arrays = {}
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    with zipfile.ZipFile(path) as zf:
+        for info in zf.infolist():
+            if info.compress_type != zipfile.ZIP_STORED or not info.filename.endswith(".npy"):
+                continue
+            # Local file header: 30 fixed bytes, then the name and extra field
+            name_len, extra_len = struct.unpack("<HH", mm[info.header_offset + 26:info.header_offset + 30])
+            start = info.header_offset + 30 + name_len + extra_len
+            with zf.open(info) as member:
+                read_header = HEADER_READERS.get(np.lib.format.read_magic(member))
+                if read_header is None:
+                    continue
+                shape, fortran, dtype = read_header(member)
+                data_offset = start + member.tell()
+            if dtype.hasobject:
+                continue
+            array = np.frombuffer(mm, dtype=dtype, count=int(np.prod(shape, dtype=np.int64)), offset=data_offset)
+            arrays[info.filename[:-4]] = array.reshape(shape, order="F" if fortran else "C")
+    return arrays
+
+
+def read_bundle(path, use_mmap=True, verify=True):
+    """
+    Read a model bundle. Arrays are memory-mapped when possible (falling back to a
+    normal read) and the content hash is checked against the manifest.
+    Raises ValueError for files that aren't bundles, unsupported versions or corrupt content.
+    """
+    arrays = {}
+    if use_mmap:
+        try:
+            arrays = _mmap_members(path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not memory-map {path} ({e}); reading it instead")
+            arrays = {}
+    with np.load(path, allow_pickle=False) as data:
+        for name in ("manifest",) + BUNDLE_ARRAYS:
+            if name not in arrays:
+                if name not in data.files:
+                    raise ValueError(f"{path} is not a model bundle (missing '{name}')")
+                arrays[name] = data[name]
+
+    manifest = json.loads(str(arrays.pop("manifest")))
+    if manifest.get("format") != BUNDLE_FORMAT:
+        raise ValueError(f"{path} is not a model bundle (format {manifest.get('format')!r})")
+    if manifest.get("format_version", 0) > BUNDLE_FORMAT_VERSION:
+        raise ValueError(f"Model bundle format version {manifest['format_version']} is newer than supported ({BUNDLE_FORMAT_VERSION})")
+    if verify and content_hash(arrays) != manifest.get("content_hash"):
+        raise ValueError(f"Model bundle {path} is corrupt (content hash mismatch)")
+    return ModelBundle(arrays, manifest)
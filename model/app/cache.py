@@ -0,0 +1,89 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+
+# Approximate bookkeeping cost of one OrderedDict entry (hash slot + linked-list node)
+ENTRY_OVERHEAD_BYTES = 100
+
+
+class PredictionCache:
+    """
+    Bounded LRU cache of probabilities keyed on the encoded feature row.
+
+    Bounded both by entry count and by an estimate of resident bytes, with an optional
+    TTL. The cache is bound to a model version; binding a different version drops every
+    entry, and results computed by an older model are never stored.
+    """
+
+    def __init__(self, max_entries=100_000, max_bytes=32 * 1024 * 1024, ttl_seconds=None, registry=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl_seconds or None
+        self.version = None
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = self.misses = self.evictions = self.expirations = 0
+        if registry is not None:
+            registry.counter_fn("risk_cache_hits_total", "Prediction cache hits", fn=lambda: self.hits)
+            registry.counter_fn("risk_cache_misses_total", "Prediction cache misses", fn=lambda: self.misses)
+            registry.counter_fn("risk_cache_evictions_total", "Entries evicted to stay within size limits", fn=lambda: self.evictions)
+            registry.counter_fn("risk_cache_expirations_total", "Entries dropped after their TTL", fn=lambda: self.expirations)
+            registry.gauge("risk_cache_entries", "Entries currently cached", fn=lambda: len(self._entries))
+            registry.gauge("risk_cache_bytes", "Estimated bytes held by the cache", fn=lambda: self._bytes)
+
+    @staticmethod
+    def key_for(X):
+        """
+        Cache key for an encoded row. Rows are normalized to contiguous float32 with -0.0
+        folded into 0.0, so equal feature values share a key whatever array they came from.
+        """
+        return (np.ascontiguousarray(X, dtype=np.float32) + np.float32(0.0)).tobytes()
+
+    def bind(self, version):
+        """Attach the cache to a model version, clearing it if the version changed."""
+        with self._lock:
+            if version != self.version:
+                self._entries.clear()
+                self._bytes = 0
+                self.version = version
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires, size = entry
+            if expires is not None and expires <= time.monotonic():
+                del self._entries[key]
+                self._bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, version=None):
+        """Store a probability; ignored if it was computed by a model other than the bound one."""
+        size = sys.getsizeof(key) + ENTRY_OVERHEAD_BYTES
+        expires = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            if version is not None and version != self.version:
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._entries[key] = (value, expires, size)
+            self._bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,124 @@
+import json
+import struct
+import numpy as np
+from features import RAW_FIELDS
+
+# Binary batch protocol for service-to-service scoring (POST /predict/binary).
+#
+# Request (Content-Type: application/x-risk-columns), all little-endian:
+#   magic       4s   b"RSKC"
+#   version     u8   1
+#   dtype       u8   1 = float32
+#   reserved    u16  0
+#   n_rows      u32
+#   schema_len  u32  bytes of schema that follow
+#   schema      JSON list of column names (RAW_FIELDS, any order), space-padded so the
+#               data starts on a 4-byte boundary
+#   data        n_cols x n_rows float32, column after column
+# Response: n_rows little-endian float32 probabilities (Content-Type: application/octet-stream).
+#
+# Arrow IPC streams (Content-Type: application/vnd.apache.arrow.stream) with one numeric
+# column per field are accepted too when pyarrow is installed; the response is then an
+# Arrow stream with a single float32 "probability" column.
+CONTENT_TYPE = "application/x-risk-columns"
+ARROW_CONTENT_TYPE = "application/vnd.apache.arrow.stream"
+RESPONSE_CONTENT_TYPE = "application/octet-stream"
+MAGIC = b"RSKC"
+VERSION = 1
+DTYPE_FLOAT32 = 1
+HEADER = struct.Struct("<4sBBHII")
+
+FLAG_FIELDS = ("veteran", "benefits", "disabled")
+INTEGER_FIELDS = ("age", "num_people")
+
+
+class PayloadError(ValueError):
+    """The request body doesn't follow the protocol; the message is safe to return to the client."""
+
+
+def encode_request(columns, names=RAW_FIELDS):
+    """Build a request body from one sequence of values per name (client side)."""
+    data = np.ascontiguousarray(np.asarray(columns, dtype="<f4").reshape(len(names), -1))
+    schema = json.dumps(list(names)).encode()
+    schema += b" " * (-(HEADER.size + len(schema)) % 4)
+    return HEADER.pack(MAGIC, VERSION, DTYPE_FLOAT32, 0, data.shape[1], len(schema)) + schema + data.tobytes()
+
+
+def decode_request(body):
+    """
+    Map a request body without copying it. Returns (names, columns), where columns[i] is a
+    read-only float32 view over the body holding the values of names[i].
+    """
+    if len(body) < HEADER.size:
+        raise PayloadError("Payload is shorter than the header")
+    magic, version, dtype, _, n_rows, schema_len = HEADER.unpack_from(body)
+    if magic != MAGIC:
+        raise PayloadError("Payload does not start with the RSKC magic bytes")
+    if version != VERSION or dtype != DTYPE_FLOAT32:
+        raise PayloadError(f"Unsupported payload version {version} or dtype {dtype}")
+    try:
+        names = json.loads(body[HEADER.size:HEADER.size + schema_len])
+    except ValueError:
+        raise PayloadError("Schema is not a JSON list of column names")
+    if not isinstance(names, list) or not all(isinstance(n, str) for n in names):
+        raise PayloadError("Schema is not a JSON list of column names")
+
+    offset = HEADER.size + schema_len
+    expected = offset + 4 * n_rows * len(names)
+    if len(body) != expected:
+        raise PayloadError(f"Payload is {len(body)} bytes; header and schema describe {expected}")
+    data = np.frombuffer(body, dtype="<f4", count=n_rows * len(names), offset=offset)
+    return names, list(data.reshape(len(names), n_rows))
+
+
+def decode_arrow(body):
+    """Map the columns of an Arrow IPC stream; float32 columns without nulls aren't copied."""
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise PayloadError("Arrow payloads are not supported by this server (pyarrow is not installed)")
+    try:
+        table = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+    except pa.ArrowInvalid as e:
+        raise PayloadError(f"Invalid Arrow stream: {e}")
+    columns = []
+    for name, column in zip(table.column_names, table.columns):
+        if column.null_count:
+            raise PayloadError(f"Column {name} has nulls")
+        array = column.combine_chunks() if column.num_chunks != 1 else column.chunk(0)
+        if not (pa.types.is_integer(array.type) or pa.types.is_floating(array.type) or pa.types.is_boolean(array.type)):
+            raise PayloadError(f"Column {name} has non-numeric type {array.type}")
+        if array.type != pa.float32():
+            array = array.cast(pa.float32())
+        columns.append(array.to_numpy(zero_copy_only=True))
+    return table.column_names, columns
+
+
+def encode_arrow(probabilities):
+    import pyarrow as pa
+    batch = pa.record_batch([pa.array(np.asarray(probabilities, dtype=np.float32))], names=["probability"])
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
+
+
+def encode_response(probabilities):
+    return np.asarray(probabilities, dtype="<f4").tobytes()
+
+
+def check_columns(names, columns):
+    """
+    Check a decoded batch the way validate_applicant checks JSON applicants: every raw field
+    exactly once, finite values, whole numbers for age and num_people, 0/1 flags.
+    Raises PayloadError naming the first offending column.
+    """
+    if sorted(names) != sorted(RAW_FIELDS):
+        raise PayloadError(f"Columns must be exactly {list(RAW_FIELDS)} in any order, got {names}")
+    for name, column in zip(names, columns):
+        if not np.isfinite(column).all():
+            raise PayloadError(f"Column {name} has non-finite values")
+        if name in FLAG_FIELDS and not ((column == 0) | (column == 1)).all():
+            raise PayloadError(f"Column {name} must hold 0 or 1")
+        if name in INTEGER_FIELDS and not (np.trunc(column) == column).all():
+            raise PayloadError(f"Column {name} must hold whole numbers")
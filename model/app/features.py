@@ -0,0 +1,136 @@
+import threading
+import numpy as np
+
+# Raw applicant fields, in the order used by validate_applicant and the CLI
+RAW_FIELDS = ("age", "income", "num_people", "veteran", "benefits", "disabled")
+
+# Classification threshold for the "At risk" label. The service stores labels made with it,
+# so anything that recomputes those labels (rescore.py) must use the same value.
+DEFAULT_THRESHOLD = 0.4
+
+
+# Column definitions: every model feature is an affine function of one raw field,
+# value = raw[field] * scale + offset, which covers passthrough, flags and one-hot pairs,
+# or a constant, which reads no field (field None) and is always offset.
+def passthrough(field):
+    return (field, 1.0, 0.0)
+
+def negated(field):
+    """1 when the boolean field is False, 0 otherwise (the 'no' side of a one-hot pair)."""
+    return (field, -1.0, 1.0)
+
+def constant(value):
+    return (None, 0.0, float(value))
+
+
+# Feature order of the risk model trained by pipeline/model_training.py
+FEATURE_ORDER = [
+    "HINCP",
+    "AGE",
+    "NUMPEOPLE",
+    "DISHH",
+    "MILHH",
+    "gov_assistance",
+]
+
+# How each risk model feature is derived from the raw applicant fields
+FEATURE_MAP = {
+    "HINCP": passthrough("income"),
+    "AGE": passthrough("age"),
+    "NUMPEOPLE": passthrough("num_people"),
+    "DISHH": passthrough("disabled"),
+    "MILHH": passthrough("veteran"),
+    "gov_assistance": passthrough("benefits"),
+}
+
+
+class FeatureEncoder:
+    """
+    Encode applicants straight into float32 NumPy rows in the model's column order.
+
+    The feature map is compiled once into index/scale/offset arrays, so encoding is a
+    single gather plus multiply-add over a preallocated buffer. Buffers are kept per
+    thread; the arrays returned by encode/encode_batch are views into that buffer and
+    stay valid until the same thread encodes again.
+    """
+
+    def __init__(self, feature_map, feature_names=None, initial_rows=64):
+        names = [str(n) for n in (feature_names if feature_names is not None else feature_map)]
+        missing = [n for n in names if n not in feature_map]
+        if missing:
+            raise ValueError(f"No encoding defined for model features: {missing}")
+
+        self.feature_names = names
+        self._fields = [feature_map[n][0] for n in names]
+        # Constant columns gather field 0 only to keep the transform a single take; they are
+        # overwritten with their value afterwards, so nothing in the raw row reaches them
+        self._src = np.array([0 if f is None else RAW_FIELDS.index(f) for f in self._fields], dtype=np.intp)
+        self._scale = np.array([feature_map[n][1] for n in names], dtype=np.float32)
+        self._offset = np.array([feature_map[n][2] for n in names], dtype=np.float32)
+        self._constant = np.array([j for j, f in enumerate(self._fields) if f is None], dtype=np.intp)
+        # Raw fields the model actually reads
+        self.raw_fields = tuple(f for f in RAW_FIELDS if f in self._fields)
+        self._initial_rows = initial_rows
+        self._local = threading.local()
+
+    @property
+    def n_features(self):
+        return len(self.feature_names)
+
+    def _buffers(self, n_rows):
+        raw = getattr(self._local, "raw", None)
+        if raw is None or raw.shape[0] < n_rows:
+            capacity = max(n_rows, self._initial_rows)
+            raw = np.zeros((capacity, len(RAW_FIELDS)), dtype=np.float32)
+            self._local.raw = raw
+            self._local.out = np.zeros((capacity, self.n_features), dtype=np.float32)
+        return raw, self._local.out
+
+    def _transform(self, raw, out):
+        np.take(raw, self._src, axis=1, out=out)
+        out *= self._scale
+        out += self._offset
+        if len(self._constant):
+            out[:, self._constant] = self._offset[self._constant]
+        return out
+
+    def encode(self, age, income, num_people, veteran, benefits, disabled=False):
+        """Encode one applicant into a (1, n_features) float32 array."""
+        raw, out = self._buffers(1)
+        row = raw[0]
+        row[0] = age
+        row[1] = income
+        row[2] = num_people
+        row[3] = veteran
+        row[4] = benefits
+        row[5] = disabled
+        return self._transform(raw[:1], out[:1])
+
+    def encode_batch(self, applicants):
+        """
+        Encode many applicants into an (n, n_features) float32 array.
+        applicants: sequence of (age, income, num_people, veteran, benefits, disabled) tuples
+        """
+        n_rows = len(applicants)
+        raw, out = self._buffers(n_rows)
+        if n_rows:
+            raw[:n_rows] = applicants
+        return self._transform(raw[:n_rows], out[:n_rows])
+
+    def encode_columns(self, names, columns):
+        """
+        Encode applicants given column by column, e.g. float32 views over a binary request.
+        names: the raw field held by each column, in any order
+        The columns are read in place and written straight into the feature buffer.
+        """
+        n_rows = len(columns[0]) if columns else 0
+        _, out = self._buffers(n_rows)
+        out = out[:n_rows]
+        position = {name: i for i, name in enumerate(names)}
+        for j, field in enumerate(self._fields):
+            if field is None:
+                out[:, j] = self._offset[j]
+                continue
+            np.multiply(columns[position[field]], self._scale[j], out=out[:, j])
+            out[:, j] += self._offset[j]
+        return out
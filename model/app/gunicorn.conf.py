@@ -0,0 +1,81 @@
+import gc
+import logging
+import math
+import os
+
+# Gunicorn serving configuration for the risk service:
+#   gunicorn -c gunicorn.conf.py main:app
+#
+# The model is loaded once in the master (preload_app) and workers are forked from it,
+# so the booster and encoder pages are shared copy-on-write instead of being loaded
+# once per worker. Each worker runs the model single-threaded by default and the
+# worker count follows the CPUs actually available to the container.
+
+logger = logging.getLogger("gunicorn.error")
+
+
+def available_cores():
+    """CPUs this process may use, honouring CPU affinity and cgroup (container) quotas."""
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cores = os.cpu_count() or 1
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cores = min(cores, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cores
+
+
+# Threads each worker's XGBoost/OpenMP runtime may use. This must be set before the app
+# (and therefore xgboost) is imported; one thread per worker avoids oversubscribing cores
+# and keeps libgomp from starting a thread pool in the master before workers fork.
+MODEL_THREADS = int(os.getenv("RISK_MODEL_THREADS", 1))
+for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+    os.environ[var] = str(MODEL_THREADS)
+os.environ.setdefault("RISK_MODEL_THREADS", str(MODEL_THREADS))
+
+CORES = available_cores()
+
+bind = f"0.0.0.0:{os.getenv('PORT', 5000)}"
+preload_app = True
+
+# One single-threaded model per core; a few request threads per worker overlap socket I/O
+# and JSON handling with inference (XGBoost releases the GIL while predicting).
+# With admission control on (RISK_MAX_CONCURRENT), each worker gets a thread for every
+# running and queued request, so excess requests wait in the app's bounded queue, where
+# they are counted and shed, rather than in gunicorn's connection queue.
+workers = int(os.getenv("WEB_CONCURRENCY", max(1, CORES // MODEL_THREADS)))
+ADMISSION_SLOTS = int(os.getenv("RISK_MAX_CONCURRENT", 0))
+if ADMISSION_SLOTS > 0:
+    ADMISSION_SLOTS += int(os.getenv("RISK_MAX_QUEUE", 16))
+threads = int(os.getenv("GUNICORN_THREADS", max(4, ADMISSION_SLOTS)))
+worker_class = "gthread" if threads > 1 else "sync"
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 30))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 0))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", 0))
+
+
+def when_ready(server):
+    logger.info(
+        f"Serving with {workers} worker(s) x {threads} thread(s), "
+        f"{MODEL_THREADS} model thread(s) per worker on {CORES} available core(s)"
+    )
+
+
+def pre_fork(server, worker):
+    # Move everything allocated while preloading into the permanent generation so the
+    # garbage collector never touches (and copies) those pages in the workers.
+    gc.freeze()
+
+
+def post_worker_init(worker):
+    # The master warmed up while preloading, but a forked worker starts with fresh request
+    # threads and per-thread buffers; warm it before it takes traffic (/readyz is 503 until then)
+    import main
+    main.warmup()
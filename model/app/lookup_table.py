@@ -0,0 +1,290 @@
+import argparse
+import bisect
+import json
+import logging
+import os
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Model features served by the table, by role
+INCOME, AGE, NUMPEOPLE = "HINCP", "AGE", "NUMPEOPLE"
+FLAGS = ("DISHH", "MILHH", "gov_assistance")
+
+# Rows scored per model call while enumerating the grid
+BUILD_CHUNK_ROWS = 262144
+
+
+class ProbabilityTable:
+    """
+    Precomputed risk probabilities over the app model's input grid.
+
+    AGE and NUMPEOPLE are integers and the three flags are binary, so they index the
+    table directly. Income is the only continuous input; it is covered by a sorted set of
+    nodes and answered by linear interpolation ("linear") or by the value at the node at or
+    below the income ("previous"). Built with the model's HINCP split thresholds among the
+    nodes, "previous" reproduces the trees exactly. Rows outside the grid go to fallback.
+    """
+
+    mode = "table"
+
+    def __init__(self, table, income_nodes, age_min, people_min, feature_names,
+                 interpolation="linear", fallback=None, metadata=None):
+        self.table = np.ascontiguousarray(table, dtype=np.float32)
+        self.income_nodes = np.asarray(income_nodes, dtype=np.float32)
+        self.age_min = int(age_min)
+        self.people_min = int(people_min)
+        self.interpolation = interpolation
+        self.fallback = fallback
+        self.metadata = dict(metadata or {})
+        if interpolation not in ("linear", "previous"):
+            raise ValueError(f"Unknown interpolation: {interpolation}")
+
+        names = [str(n) for n in feature_names]
+        self.feature_names = names
+        self._income_col = names.index(INCOME)
+        self._age_col = names.index(AGE)
+        self._people_col = names.index(NUMPEOPLE)
+        self._flag_cols = [names.index(f) for f in FLAGS]
+        self._nodes = self.income_nodes.tolist()
+        self._n_age, self._n_people = self.table.shape[0], self.table.shape[1]
+
+    @property
+    def nbytes(self):
+        return self.table.nbytes + self.income_nodes.nbytes
+
+    @classmethod
+    def build(cls, predictor, encoder, age_range=(15, 100), people_range=(1, 20),
+              income_max=250000, income_step=1000, include_splits=False,
+              interpolation="linear"):
+        """
+        Enumerate the grid through predictor (anything with predict_proba on encoded rows).
+        include_splits adds the booster's HINCP split thresholds to the income nodes;
+        it needs a FastPredictor-style predictor exposing booster/order/center/scale.
+        """
+        nodes = np.arange(0, income_max + income_step, income_step, dtype=np.float64)
+        if include_splits:
+            nodes = np.union1d(nodes, income_split_thresholds(predictor, encoder, income_max))
+        nodes = np.unique(nodes.astype(np.float32))
+
+        ages = np.arange(age_range[0], age_range[1] + 1)
+        people = np.arange(people_range[0], people_range[1] + 1)
+        flags = np.arange(8)
+
+        # Raw applicant fields in features.RAW_FIELDS order, income varying fastest
+        a, p, f, i = np.meshgrid(ages, people, flags, nodes, indexing="ij")
+        f = f.ravel()
+        raw = np.column_stack([
+            a.ravel(), i.ravel(), p.ravel(),
+            (f >> 1) & 1,  # veteran  -> MILHH
+            f & 1,         # benefits -> gov_assistance
+            (f >> 2) & 1,  # disabled -> DISHH
+        ]).astype(np.float32)
+
+        probs = np.empty(len(raw), dtype=np.float32)
+        for start in range(0, len(raw), BUILD_CHUNK_ROWS):
+            chunk = raw[start:start + BUILD_CHUNK_ROWS]
+            probs[start:start + len(chunk)] = predictor.predict_proba(encoder.encode_batch(chunk))
+
+        table = probs.reshape(len(ages), len(people), 8, len(nodes))
+        metadata = {
+            "income_step": income_step,
+            "income_max": income_max,
+            "include_splits": bool(include_splits),
+        }
+        logger.info(
+            f"Built probability table: {table.shape} ({table.nbytes / 1e6:.1f} MB, "
+            f"{len(nodes)} income nodes, interpolation={interpolation})"
+        )
+        return cls(table, nodes, ages[0], people[0], encoder.feature_names,
+                   interpolation=interpolation, fallback=predictor, metadata=metadata)
+
+    def _flag_index(self, disabled, veteran, benefits):
+        return (int(disabled) << 2) | (int(veteran) << 1) | int(benefits)
+
+    def _lookup_one(self, row):
+        income = row[self._income_col]
+        a = int(row[self._age_col]) - self.age_min
+        p = int(row[self._people_col]) - self.people_min
+        dis, vet, ben = (row[c] for c in self._flag_cols)
+        nodes = self._nodes
+        if (not 0 <= a < self._n_age or not 0 <= p < self._n_people
+                or a + self.age_min != row[self._age_col] or p + self.people_min != row[self._people_col]
+                or not nodes[0] <= income <= nodes[-1]
+                or dis not in (0.0, 1.0) or vet not in (0.0, 1.0) or ben not in (0.0, 1.0)):
+            return None
+        cell = self.table[a, p, self._flag_index(dis, vet, ben)]
+        i = min(bisect.bisect_right(nodes, income) - 1, len(nodes) - 2)
+        lo, hi = nodes[i], nodes[i + 1]
+        if self.interpolation == "previous":
+            return float(cell[i + 1] if income >= hi else cell[i])
+        w = (income - lo) / (hi - lo)
+        return float(cell[i] + w * (cell[i + 1] - cell[i]))
+
+    def predict_proba(self, X):
+        """Return the positive-class probability for each row of the float32 matrix X."""
+        if X.shape[0] == 1:
+            prob = self._lookup_one(X[0].tolist())
+            if prob is not None:
+                return np.array([prob], dtype=np.float32)
+            return self._fallback(X)
+
+        income = X[:, self._income_col]
+        age, people = X[:, self._age_col], X[:, self._people_col]
+        flag_vals = X[:, self._flag_cols]
+        a = age.astype(np.intp) - self.age_min
+        p = people.astype(np.intp) - self.people_min
+        nodes = self.income_nodes
+        ok = (
+            (a >= 0) & (a < self._n_age) & (a + self.age_min == age)
+            & (p >= 0) & (p < self._n_people) & (p + self.people_min == people)
+            & (income >= nodes[0]) & (income <= nodes[-1])
+            & np.all((flag_vals == 0) | (flag_vals == 1), axis=1)
+        )
+        out = np.empty(X.shape[0], dtype=np.float32)
+        if not ok.all():
+            out[~ok] = self._fallback(X[~ok])
+        if ok.any():
+            a, p, income, flag_vals = a[ok], p[ok], income[ok], flag_vals[ok].astype(np.intp)
+            f = (flag_vals[:, 0] << 2) | (flag_vals[:, 1] << 1) | flag_vals[:, 2]
+            i = np.minimum(np.searchsorted(nodes, income, side="right") - 1, len(nodes) - 2)
+            lo_val = self.table[a, p, f, i]
+            hi_val = self.table[a, p, f, i + 1]
+            if self.interpolation == "previous":
+                out[ok] = np.where(income >= nodes[i + 1], hi_val, lo_val)
+            else:
+                w = (income - nodes[i]) / (nodes[i + 1] - nodes[i])
+                out[ok] = lo_val + w * (hi_val - lo_val)
+        return out
+
+    def _fallback(self, X):
+        if self.fallback is None:
+            raise ValueError("Applicant is outside the probability table grid and no fallback model is set")
+        return self.fallback.predict_proba(X)
+
+    def error_report(self, predictor, encoder, n_samples=200000, threshold=0.4, seed=0):
+        """
+        Compare the table with predictor on random in-grid applicants with continuous incomes.
+        Returns max/mean absolute probability error and the number of labels flipped at threshold.
+        """
+        rng = np.random.default_rng(seed)
+        nodes = self.income_nodes
+        raw = np.column_stack([
+            rng.integers(self.age_min, self.age_min + self._n_age, n_samples),
+            rng.uniform(nodes[0], nodes[-1], n_samples),
+            rng.integers(self.people_min, self.people_min + self._n_people, n_samples),
+            rng.integers(0, 2, (n_samples, 3)),
+        ]).astype(np.float32)
+        X = encoder.encode_batch(raw).copy()
+        expected = np.asarray(predictor.predict_proba(X), dtype=np.float64)
+        actual = self.predict_proba(X).astype(np.float64)
+        err = np.abs(expected - actual)
+        flips = int(np.count_nonzero((expected >= threshold) != (actual >= threshold)))
+        report = {
+            "samples": n_samples,
+            "max_abs_error": float(err.max()),
+            "mean_abs_error": float(err.mean()),
+            "label_flips": flips,
+            "threshold": threshold,
+        }
+        self.metadata["error_report"] = report
+        return report
+
+    def save(self, path):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            # Through a file handle so numpy doesn't append ".npz" to a path without it
+            np.savez_compressed(
+                f,
+                table=self.table,
+                income_nodes=self.income_nodes,
+                age_min=self.age_min,
+                people_min=self.people_min,
+                feature_names=np.array(self.feature_names),
+                interpolation=self.interpolation,
+                metadata=json.dumps(self.metadata),
+            )
+        os.replace(tmp_path, path)
+        logger.info(f"Saved probability table to {path}")
+
+    @classmethod
+    def load(cls, path, fallback=None):
+        with np.load(path, allow_pickle=False) as data:
+            table = cls(
+                data["table"], data["income_nodes"], int(data["age_min"]), int(data["people_min"]),
+                data["feature_names"].tolist(), interpolation=str(data["interpolation"]),
+                fallback=fallback, metadata=json.loads(str(data["metadata"])),
+            )
+        logger.info(f"Loaded probability table from {path}")
+        return table
+
+
+def income_split_thresholds(predictor, encoder, income_max):
+    """
+    Raw-income values at which the booster's HINCP splits flip, as float32 incomes.
+    Each threshold is nudged up to the first float32 income the fused scaler maps to
+    the split's right-hand side, so a node sits exactly on each step of the trees.
+    """
+    income_input = encoder.feature_names.index(INCOME)
+    position = int(np.flatnonzero(predictor.order == income_input)[0])
+    center = predictor.center[position]
+    scale = predictor.scale[position]
+    feature = f"f{position}"
+
+    splits = set()
+    stack = [json.loads(tree) for tree in predictor.booster.get_dump(dump_format="json")]
+    while stack:
+        node = stack.pop()
+        if node.get("split") == feature:
+            splits.add(np.float32(node["split_condition"]))
+        stack.extend(node.get("children", []))
+
+    # Same float32 rounding as FastPredictor.transform (subtract, then divide)
+    def scaled(x):
+        shifted = np.float32(np.float64(np.float32(x)) - center)
+        return np.float32(np.float64(shifted) / scale)
+
+    thresholds = []
+    for split in splits:
+        x = np.float32(float(split) * scale + center)
+        lower = np.nextafter(x, np.float32(-np.inf))
+        while scaled(lower) >= split:
+            x, lower = lower, np.nextafter(lower, np.float32(-np.inf))
+        while scaled(x) < split:
+            x = np.nextafter(x, np.float32(np.inf))
+        if 0 <= x <= income_max:
+            thresholds.append(float(x))
+    return np.array(sorted(thresholds), dtype=np.float64)
+
+
+# CLI: build a table offline, print its accuracy and save it for RISK_TABLE_PATH
+def main():
+    import joblib
+    from artifacts import artifact_version
+    from features import FEATURE_MAP, FEATURE_ORDER, FeatureEncoder
+    from predictors import build_predictor
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Precompute the risk model's probability lookup table.")
+    parser.add_argument("--model", type=str, default="xgboost_risk_model.pkl", help="Path to the trained pipeline")
+    parser.add_argument("--out", type=str, default="probability_table.npz", help="Where to write the table")
+    parser.add_argument("--income-step", type=float, default=1000, help="Spacing of income nodes in dollars")
+    parser.add_argument("--income-max", type=float, default=250000, help="Highest income covered by the table")
+    parser.add_argument("--include-splits", action="store_true", help="Add the model's HINCP split thresholds as nodes")
+    parser.add_argument("--interpolation", choices=["linear", "previous"], default="linear")
+    parser.add_argument("--samples", type=int, default=200000, help="Random applicants used for the error report")
+    args = parser.parse_args()
+
+    model = joblib.load(args.model)
+    encoder = FeatureEncoder(FEATURE_MAP, getattr(model, 'feature_names_in_', FEATURE_ORDER))
+    predictor = build_predictor(model, "fast")
+    table = ProbabilityTable.build(
+        predictor, encoder, income_max=args.income_max, income_step=args.income_step,
+        include_splits=args.include_splits, interpolation=args.interpolation,
+    )
+    table.metadata["model_version"] = artifact_version(args.model)
+    print(json.dumps(table.error_report(predictor, encoder, n_samples=args.samples), indent=2))
+    table.save(args.out)
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,29 @@
 import os
+import sys
+import json
+import hmac
 import logging
-import pandas as pd
-from flask import Flask, jsonify, request
+import random
+import time
+import numpy as np
+from flask import Flask, Response, g, jsonify, request
 from flask_cors import CORS
-import joblib
+from features import DEFAULT_THRESHOLD, FEATURE_MAP, FEATURE_ORDER, FeatureEncoder
+from predictors import INFERENCE_MODES, FastPredictor, build_predictor, set_model_threads
+from batching import MicroBatcher
+from cache import PredictionCache
+from artifacts import artifact_version
+from bundle import is_bundle
+from lookup_table import ProbabilityTable
+from reloader import ModelReloader
+from admission import CALLER_HEADER, DEADLINE_HEADER, ConcurrencyLimiter, RateLimiter, Rejected, check_deadline, parse_deadline
+import columnar
+import metrics
+# Modules shared with semantic_search/ live in ../common; Docker builds copy them next to this file
+COMMON_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common')
+if os.path.isdir(COMMON_DIR) and COMMON_DIR not in sys.path:
+    sys.path.append(COMMON_DIR)
+import schema
 
 # Setup logging
 def setup_logger():
@@ -18,69 +38,407 @@ logger = setup_logger()
 # Base directory of this script (for reliable file paths)
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
-# Define feature order matching the trained model
-FEATURE_ORDER = [
-    "HINCP",
-    "AGE",
-    "NUMPEOPLE",
-    "DISHH",
-    "MILHH",
-    "gov_assistance",
+# Inference mode: "fast" scores with the XGBoost booster directly, "pipeline" uses the sklearn Pipeline,
+# "table" answers from a precomputed probability lookup table (falling back to "fast" off-grid),
+# "slim" serves a model bundle (see bundle.py) without importing pandas or scikit-learn
+INFERENCE_MODE = os.getenv('RISK_INFERENCE_MODE', 'fast')
+if INFERENCE_MODE not in INFERENCE_MODES:
+    # Fail at startup rather than quietly serving another mode than the one asked for
+    raise ValueError(f"Unknown RISK_INFERENCE_MODE {INFERENCE_MODE!r}; expected one of {', '.join(INFERENCE_MODES)}")
+
+# Probability lookup table settings for "table" mode
+TABLE_PATH = os.getenv('RISK_TABLE_PATH')
+TABLE_INCOME_STEP = float(os.getenv('RISK_TABLE_INCOME_STEP', 1000))
+TABLE_INCOME_MAX = float(os.getenv('RISK_TABLE_INCOME_MAX', 250000))
+TABLE_INCLUDE_SPLITS = os.getenv('RISK_TABLE_INCLUDE_SPLITS', '1') == '1'
+TABLE_INTERPOLATION = os.getenv('RISK_TABLE_INTERPOLATION', 'previous')
+TABLE_CHECK_SAMPLES = int(os.getenv('RISK_TABLE_CHECK_SAMPLES', 20000))
+
+# Threads XGBoost may use per process (unset leaves the library default; gunicorn.conf.py sets 1)
+MODEL_THREADS = os.getenv('RISK_MODEL_THREADS')
+
+# Optional micro-batching: coalesce concurrent /predict requests into one model call
+MICROBATCH_ENABLED = os.getenv('RISK_MICROBATCH', '0') == '1'
+MICROBATCH_WINDOW_MS = float(os.getenv('RISK_MICROBATCH_WINDOW_MS', 2))
+MICROBATCH_MAX_SIZE = int(os.getenv('RISK_MICROBATCH_MAX_SIZE', 64))
+
+# In-process LRU cache of predictions keyed on the encoded feature row (0 entries disables it)
+CACHE_MAX_ENTRIES = int(os.getenv('RISK_CACHE_MAX_ENTRIES', 100000))
+CACHE_MAX_MB = float(os.getenv('RISK_CACHE_MAX_MB', 32))
+CACHE_TTL_SECONDS = float(os.getenv('RISK_CACHE_TTL_SECONDS', 0))
+
+# Representative applicants used to sanity-check a freshly loaded model
+# (age, income, num_people, veteran, benefits, disabled)
+PROBE_APPLICANTS = [
+    (30, 0.0, 1, False, False, False),
+    (35, 32000.0, 3, False, False, False),
+    (50, 20000.0, 3, False, True, True),
+    (40, 30000.0, 3, True, False, True),
+    (67, 85000.0, 2, True, True, False),
+    (22, 150000.0, 5, False, False, False),
 ]
 
+# Hot reload: poll XGBOOST_MODEL_PATH for a new artifact every N seconds (0 disables the watch),
+# optional golden cases a new model must pass, and the token guarding POST /admin/reload
+MODEL_WATCH_INTERVAL = float(os.getenv('RISK_MODEL_WATCH_INTERVAL', 0))
+GOLDEN_PATH = os.getenv('RISK_GOLDEN_PATH')
+ADMIN_TOKEN = os.getenv('RISK_ADMIN_TOKEN')
+
+# Startup warmup: synthetic requests sent through the full Flask code path before /readyz reports ready
+WARMUP_REQUESTS = int(os.getenv('RISK_WARMUP_REQUESTS', 50))
+WARMUP_BATCH_SIZE = int(os.getenv('RISK_WARMUP_BATCH_SIZE', 64))
+WARMUP_ENVIRON_KEY = 'risk.warmup'
+
+# Upper bound on applicants accepted by /predict/batch in a single request
+MAX_BATCH_SIZE = int(os.getenv('MAX_BATCH_SIZE', 5000))
+
+# Admission control for the scoring endpoints: at most RISK_MAX_CONCURRENT requests scoring at
+# once per process (0 disables the limit) with up to RISK_MAX_QUEUE more waiting at most
+# RISK_QUEUE_TIMEOUT_MS for a slot, and a per-caller token bucket of RISK_RATE_LIMIT requests
+# per second with bursts of RISK_RATE_BURST (0 disables it). Requests whose X-Request-Deadline
+# has passed are always dropped.
+MAX_CONCURRENT = int(os.getenv('RISK_MAX_CONCURRENT', 0))
+MAX_QUEUE = int(os.getenv('RISK_MAX_QUEUE', 16))
+QUEUE_TIMEOUT_MS = float(os.getenv('RISK_QUEUE_TIMEOUT_MS', 1000))
+RATE_LIMIT = float(os.getenv('RISK_RATE_LIMIT', 0))
+RATE_BURST = float(os.getenv('RISK_RATE_BURST', 20))
+ADMISSION_ENDPOINTS = ('/predict', '/predict/batch', '/predict/binary')
+
 # Load model
 def load_model(model_path):
     if not os.path.isfile(model_path):
         logger.error(f"Model file not found at {model_path}")
         raise FileNotFoundError(model_path)
+    # Imported here so slim mode never loads joblib (or, by unpickling, sklearn and pandas)
+    import joblib
     model = joblib.load(model_path)
     logger.info(f"Loaded model from {model_path}")
     return model
 
-# Prepare applicant features
-def prepare_features(age, income, num_people, veteran, benefits, disabled: bool = False):
+# Build the feature encoder for a loaded model
+def build_encoder(model):
     """
-    Prepare features for prediction, matching the training data structure.
-    age: Age of the applicant
-    income: Household income
-    num_people: Number of people in the household
-    veteran: Whether the household has a veteran (True/False)
-    benefits: Whether the household receives government assistance (True/False)
-    disabled: Whether someone in the household is disabled (default False)
+    Compile the applicant encoder once, in the column order the model was fitted with
+    (falls back to FEATURE_ORDER for models without feature_names_in_).
     """
-    feat = {
-        "HINCP": income,
-        "AGE": age,
-        "NUMPEOPLE": num_people,
-        "DISHH": 1 if disabled else 0,
-        "MILHH": 1 if veteran else 0,
-        "gov_assistance": 1 if benefits else 0,
-    }
-    df = pd.DataFrame([feat], columns=FEATURE_ORDER)
-    return df
+    feature_names = getattr(model, 'feature_names_in_', None)
+    if feature_names is None:
+        feature_names = FEATURE_ORDER
+    return FeatureEncoder(FEATURE_MAP, feature_names)
+
+# Load or build the probability lookup table served in "table" mode
+def init_table(predictor, encoder, version):
+    if TABLE_PATH and os.path.isfile(TABLE_PATH):
+        table = ProbabilityTable.load(TABLE_PATH, fallback=predictor)
+        if table.metadata.get('model_version') == version:
+            return table
+        logger.warning(f"Probability table at {TABLE_PATH} was built for another model; rebuilding")
+
+    include_splits = TABLE_INCLUDE_SPLITS and predictor.mode == 'fast'
+    if TABLE_INCLUDE_SPLITS and not include_splits:
+        logger.warning("Split-aligned income nodes need fast mode; building a uniform income grid")
+    table = ProbabilityTable.build(
+        predictor, encoder,
+        income_max=TABLE_INCOME_MAX,
+        income_step=TABLE_INCOME_STEP,
+        include_splits=include_splits,
+        interpolation=TABLE_INTERPOLATION,
+    )
+    table.metadata['model_version'] = version
+    if TABLE_CHECK_SAMPLES > 0:
+        report = table.error_report(predictor, encoder, n_samples=TABLE_CHECK_SAMPLES, threshold=DEFAULT_THRESHOLD)
+        logger.info(f"Probability table accuracy vs model: {report}")
+    if TABLE_PATH:
+        table.save(TABLE_PATH)
+    return table
+
+# Everything needed to serve one model version; replaced as a unit on hot reload
+class ModelState:
+    def __init__(self, model, version, encoder, predictor):
+        self.model = model
+        self.version = version
+        self.encoder = encoder
+        self.predictor = predictor
+
+# Load a model artifact and get it ready to serve
+def build_state(model_path):
+    version = artifact_version(model_path)
+    if is_bundle(model_path):
+        # A bundle carries no sklearn Pipeline; its export already checked it against one
+        model = None
+        predictor = FastPredictor.load(model_path)
+        if MODEL_THREADS:
+            set_model_threads(predictor.booster, int(MODEL_THREADS))
+        encoder = FeatureEncoder(FEATURE_MAP, predictor.feature_names)
+        if INFERENCE_MODE == 'pipeline':
+            logger.warning("A model bundle has no sklearn Pipeline; serving it in fast mode")
+    elif INFERENCE_MODE == 'slim':
+        raise ValueError(f"Slim mode needs a model bundle, but {model_path} is not one")
+    else:
+        model = load_model(model_path)
+        if MODEL_THREADS:
+            set_model_threads(model, int(MODEL_THREADS))
+        encoder = build_encoder(model)
+        predictor = build_predictor(model, INFERENCE_MODE, probe=encoder.encode_batch(PROBE_APPLICANTS).copy())
+    if INFERENCE_MODE == 'table':
+        predictor = init_table(predictor, encoder, version)
+    # Run the probe rows once so the first real request doesn't pay for lazy allocations
+    predictor.predict_proba(encoder.encode_batch(PROBE_APPLICANTS))
+    predictor.predict_proba(encoder.encode(*PROBE_APPLICANTS[0]))
+    logger.info(f"Model {version} ready in {predictor.mode} mode")
+    return ModelState(model, version, encoder, predictor)
+
+# Load the golden cases a reloaded model has to reproduce
+def load_golden_cases(path):
+    """
+    Golden cases file: a JSON list of {"applicant": {...}, "prediction": 0 or 1} objects,
+    where applicant is a /predict payload.
+    """
+    with open(path) as f:
+        cases = json.load(f)
+    golden = []
+    for i, case in enumerate(cases):
+        applicant, error = validate_applicant(case.get('applicant'))
+        if error:
+            raise ValueError(f"Golden case {i}: {error}")
+        golden.append((applicant, int(case['prediction'])))
+    return golden
+
+# Golden checks run on a reloaded model before it is swapped in
+def check_state(candidate):
+    if candidate.encoder.feature_names != state.encoder.feature_names:
+        raise ValueError(
+            f"feature columns changed ({candidate.encoder.feature_names} != {state.encoder.feature_names}); "
+            "restart the service to deploy a new schema"
+        )
+    probs = candidate.predictor.predict_proba(candidate.encoder.encode_batch(PROBE_APPLICANTS))
+    if not np.all((probs >= 0) & (probs <= 1)):
+        raise ValueError(f"probabilities outside [0, 1] on probe applicants: {probs}")
+    if GOLDEN_PATH:
+        golden = load_golden_cases(GOLDEN_PATH)
+        probs = candidate.predictor.predict_proba(candidate.encoder.encode_batch([a for a, _ in golden]))
+        failed = [i for i, ((_, expected), prob) in enumerate(zip(golden, probs))
+                  if int(prob >= DEFAULT_THRESHOLD) != expected]
+        if failed:
+            raise ValueError(f"golden cases {failed} of {len(golden)} predicted the wrong class")
+
+# Make a checked model the one being served
+def install_state(new_state):
+    global state
+    # Rebind the cache first so nothing computed by the old model is stored under the new version
+    if cache is not None:
+        cache.bind(new_state.version)
+    state = new_state
+    model_info.set(version=new_state.version, mode=new_state.predictor.mode)
+
+# Turn a probability into the response payload
+def format_result(prob, threshold=DEFAULT_THRESHOLD):
+    pred = int(prob >= threshold)
+    label = "At risk" if pred else "Not at risk"
+    return dict(prediction=pred, probability=round(float(prob), 4), label=label)
+
+# Score encoded rows with the model, routing single rows through the micro-batcher when enabled
+def score_uncached(X, current):
+    if batcher is not None and X.shape[0] == 1:
+        return [batcher.predict(X[0], current.predictor)]
+    return current.predictor.predict_proba(X)
+
+# Score encoded rows, serving repeated feature vectors from the prediction cache
+def score_rows(X, current):
+    if cache is None:
+        return score_uncached(X, current)
+    version = current.version
+    keys = [PredictionCache.key_for(row) for row in X]
+    probs = [cache.get(key) for key in keys]
+    misses = [i for i, prob in enumerate(probs) if prob is None]
+    if misses:
+        fresh = score_uncached(X if len(misses) == len(keys) else X[misses], current)
+        for i, prob in zip(misses, fresh):
+            probs[i] = float(prob)
+            cache.put(keys[i], probs[i], version)
+    return probs
 
 # Predict function
-def predict_risk(model, df, threshold=0.4):
+def predict_risk(X, threshold=DEFAULT_THRESHOLD, current=None):
     try:
-        prob = model.predict_proba(df)[0][1]  # Probability of high risk (class 1)
-        pred = int(prob >= threshold)
-        label = "At risk" if pred else "Not at risk"
-        return dict(prediction=pred, probability=round(float(prob), 4), label=label)
+        prob = score_rows(X, current or state)[0]  # Probability of high risk (class 1)
+        return format_result(prob, threshold)
     except Exception as e:
         logger.error(f"Prediction error: {e}")
         raise
 
+# Batch predict function: one model call for every uncached row in X
+def predict_risk_batch(X, threshold=DEFAULT_THRESHOLD, current=None):
+    try:
+        return [format_result(prob, threshold) for prob in score_rows(X, current or state)]
+    except Exception as e:
+        logger.error(f"Batch prediction error: {e}")
+        raise
+
+# Request and response schemas, declared once (see common/schema.py)
+APPLICANT_SCHEMA = schema.Request(
+    [
+        schema.Field('age', 'int', error='Invalid input types for age, income, or num_people'),
+        schema.Field('income', 'float', error='Invalid input types for age, income, or num_people'),
+        schema.Field('num_people', 'int', error='Invalid input types for age, income, or num_people'),
+        schema.Field('veteran', 'bool', error='Invalid input types for veteran or benefits'),
+        schema.Field('benefits', 'bool', error='Invalid input types for veteran or benefits'),
+        schema.Field('disabled', 'flag', required=False, default=False),
+    ],
+    missing_error='Missing fields: {missing}',
+    not_object_error='Applicant must be a JSON object',
+)
+RESULT_SCHEMA = schema.Object([
+    schema.Field('prediction', 'int'),
+    schema.Field('probability', 'float'),
+    schema.Field('label', 'str'),
+])
+
+# Validate and cast one applicant payload: returns (applicant, None) on success or
+# (None, error_message), where applicant is an (age, income, num_people, veteran, benefits, disabled) tuple
+validate_applicant = APPLICANT_SCHEMA.validate
+
+# JSON response from a response schema (same body as jsonify)
+def schema_response(response_schema, obj):
+    return Response(response_schema.dumps(obj) + '\n', mimetype='application/json')
+
 # Initialize Flask app
 app = Flask(__name__)
 CORS(app)
 
+# Request-level metrics exposed on /metrics
+STAGE_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.1)
+REQUEST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+stage_seconds = metrics.REGISTRY.histogram(
+    'risk_stage_duration_seconds',
+    'Time spent in each stage of a prediction request',
+    STAGE_BUCKETS,
+    labelnames=('endpoint', 'stage'),
+)
+request_seconds = metrics.REGISTRY.histogram(
+    'risk_request_duration_seconds',
+    'End-to-end request handling time',
+    REQUEST_BUCKETS,
+    labelnames=('endpoint',),
+)
+requests_total = metrics.REGISTRY.counter(
+    'risk_requests_total',
+    'Requests handled, by endpoint and HTTP status code',
+    labelnames=('endpoint', 'status'),
+)
+STAGES = ('parse', 'validate', 'encode', 'inference', 'serialize')
+predict_stages = {stage: stage_seconds.labels('/predict', stage) for stage in STAGES}
+batch_stages = {stage: stage_seconds.labels('/predict/batch', stage) for stage in STAGES}
+binary_stages = {stage: stage_seconds.labels('/predict/binary', stage) for stage in STAGES}
+in_flight = metrics.REGISTRY.gauge('risk_requests_in_flight', 'Requests currently being handled')
+model_info = metrics.REGISTRY.info('risk_model_info', 'Model currently being served')
+shed_total = metrics.REGISTRY.counter(
+    'risk_requests_shed_total',
+    'Requests refused by admission control (queue_full, queue_timeout, rate_limited)',
+    labelnames=('endpoint', 'reason'),
+)
+expired_total = metrics.REGISTRY.counter(
+    'risk_requests_expired_total',
+    'Requests dropped because their X-Request-Deadline passed before scoring started',
+    labelnames=('endpoint',),
+)
+
+limiter = ConcurrencyLimiter(MAX_CONCURRENT, MAX_QUEUE, QUEUE_TIMEOUT_MS / 1000, registry=metrics.REGISTRY) if MAX_CONCURRENT > 0 else None
+rate_limiter = RateLimiter(RATE_LIMIT, RATE_BURST, registry=metrics.REGISTRY) if RATE_LIMIT > 0 else None
+
+@app.before_request
+def start_request_metrics():
+    g.request_start = time.perf_counter()
+    in_flight.inc()
+    # Pin the model for the whole request so a concurrent hot swap can't mix two versions
+    g.model_state = state
+    if reloader is not None:
+        reloader.ensure_watching()
+        reloader.poll_requests()
+
+@app.before_request
+def admit_request():
+    """Drop expired work, then apply the per-caller rate limit and the concurrency limit."""
+    endpoint = request.url_rule.rule if request.url_rule is not None else None
+    if endpoint not in ADMISSION_ENDPOINTS or request.environ.get(WARMUP_ENVIRON_KEY):
+        return None
+    try:
+        deadline = parse_deadline(request.headers.get(DEADLINE_HEADER))
+        check_deadline(deadline)
+        if rate_limiter is not None:
+            rate_limiter.check(request.headers.get(CALLER_HEADER) or request.remote_addr)
+        if limiter is not None:
+            limiter.acquire(deadline)
+            g.admitted = True
+    except Rejected as e:
+        if e.reason == 'expired':
+            expired_total.inc(endpoint)
+        else:
+            shed_total.inc(endpoint, e.reason)
+        response = jsonify({'error': str(e)})
+        response.status_code = e.status
+        if e.retry_after is not None:
+            response.headers['Retry-After'] = str(e.retry_after)
+        return response
+    return None
+
+@app.after_request
+def record_request_metrics(response):
+    response.headers['X-Model-Version'] = g.get('model_state', state).version
+    # Warmup traffic is synthetic; keep it out of the request metrics
+    if request.environ.get(WARMUP_ENVIRON_KEY):
+        return response
+    endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    timer = g.get('stage_timer')
+    if timer is not None:
+        timer.flush()
+    requests_total.inc(endpoint, str(response.status_code))
+    request_seconds.observe(time.perf_counter() - g.request_start, endpoint)
+    return response
+
+@app.teardown_request
+def finish_request_metrics(exc):
+    in_flight.dec()
+    if g.pop('admitted', False):
+        limiter.release()
+
 # Load model on startup
+DEFAULT_MODEL_FILE = 'xgboost_risk_model.bundle.npz' if INFERENCE_MODE == 'slim' else 'xgboost_risk_model.pkl'
+MODEL_PATH = os.getenv('XGBOOST_MODEL_PATH', os.path.join(BASE_DIR, '..', 'app', DEFAULT_MODEL_FILE))
+
 def init_model():
-    model_path = os.getenv('XGBOOST_MODEL_PATH', os.path.join(BASE_DIR, '..', 'app', 'xgboost_risk_model.pkl'))
-    return load_model(model_path)
+    return build_state(MODEL_PATH)
 
 try:
-    model = init_model()
+    state = init_model()
+    logger.info(f"Serving predictions in {state.predictor.mode} mode")
+    batcher = None
+    if MICROBATCH_ENABLED:
+        # Each row is queued with the predictor pinned to its request, so a hot swap during
+        # the batching window can't score a row with a model other than the one it reports
+        batcher = MicroBatcher(
+            None,
+            state.encoder.n_features,
+            max_batch_size=MICROBATCH_MAX_SIZE,
+            max_wait_ms=MICROBATCH_WINDOW_MS,
+            registry=metrics.REGISTRY,
+        )
+    cache = None
+    if CACHE_MAX_ENTRIES > 0:
+        cache = PredictionCache(
+            max_entries=CACHE_MAX_ENTRIES,
+            max_bytes=int(CACHE_MAX_MB * 1024 * 1024),
+            ttl_seconds=CACHE_TTL_SECONDS,
+            registry=metrics.REGISTRY,
+        )
+        cache.bind(state.version)
+    model_info.set(version=state.version, mode=state.predictor.mode)
+    reloader = ModelReloader(
+        MODEL_PATH, build_state, check_state, install_state,
+        current_version_fn=lambda: state.version,
+        interval=MODEL_WATCH_INTERVAL,
+        registry=metrics.REGISTRY,
+    )
 except Exception as e:
     logger.critical(f"Failed to load model: {e}")
     raise
@@ -88,38 +446,206 @@ except Exception as e:
 @app.route('/predict', methods=['POST'])
 def predict_endpoint():
     try:
+        timer = g.stage_timer = metrics.StageTimer(predict_stages)
+        data = json.loads(request.get_data(cache=False))
+        timer.mark('parse')
+        applicant, error = validate_applicant(data)
+        timer.mark('validate')
+        if error:
+            return jsonify({'error': error}), 400
+
+        # Build features and predict
+        current = g.model_state
+        X = current.encoder.encode(*applicant)
+        timer.mark('encode')
+        result = predict_risk(X, threshold=DEFAULT_THRESHOLD, current=current)
+        timer.mark('inference')
+        response = schema_response(RESULT_SCHEMA, result)
+        timer.mark('serialize')
+        return response
+
+    except Exception as e:
+        logger.error(f"Prediction error: {e}")
+        return jsonify({'error': 'Prediction error'}), 500
+
+@app.route('/predict/batch', methods=['POST'])
+def predict_batch_endpoint():
+    try:
+        timer = g.stage_timer = metrics.StageTimer(batch_stages)
         data = request.get_json(force=True)
-        required = ['age', 'income', 'num_people', 'veteran', 'benefits']
-        missing = [f for f in required if f not in data]
-        if missing:
-            return jsonify({'error': f"Missing fields: {missing}"}), 400
+        timer.mark('parse')
+        applicants = data.get('applicants') if isinstance(data, dict) else None
+        if not isinstance(applicants, list):
+            return jsonify({'error': "Request body must contain an 'applicants' list"}), 400
+        if len(applicants) > MAX_BATCH_SIZE:
+            return jsonify({'error': f"Batch size {len(applicants)} exceeds limit of {MAX_BATCH_SIZE}"}), 413
 
-        # Validate input types
-        try:
-            age = int(data['age'])
-            income = float(data['income'])
-            num_people = int(data['num_people'])
-        except (ValueError, TypeError):
-            return jsonify({'error': 'Invalid input types for age, income, or num_people'}), 400
+        # Validate every item; invalid items get a per-item error instead of failing the batch
+        results = [None] * len(applicants)
+        valid_idx, valid = [], []
+        for i, item in enumerate(applicants):
+            applicant, error = validate_applicant(item)
+            if error:
+                results[i] = {'index': i, 'error': error}
+            else:
+                valid_idx.append(i)
+                valid.append(applicant)
+        timer.mark('validate')
 
-        # Validate boolean inputs
-        if not isinstance(data['veteran'], bool) or not isinstance(data['benefits'], bool):
-            return jsonify({'error': 'Invalid input types for veteran or benefits'}), 400
-        veteran = data['veteran']
-        benefits = data['benefits']
+        # Score all valid items with a single model call
+        if valid:
+            current = g.model_state
+            X = current.encoder.encode_batch(valid)
+            timer.mark('encode')
+            for i, result in zip(valid_idx, predict_risk_batch(X, threshold=DEFAULT_THRESHOLD, current=current)):
+                results[i] = {'index': i, **result}
+            timer.mark('inference')
 
-        # Optional field
-        disabled = bool(data.get('disabled', False))
+        response = jsonify({
+            'results': results,
+            'count': len(results),
+            'errors': len(results) - len(valid),
+        })
+        timer.mark('serialize')
+        return response
 
-        # Build features and predict
-        df = prepare_features(age, income, num_people, veteran, benefits, disabled)
-        result = predict_risk(model, df, threshold=0.4)
-        return jsonify(result)
+    except Exception as e:
+        logger.error(f"Batch prediction error: {e}")
+        return jsonify({'error': 'Prediction error'}), 500
+
+@app.route('/predict/binary', methods=['POST'])
+def predict_binary_endpoint():
+    try:
+        timer = g.stage_timer = metrics.StageTimer(binary_stages)
+        arrow = request.mimetype == columnar.ARROW_CONTENT_TYPE
+        if not arrow and request.mimetype != columnar.CONTENT_TYPE:
+            return jsonify({'error': f"Content-Type must be {columnar.CONTENT_TYPE} or {columnar.ARROW_CONTENT_TYPE}"}), 415
+        try:
+            # Columns are views over the request body; nothing is copied before encoding
+            body = request.get_data(cache=False)
+            names, columns = columnar.decode_arrow(body) if arrow else columnar.decode_request(body)
+            timer.mark('parse')
+            if columns and len(columns[0]) > MAX_BATCH_SIZE:
+                return jsonify({'error': f"Batch size {len(columns[0])} exceeds limit of {MAX_BATCH_SIZE}"}), 413
+            columnar.check_columns(names, columns)
+        except columnar.PayloadError as e:
+            return jsonify({'error': str(e)}), 400
+        timer.mark('validate')
+
+        # Score the whole batch with a single model call (the prediction cache is skipped)
+        current = g.model_state
+        X = current.encoder.encode_columns(names, columns)
+        timer.mark('encode')
+        probs = score_uncached(X, current) if len(X) else []
+        timer.mark('inference')
+        if arrow:
+            response = Response(columnar.encode_arrow(probs), mimetype=columnar.ARROW_CONTENT_TYPE)
+        else:
+            response = Response(columnar.encode_response(probs), mimetype=columnar.RESPONSE_CONTENT_TYPE)
+        response.headers['X-Risk-Threshold'] = str(DEFAULT_THRESHOLD)
+        timer.mark('serialize')
+        return response
 
     except Exception as e:
-        logger.error(f"Prediction error: {e}")
+        logger.error(f"Binary prediction error: {e}")
         return jsonify({'error': 'Prediction error'}), 500
 
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    return Response(metrics.REGISTRY.render(), content_type=metrics.CONTENT_TYPE)
+
+@app.route('/admin/reload', methods=['POST'])
+def admin_reload_endpoint():
+    # Disabled unless an admin token is configured
+    if not ADMIN_TOKEN:
+        return jsonify({'error': 'Not found'}), 404
+    supplied = request.headers.get('Authorization', '').removeprefix('Bearer ')
+    if not hmac.compare_digest(supplied.encode(), ADMIN_TOKEN.encode()):
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    # Reloads this worker and asks every other worker to reload on its next request
+    options = request.get_json(force=True, silent=True) or {}
+    force = bool(options.get('force', False))
+    if options.get('wait', False):
+        result = reloader.request_reload(force=force, wait=True)
+        return jsonify(result), 409 if result['status'] in ('rejected', 'failed') else 200
+    reloader.request_reload(force=force)
+    return jsonify({'status': 'started', 'version': state.version}), 202
+
+@app.route('/healthz', methods=['GET'])
+def healthz_endpoint():
+    # Liveness: the process is up and serving HTTP
+    return jsonify({'status': 'ok'})
+
+@app.route('/readyz', methods=['GET'])
+def readyz_endpoint():
+    # Readiness: this process has finished its warmup
+    if ready_pid != os.getpid():
+        return jsonify({'status': 'warming up'}), 503
+    return jsonify({'status': 'ready', 'version': state.version, 'warmup_seconds': round(warmup_seconds, 3)})
+
+# Synthetic applicants for warmup
+def synthetic_applicants(n, seed=0):
+    rng = random.Random(seed)
+    return [
+        {
+            'age': rng.randint(18, 90),
+            'income': float(rng.randint(0, 150000)),
+            'num_people': rng.randint(1, 8),
+            'veteran': rng.random() < 0.1,
+            'benefits': rng.random() < 0.3,
+            'disabled': rng.random() < 0.15,
+        }
+        for _ in range(n)
+    ]
+
+# Process that completed warmup; a gunicorn worker forked from a preloaded master is not
+# warm (its request threads, buffers and micro-batcher are new), so it warms up again
+ready_pid = None
+warmup_seconds = None
+
+def warmup():
+    """
+    Send WARMUP_REQUESTS single /predict calls and one /predict/batch call of WARMUP_BATCH_SIZE
+    applicants through the Flask test client, so the first real requests don't pay for lazy
+    allocations and cold code paths. Marks this process ready for /readyz when done.
+    """
+    global ready_pid, warmup_seconds
+    if ready_pid == os.getpid():
+        return
+    start = time.perf_counter()
+    client = app.test_client()
+    environ = {WARMUP_ENVIRON_KEY: True}
+    applicants = synthetic_applicants(WARMUP_REQUESTS + WARMUP_BATCH_SIZE)
+
+    latencies = []
+    for payload in applicants[:WARMUP_REQUESTS]:
+        sent = time.perf_counter()
+        resp = client.post('/predict', json=payload, environ_base=environ)
+        latencies.append(time.perf_counter() - sent)
+        if resp.status_code != 200:
+            raise RuntimeError(f"Warmup /predict failed with {resp.status_code}: {resp.get_data(as_text=True)}")
+    if WARMUP_BATCH_SIZE > 0:
+        resp = client.post('/predict/batch', json={'applicants': applicants[WARMUP_REQUESTS:]}, environ_base=environ)
+        if resp.status_code != 200:
+            raise RuntimeError(f"Warmup /predict/batch failed with {resp.status_code}: {resp.get_data(as_text=True)}")
+
+    warmup_seconds = time.perf_counter() - start
+    ready_pid = os.getpid()
+    if latencies:
+        logger.info(
+            f"Warmup finished in {warmup_seconds:.3f}s ({len(latencies)} requests + batch of {WARMUP_BATCH_SIZE}; "
+            f"first request {latencies[0] * 1000:.2f}ms, last {latencies[-1] * 1000:.2f}ms)"
+        )
+    else:
+        logger.info(f"Warmup finished in {warmup_seconds:.3f}s")
+
+try:
+    warmup()
+except Exception as e:
+    logger.critical(f"Warmup failed: {e}")
+    raise
+
 if __name__ == '__main__':
     port = int(os.getenv('PORT', 5000))
     app.run(host='0.0.0.0', port=port)
@@ -0,0 +1,245 @@
+import bisect
+import threading
+import time
+
+# Minimal in-process metrics with Prometheus text exposition (format 0.0.4).
+# Kept dependency-free so every serving mode can use it.
+
+
+def _format_labels(labelnames, labelvalues, extra=None):
+    pairs = list(zip(labelnames, labelvalues))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    body = ",".join(f'{k}="{str(v)}"' for k, v in pairs)
+    return "{" + body + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class Counter:
+    """Monotonic counter, optionally split by labels."""
+
+    type = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues, amount=1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def value(self, *labelvalues):
+        return self._values.get(labelvalues, 0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        if not items and not self.labelnames:
+            items = [((), 0)]
+        for labelvalues, value in items:
+            yield self.name + _format_labels(self.labelnames, labelvalues), value
+
+
+class Gauge:
+    """Point-in-time value; pass fn to read the value lazily at scrape time."""
+
+    type = "gauge"
+
+    def __init__(self, name, documentation, fn=None):
+        self.name = name
+        self.documentation = documentation
+        self._fn = fn
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def set(self, value):
+        self._value = value
+
+    def inc(self, amount=1):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount=1):
+        with self._lock:
+            self._value -= amount
+
+    def value(self):
+        return self._fn() if self._fn is not None else self._value
+
+    def samples(self):
+        yield self.name, self.value()
+
+
+class CallbackCounter(Gauge):
+    """Counter whose value is maintained elsewhere and read through fn at scrape time."""
+
+    type = "counter"
+
+    def __init__(self, name, documentation, fn):
+        super().__init__(name, documentation, fn)
+
+
+class Histogram:
+    """Cumulative-bucket histogram, optionally split by labels."""
+
+    type = "histogram"
+
+    def __init__(self, name, documentation, buckets, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self.labelnames = tuple(labelnames)
+        self._series = {}  # labelvalues -> [bucket counts..., sum]
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self.labels()
+
+    def labels(self, *labelvalues):
+        """Return the child series for these label values; bind it once and reuse it on hot paths."""
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+        return _HistogramChild(self, series)
+
+    def observe(self, value, *labelvalues):
+        self.labels(*labelvalues).observe(value)
+
+    def count(self, *labelvalues):
+        series = self._series.get(labelvalues)
+        return sum(series[:-1]) if series else 0
+
+    def samples(self):
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        bounds = self.buckets + (float("inf"),)
+        for labelvalues, series in items:
+            cumulative = 0
+            for bound, count in zip(bounds, series[:-1]):
+                cumulative += count
+                labels = _format_labels(self.labelnames, labelvalues, ("le", _format_value(float(bound))))
+                yield self.name + "_bucket" + labels, cumulative
+            labels = _format_labels(self.labelnames, labelvalues)
+            yield self.name + "_sum" + labels, series[-1]
+            yield self.name + "_count" + labels, cumulative
+
+
+class _HistogramChild:
+    """One labelled series of a Histogram."""
+
+    __slots__ = ("buckets", "lock", "series")
+
+    def __init__(self, parent, series):
+        self.buckets = parent.buckets
+        self.lock = parent._lock
+        self.series = series
+
+    def record(self, value):
+        # Caller must hold self.lock
+        self.series[bisect.bisect_left(self.buckets, value)] += 1
+        self.series[-1] += value
+
+    def observe(self, value):
+        with self.lock:
+            self.record(value)
+
+
+class Info:
+    """Constant 1-valued series whose labels describe the running process (e.g. model version)."""
+
+    type = "gauge"
+
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        self._labels = {}
+
+    def set(self, **labels):
+        self._labels = dict(labels)
+
+    def samples(self):
+        yield self.name + _format_labels(tuple(self._labels), tuple(self._labels.values())), 1
+
+
+class StageTimer:
+    """
+    Times successive stages of a request.
+    stages maps stage name -> bound histogram child (Histogram.labels(...)); mark() only
+    reads the clock and appends, and flush() records every stage under one lock.
+    """
+
+    __slots__ = ("stages", "_last", "_pending")
+
+    def __init__(self, stages):
+        self.stages = stages
+        self._pending = []
+        self._last = time.perf_counter()
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        self._pending.append((self.stages[stage], now - self._last))
+        self._last = now
+
+    def flush(self):
+        pending = self._pending
+        if pending:
+            with pending[0][0].lock:
+                for child, duration in pending:
+                    child.record(duration)
+            self._pending = []
+
+
+class Registry:
+    """Collection of metrics rendered together by the /metrics endpoint."""
+
+    def __init__(self):
+        self._metrics = {}
+
+    def register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, fn=None):
+        return self.register(Gauge(name, documentation, fn))
+
+    def counter_fn(self, name, documentation, fn):
+        return self.register(CallbackCounter(name, documentation, fn))
+
+    def histogram(self, name, documentation, buckets, labelnames=()):
+        return self.register(Histogram(name, documentation, buckets, labelnames))
+
+    def info(self, name, documentation):
+        return self.register(Info(name, documentation))
+
+    def render(self):
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for sample, value in metric.samples():
+                lines.append(f"{sample} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+# Content type expected by Prometheus scrapers
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Process-wide registry shared by the service modules
+REGISTRY = Registry()
@@ -1,8 +1,11 @@
 import os
+import sys
 import argparse
 import logging
-import pandas as pd
-import joblib
+from features import FeatureEncoder, passthrough, negated, constant
+from features import FEATURE_MAP as SERVICE_FEATURE_MAP
+from batch_io import CsvWriter, JsonlWriter, read_csv_chunks, read_jsonl_chunks, score_chunks
+from scoring_daemon import DEFAULT_SOCKET, ScoringDaemon, request as daemon_request
 
 # Setup logging
 def setup_logger():
@@ -40,71 +43,136 @@ def load_artifacts(model_path, scaler_path):
         logger.error(f"Scaler file not found at {scaler_path}")
         raise FileNotFoundError(scaler_path)
 
+    import joblib
     model = joblib.load(model_path)
     scaler = joblib.load(scaler_path)
     logger.info(f"Loaded model from {model_path}")
     logger.info(f"Loaded scaler from {scaler_path}")
     return model, scaler
 
+# How each model feature is derived from the raw applicant fields.
+# The CLI assumes no disabled household member, no adult children, and
+# treats veterans as MILHH=2 (1 person, veteran) and everyone else as MILHH=6 (no service).
+FEATURE_MAP = {
+    "AGE": passthrough("age"),
+    "HINCP": passthrough("income"),
+    "HHADLTKIDS": constant(0),
+    "disabled_person_in_household_yes": constant(0),
+    "disabled_person_in_household_no": constant(1),
+    "military_1person_active": constant(0),
+    "military_1person_veteran": passthrough("veteran"),
+    "military_2plus_active_no_veterans": constant(0),
+    "military_2plus_veterans": constant(0),
+    "military_2plus_mix_active_veterans": constant(0),
+    "military_no_service": negated("veteran"),
+    "no_government_assistance": negated("benefits"),
+    "government_assistance": passthrough("benefits"),
+}
+
+# Load a model bundle exported by training (no scikit-learn needed)
+def load_bundle(bundle_path):
+    from predictors import FastPredictor
+    if not os.path.isfile(bundle_path):
+        logger.error(f"Model bundle not found at {bundle_path}")
+        raise FileNotFoundError(bundle_path)
+    return FastPredictor.load(bundle_path)
+
+# Build the encoder for a bundle from its own feature schema
+def build_bundle_encoder(predictor):
+    # Bundles from model_training.py use the service's columns; this CLI's map covers the legacy ones
+    return FeatureEncoder({**SERVICE_FEATURE_MAP, **FEATURE_MAP}, predictor.feature_names)
+
+# Build the feature encoder in the column order the scaler was fitted with
+def build_encoder(scaler):
+    feature_names = getattr(scaler, 'feature_names_in_', None)
+    if feature_names is None:
+        feature_names = FEATURE_ORDER
+    return FeatureEncoder(FEATURE_MAP, feature_names)
+
 # Prepare applicant features
-def prepare_features(age, income, veteran, benefits):
-    raw = {
-        "AGE": age,
-        "HINCP": income,
-        "HHADLTKIDS": 0,            # default
-        "DISHH": 0,                 # assume no disabled
-        "MILHH": 2 if veteran else 6,
-        "FS": 1 if benefits else 0,
-        "PAP": 0,
-    }
-    # one-hot init
-    feat = {f: 0 for f in FEATURE_ORDER}
-    # numeric
-    feat["AGE"] = raw["AGE"]
-    feat["HINCP"] = raw["HINCP"]
-    feat["HHADLTKIDS"] = raw["HHADLTKIDS"]
-    # disabled
-    if raw["DISHH"] == 1:
-        feat["disabled_person_in_household_yes"] = 1
-    else:
-        feat["disabled_person_in_household_no"] = 1
-    # military mapping
-    mil_map = {
-        1: "military_1person_active",
-        2: "military_1person_veteran",
-        3: "military_2plus_active_no_veterans",
-        4: "military_2plus_veterans",
-        5: "military_2plus_mix_active_veterans",
-        6: "military_no_service",
-    }
-    mil_key = mil_map.get(raw["MILHH"])
-    feat[mil_key] = 1
-    # government assistance
-    if raw["FS"] == 1 or raw["PAP"] > 0:
-        feat["government_assistance"] = 1
-    else:
-        feat["no_government_assistance"] = 1
-    # return DataFrame
-    df = pd.DataFrame([feat], columns=FEATURE_ORDER)
-    return df
+def prepare_features(encoder, age, income, veteran, benefits, num_people=1, disabled=False):
+    return encoder.encode(age, income, num_people, veteran, benefits, disabled)
 
 # Predict function
-def predict_risk(model, scaler, df, threshold=0.5):
-    # Reorder and align DataFrame to scaler's expected feature names
-    try:
-        feature_names = getattr(scaler, 'feature_names_in_', None)
-        if feature_names is not None:
-            df = df.reindex(columns=feature_names)
-        X = df.to_numpy()
-    except Exception as e:
-        logger.error(f"Error aligning features for scaler: {e}")
-        raise
-
+def predict_risk(model, scaler, X, threshold=0.5):
+    # X is already in the scaler's column order (see build_encoder)
     # Scale features
     X_scaled = scaler.transform(X)
     # Predict probability for positive class
     prob = model.predict_proba(X_scaled)[0][1]
-    # Apply threshold to determine label
+    return format_result(prob, threshold)
+
+# Predict with a model bundle
+def predict_risk_bundle(predictor, X, threshold=0.5):
+    prob = predictor.predict_proba(X)[0]
+    return format_result(prob, threshold)
+
+# Vectorized probability function for the streaming mode: (n, n_features) rows -> (n,) probabilities
+def legacy_predict_proba(model, scaler):
+    return lambda X: model.predict_proba(scaler.transform(X))[:, 1]
+
+# Load the artifacts once and return (encoder, predict_proba) for vectorized scoring
+def load_scorer(bundle_path=None, model_path="xgboost_model.pkl", scaler_path="scaler.pkl", n_threads=None):
+    from predictors import set_model_threads
+    if bundle_path:
+        predictor = load_bundle(bundle_path)
+        if n_threads:
+            set_model_threads(predictor.booster, n_threads)
+        return build_bundle_encoder(predictor), predictor.predict_proba
+    model, scaler = load_artifacts(model_path, scaler_path)
+    if n_threads:
+        set_model_threads(model, n_threads)
+    return build_encoder(scaler), legacy_predict_proba(model, scaler)
+
+# Open --input/--output, where "-" means stdin/stdout
+def open_stream(path, mode):
+    if path == "-":
+        return sys.stdin if "r" in mode else sys.stdout
+    return open(path, mode, newline="")
+
+# Input/output format from an explicit flag or the file extension (JSONL by default)
+def stream_format(path, explicit):
+    if explicit:
+        return explicit
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+# Score a JSONL/CSV stream in chunks
+def score_stream(encoder, predict_proba, input_path, output_path, input_format=None, output_format=None,
+                 chunk_size=10000, threshold=0.5):
+    input_format = stream_format(input_path, input_format)
+    output_format = stream_format(output_path, output_format)
+    source = open_stream(input_path, "r")
+    sink = open_stream(output_path, "w")
+    try:
+        read_chunks = read_csv_chunks if input_format == "csv" else read_jsonl_chunks
+        writer = CsvWriter(sink) if output_format == "csv" else JsonlWriter(sink)
+        stats = score_chunks(read_chunks(source, chunk_size), encoder, predict_proba, writer, threshold)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+    logger.info(f"Done: {stats['rows']} rows, {stats['scored']} scored, {stats['errors']} rejected")
+    return stats
+
+# Artifact files a run scores with; the daemon only answers for the same ones
+def artifact_paths(bundle_path, model_path, scaler_path):
+    return [os.path.abspath(p) for p in ([bundle_path] if bundle_path else [model_path, scaler_path])]
+
+# Score one applicant with a running daemon; None when there isn't one (or it serves other artifacts)
+def predict_risk_daemon(socket_path, artifacts, applicant, threshold=0.5):
+    response = daemon_request(socket_path, {"artifacts": artifacts, "applicants": [applicant]})
+    if response is None:
+        return None
+    if "error" in response:
+        logger.info(f"Not using the scoring daemon: {response['error']}")
+        return None
+    if response["errors"][0]:
+        raise ValueError(response["errors"][0])
+    return format_result(response["probabilities"][0], threshold)
+
+# Apply threshold to determine label
+def format_result(prob, threshold=0.5):
     pred = int(prob >= threshold)
     label = "At risk" if pred else "Not at risk"
     return dict(prediction=pred, probability=round(float(prob),4), label=label)
@@ -112,18 +180,58 @@ def predict_risk(model, scaler, df, threshold=0.5):
 # CLI entry point
 def main():
     parser = argparse.ArgumentParser(description="Predict risk based on applicant data.")
-    parser.add_argument("--age", type=int, required=True, help="Applicant age")
-    parser.add_argument("--income", type=float, required=True, help="Annual household income")
+    parser.add_argument("--age", type=int, help="Applicant age")
+    parser.add_argument("--income", type=float, help="Annual household income")
     parser.add_argument("--veteran", action="store_true", help="Flag if applicant is a veteran")
     parser.add_argument("--benefits", action="store_true", help="Flag if applicant receives benefits")
+    parser.add_argument("--num-people", type=int, default=1, help="Household size (bundle models only)")
+    parser.add_argument("--disabled", action="store_true", help="Flag if a household member is disabled (bundle models only)")
     parser.add_argument("--threshold", type=float, default=0.5, help="Classification threshold")
     parser.add_argument("--model", type=str, default="xgboost_model.pkl", help="Path to model file")
     parser.add_argument("--scaler", type=str, default="scaler.pkl", help="Path to scaler file")
+    parser.add_argument("--bundle", type=str, help="Path to a model bundle; replaces --model and --scaler")
+    parser.add_argument("--input", type=str, help="Score every applicant in this JSONL/CSV file ('-' for stdin)")
+    parser.add_argument("--output", type=str, default="-", help="Where to write results with --input ('-' for stdout)")
+    parser.add_argument("--input-format", choices=["jsonl", "csv"], help="Input format (default: from the file extension, else jsonl)")
+    parser.add_argument("--output-format", choices=["jsonl", "csv"], help="Output format (default: from the file extension, else jsonl)")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="Applicants read, encoded and scored at a time")
+    parser.add_argument("--serve", action="store_true", help="Run as a daemon that keeps the artifacts loaded and scores over --socket")
+    parser.add_argument("--socket", type=str, default=DEFAULT_SOCKET, help="Unix socket of the scoring daemon")
+    parser.add_argument("--no-daemon", action="store_true", help="Always score in-process, even if a daemon is running")
     args = parser.parse_args()
+    if not args.serve and args.input is None and (args.age is None or args.income is None):
+        parser.error("--age and --income are required unless --input or --serve is given")
+
+    artifacts = artifact_paths(args.bundle, args.model, args.scaler)
+    if args.serve:
+        daemon = ScoringDaemon(args.socket, artifacts, lambda: load_scorer(args.bundle, args.model, args.scaler))
+        daemon.serve_forever()
+        return
+
+    if args.input is not None:
+        encoder, predict_proba = load_scorer(args.bundle, args.model, args.scaler)
+        score_stream(encoder, predict_proba, args.input, args.output, args.input_format, args.output_format,
+                     chunk_size=args.chunk_size, threshold=args.threshold)
+        return
 
-    model, scaler = load_artifacts(args.model, args.scaler)
-    df = prepare_features(args.age, args.income, args.veteran, args.benefits)
-    result = predict_risk(model, scaler, df, threshold=args.threshold)
+    if not args.no_daemon:
+        applicant = dict(age=args.age, income=args.income, veteran=args.veteran, benefits=args.benefits,
+                         num_people=args.num_people, disabled=args.disabled)
+        result = predict_risk_daemon(args.socket, artifacts, applicant, threshold=args.threshold)
+        if result is not None:
+            print(result)
+            return
+
+    if args.bundle:
+        predictor = load_bundle(args.bundle)
+        encoder = build_bundle_encoder(predictor)
+        X = prepare_features(encoder, args.age, args.income, args.veteran, args.benefits, args.num_people, args.disabled)
+        result = predict_risk_bundle(predictor, X, threshold=args.threshold)
+    else:
+        model, scaler = load_artifacts(args.model, args.scaler)
+        encoder = build_encoder(scaler)
+        X = prepare_features(encoder, args.age, args.income, args.veteran, args.benefits)
+        result = predict_risk(model, scaler, X, threshold=args.threshold)
     print(result)
 
 if __name__ == "__main__":
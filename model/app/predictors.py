@@ -0,0 +1,228 @@
+import argparse
+import logging
+import os
+import numpy as np
+from bundle import read_bundle, write_bundle
+
+logger = logging.getLogger(__name__)
+
+# Every RISK_INFERENCE_MODE the service accepts, and the ones build_predictor handles
+# ("slim" serves a bundle through FastPredictor.load instead)
+INFERENCE_MODES = ("fast", "pipeline", "table", "slim")
+PREDICTOR_MODES = ("fast", "pipeline", "table")
+
+
+class PipelinePredictor:
+    """Score through the full sklearn Pipeline (ColumnTransformer -> RobustScaler -> XGBoost)."""
+
+    mode = "pipeline"
+
+    def __init__(self, pipeline):
+        # Imported here so slim mode never loads pandas
+        import pandas as pd
+
+        self.pipeline = pipeline
+        self.feature_names = getattr(pipeline, 'feature_names_in_', None)
+        self._DataFrame = pd.DataFrame
+
+    def predict_proba(self, X):
+        """Return the positive-class probability for each row of the float32 matrix X."""
+        # The ColumnTransformer selects columns by name, so a pipeline fitted on a
+        # DataFrame gets a zero-copy frame wrapped around the encoded buffer.
+        if self.feature_names is not None:
+            X = self._DataFrame(X, columns=self.feature_names, copy=False)
+        return self.pipeline.predict_proba(X)[:, 1]
+
+
+class FastPredictor:
+    """
+    Score with the fitted XGBoost booster directly, skipping sklearn's Pipeline machinery.
+
+    The ColumnTransformer's column selection and the RobustScaler constants are extracted
+    once at load time into a gather index plus center/scale vectors. Scaling replays
+    RobustScaler's own in-place subtract-then-divide on float32, so the booster sees the
+    exact same values as through the Pipeline.
+
+    save/load round-trip the predictor through a model bundle (booster in XGBoost's
+    native format plus the scaling constants and feature schema), which serves without
+    pandas or scikit-learn.
+    """
+
+    mode = "fast"
+
+    def __init__(self, booster, order, center, scale, iteration_range=(0, 0), feature_names=None):
+        self.booster = booster
+        self.order = np.asarray(order, dtype=np.intp)
+        self.center = np.asarray(center, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.iteration_range = iteration_range
+        self.feature_names = feature_names
+        self.manifest = None
+
+    @classmethod
+    def from_pipeline(cls, pipeline):
+        """Build from the Pipeline produced by create_pipeline in model_training.py."""
+        steps = getattr(pipeline, 'named_steps', None)
+        if not steps or 'preprocessor' not in steps or 'classifier' not in steps:
+            raise ValueError("expected a Pipeline with 'preprocessor' and 'classifier' steps")
+        preprocessor = steps['preprocessor']
+        classifier = steps['classifier']
+
+        if getattr(classifier, 'objective', None) != 'binary:logistic':
+            raise ValueError(f"unsupported objective: {getattr(classifier, 'objective', None)}")
+
+        input_names = list(getattr(preprocessor, 'feature_names_in_', []))
+
+        def column_index(col):
+            if isinstance(col, str):
+                return input_names.index(col)
+            return int(col)
+
+        # Walk the fitted transformers in output order
+        order, center, scale = [], [], []
+        for name, transformer, columns in preprocessor.transformers_:
+            if isinstance(transformer, str) and transformer == 'drop':
+                continue
+            idx = [column_index(c) for c in np.atleast_1d(columns)]
+            if _is_passthrough(transformer):
+                order.extend(idx)
+                center.extend([0.0] * len(idx))
+                scale.extend([1.0] * len(idx))
+            elif type(transformer).__name__ == 'RobustScaler':
+                order.extend(idx)
+                center.extend(transformer.center_ if transformer.center_ is not None else [0.0] * len(idx))
+                scale.extend(transformer.scale_ if transformer.scale_ is not None else [1.0] * len(idx))
+            else:
+                raise ValueError(f"unsupported transformer '{name}': {type(transformer).__name__}")
+
+        best_iteration = getattr(classifier, 'best_iteration', None)
+        iteration_range = (0, best_iteration + 1) if best_iteration is not None else (0, 0)
+        return cls(classifier.get_booster(), order, center, scale, iteration_range, input_names or None)
+
+    def save(self, path, feature_types=None, metrics=None, **extra):
+        """Write this predictor as a model bundle (see bundle.py); returns the bundle manifest."""
+        if self.feature_names is None:
+            raise ValueError("a model bundle needs the model's feature names")
+        return write_bundle(
+            path, self.booster, self.order, self.center, self.scale, self.feature_names,
+            feature_types=feature_types, iteration_range=self.iteration_range, metrics=metrics, **extra,
+        )
+
+    @classmethod
+    def load(cls, path):
+        """Load a model bundle written by save() or by training; imports only NumPy and xgboost."""
+        import xgboost as xgb
+
+        bundle = read_bundle(path)
+        booster = xgb.Booster()
+        booster.load_model(bytearray(bundle["booster"]))
+        # Copy the small arrays out of the memory map so nothing refers to the file afterwards
+        predictor = cls(
+            booster, np.array(bundle["order"]), np.array(bundle["center"]), np.array(bundle["scale"]),
+            tuple(int(i) for i in bundle["iteration_range"]), bundle.feature_names,
+        )
+        predictor.manifest = bundle.manifest
+        logger.info(f"Loaded model bundle {bundle.content_hash[:12]} from {path} (metrics: {bundle.metrics})")
+        return predictor
+
+    def transform(self, X):
+        """Apply the fused column selection and robust scaling to a float32 matrix."""
+        Xt = X[:, self.order]  # fancy indexing returns a fresh float32 copy
+        Xt -= self.center
+        Xt /= self.scale
+        return Xt
+
+    def predict_proba(self, X):
+        """Return the positive-class probability for each row of the float32 matrix X."""
+        return self.booster.inplace_predict(self.transform(X), iteration_range=self.iteration_range)
+
+
+def _is_passthrough(transformer):
+    if isinstance(transformer, str):
+        return transformer == 'passthrough'
+    # Recent sklearn versions store the fitted remainder as an identity FunctionTransformer
+    return type(transformer).__name__ == 'FunctionTransformer' and transformer.func is None
+
+
+def set_model_threads(model, n_threads):
+    """Pin the number of threads XGBoost uses for inference (a Pipeline, classifier or bare Booster)."""
+    steps = getattr(model, 'named_steps', {})
+    classifier = steps.get('classifier') if steps else model
+    if hasattr(classifier, 'get_booster'):
+        # Assigned directly: set_params would push every estimator param to the booster
+        classifier.n_jobs = n_threads
+        classifier.get_booster().set_param('nthread', n_threads)
+    elif hasattr(classifier, 'set_param'):
+        classifier.set_param('nthread', n_threads)
+    else:
+        return
+    logger.info(f"Model inference pinned to {n_threads} thread(s)")
+
+
+def build_predictor(model, mode="fast", probe=None):
+    """
+    Wrap a loaded model for inference.
+    mode: "fast" for direct booster inference, "pipeline" for the full sklearn Pipeline
+          ("table" mode builds on the fast predictor, see lookup_table.py)
+    probe: optional encoded rows used to check the fast path against the Pipeline
+    Falls back to the Pipeline when the model can't be served on the fast path; an unknown
+    mode raises ValueError.
+    """
+    if mode not in PREDICTOR_MODES:
+        raise ValueError(f"Unknown inference mode {mode!r}; expected one of {', '.join(PREDICTOR_MODES)}")
+    pipeline_predictor = PipelinePredictor(model)
+    if mode == "pipeline":
+        return pipeline_predictor
+
+    try:
+        fast_predictor = FastPredictor.from_pipeline(model)
+    except ValueError as e:
+        logger.warning(f"Fast inference unavailable ({e}); using pipeline mode")
+        return pipeline_predictor
+
+    if probe is not None:
+        expected = pipeline_predictor.predict_proba(probe)
+        actual = fast_predictor.predict_proba(probe)
+        if not np.allclose(expected, actual, rtol=0, atol=1e-6):
+            logger.warning("Fast inference disagrees with the Pipeline on probe rows; using pipeline mode")
+            return pipeline_predictor
+
+    return fast_predictor
+
+
+def main():
+    import joblib
+    from artifacts import artifact_version
+    from features import FEATURE_MAP, FeatureEncoder
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Export a trained pipeline as a model bundle (served by RISK_INFERENCE_MODE=slim).")
+    parser.add_argument("--model", type=str, default="xgboost_risk_model.pkl", help="Path to the trained pipeline")
+    parser.add_argument("--out", type=str, default="xgboost_risk_model.bundle.npz", help="Where to write the bundle")
+    parser.add_argument("--samples", type=int, default=100000, help="Random applicants used to check the export")
+    args = parser.parse_args()
+
+    model = joblib.load(args.model)
+    predictor = FastPredictor.from_pipeline(model)
+    predictor.save(args.out, source=os.path.basename(args.model), source_version=artifact_version(args.model))
+
+    # The bundle must score exactly like the pipeline it came from
+    exported = FastPredictor.load(args.out)
+    encoder = FeatureEncoder(FEATURE_MAP, exported.feature_names)
+    rng = np.random.default_rng(0)
+    applicants = np.column_stack([
+        rng.integers(15, 100, args.samples),
+        rng.uniform(0, 250000, args.samples),
+        rng.integers(1, 20, args.samples),
+        rng.integers(0, 2, (args.samples, 3)),
+    ])
+    X = encoder.encode_batch(applicants).copy()
+    diff = float(np.max(np.abs(PipelinePredictor(model).predict_proba(X) - exported.predict_proba(X))))
+    print(f"Max |bundle - pipeline| over {args.samples} applicants: {diff:.3g}")
+    if diff > 1e-6:
+        os.remove(args.out)
+        raise SystemExit("Model bundle disagrees with the pipeline; not exported")
+
+
+if __name__ == "__main__":
+    main()
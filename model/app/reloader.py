@@ -0,0 +1,177 @@
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from artifacts import artifact_version
+
+logger = logging.getLogger(__name__)
+
+
+def _signature(path):
+    """Cheap change detector for the watched artifact: (mtime, size, inode), or None if missing."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+class ModelReloader:
+    """
+    Hot-swap the served model when its artifact changes, without restarting the process.
+
+    A reload loads and warms a candidate off the request path, runs the golden checks on
+    it, and only then hands it to swap_fn, so requests keep being served by the current
+    model throughout and a bad artifact is rejected instead of going live.
+
+    load_fn(path) -> candidate    loads and warms a new model (candidate.version is its hash)
+    check_fn(candidate)           raises ValueError if the candidate fails the golden checks (any
+                                  other exception fails the reload and keeps the current model)
+    swap_fn(candidate)            installs the candidate
+    current_version_fn()          version currently being served
+
+    A reload requested in one process (request_reload) reaches every process forked from
+    the one that created the reloader, such as the workers of a preloaded gunicorn master:
+    the request bumps a generation counter in shared memory, and each process starts the
+    same reload when it next calls poll_requests (on every request, and on each watch tick).
+    """
+
+    def __init__(self, path, load_fn, check_fn, swap_fn, current_version_fn, interval=None, registry=None):
+        self.path = path
+        self.load_fn = load_fn
+        self.check_fn = check_fn
+        self.swap_fn = swap_fn
+        self.current_version_fn = current_version_fn
+        self.interval = interval or None
+        self.last_result = None
+        self._reload_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._pid = None
+        # [generation, force] of the latest reload request, shared across forks
+        self._requested = multiprocessing.Array("q", 2)
+        self._seen_generation = 0
+
+        self.reloads = None
+        if registry is not None:
+            self.reloads = registry.counter(
+                "risk_model_reloads_total",
+                "Model reload attempts, by outcome",
+                labelnames=("outcome",),
+            )
+
+    def ensure_watching(self):
+        """Start the file watch in this process if it isn't running yet."""
+        # Started lazily like the micro-batcher's thread: a watcher started before a fork
+        # (gunicorn preload_app) would not exist in the workers.
+        if self.interval is None or self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid != os.getpid():
+                threading.Thread(target=self._watch, name="model-watch", daemon=True).start()
+                self._pid = os.getpid()
+
+    def reload(self, force=False):
+        """
+        Load, check and swap in the artifact at self.path.
+        Returns a result dict whose status is "swapped", "unchanged", "rejected", "failed" or "busy".
+        """
+        if not self._reload_lock.acquire(blocking=False):
+            return {'status': 'busy', 'version': self.current_version_fn()}
+        try:
+            result = self._reload(force)
+        finally:
+            self._reload_lock.release()
+        self.last_result = result
+        if self.reloads is not None:
+            self.reloads.inc(result['status'])
+        return result
+
+    def reload_async(self, force=False):
+        """Run reload() on a background thread."""
+        threading.Thread(target=self.reload, args=(force,), name="model-reload", daemon=True).start()
+
+    def request_reload(self, force=False, wait=False):
+        """
+        Reload here (at once, or in the background unless wait) and ask every other process
+        sharing this reloader to do the same. Returns reload()'s result when waiting.
+        """
+        with self._requested.get_lock():
+            self._requested[0] += 1
+            self._requested[1] = int(force)
+            self._seen_generation = self._requested[0]
+        if wait:
+            return self.reload(force=force)
+        self.reload_async(force=force)
+        return None
+
+    def poll_requests(self):
+        """Start a reload if another process requested one since this process last looked."""
+        generation = self._requested.get_obj()[0]  # lock-free read; this runs on every request
+        # A reload already running here may have read an older file; retry once it is done
+        if generation == self._seen_generation or self._reload_lock.locked():
+            return
+        with self._start_lock:
+            if generation == self._seen_generation:
+                return
+            self._seen_generation = generation
+        self.reload_async(force=bool(self._requested[1]))
+
+    def _reload(self, force):
+        current = self.current_version_fn()
+        start = time.perf_counter()
+        try:
+            before = _signature(self.path)
+            if before is None:
+                raise FileNotFoundError(self.path)
+            if not force and artifact_version(self.path) == current:
+                return {'status': 'unchanged', 'version': current}
+
+            candidate = self.load_fn(self.path)
+            if _signature(self.path) != before:
+                raise RuntimeError("artifact changed while it was being loaded")
+        except Exception as e:
+            logger.error(f"Model reload from {self.path} failed: {e}")
+            return {'status': 'failed', 'version': current, 'error': str(e)}
+
+        try:
+            self.check_fn(candidate)
+        except ValueError as e:
+            logger.error(f"Model {candidate.version} rejected by golden checks: {e}")
+            return {'status': 'rejected', 'version': current, 'candidate': candidate.version, 'error': str(e)}
+        except Exception as e:
+            # The checks themselves broke (golden file missing or malformed, candidate raising):
+            # nothing was proven, so keep the current model
+            logger.exception(f"Golden checks on model {candidate.version} failed to run")
+            return {'status': 'failed', 'version': current, 'candidate': candidate.version,
+                    'error': f"{type(e).__name__}: {e}"}
+
+        self.swap_fn(candidate)
+        elapsed = time.perf_counter() - start
+        logger.info(f"Swapped model {current} -> {candidate.version} (loaded and checked in {elapsed:.2f}s)")
+        return {'status': 'swapped', 'version': candidate.version, 'previous': current, 'seconds': round(elapsed, 3)}
+
+    def _watch(self):
+        logger.info(f"Watching {self.path} for new models every {self.interval}s")
+        # A worker forked from a master that preloaded an older artifact catches up here
+        self._guarded(self.reload)
+        seen = _signature(self.path)
+        while True:
+            time.sleep(self.interval)
+            self._guarded(self.poll_requests)
+            signature = _signature(self.path)
+            if signature == seen or signature is None:
+                continue
+            # Wait for the file to stop changing before loading a half-written artifact
+            time.sleep(self.interval)
+            if _signature(self.path) != signature:
+                continue
+            seen = signature
+            self._guarded(self.reload)
+
+    def _guarded(self, fn):
+        # One bad reload must not end the watch for the rest of the worker's life
+        try:
+            fn()
+        except Exception:
+            logger.exception(f"Model watch on {self.path}: {fn.__name__} failed")
@@ -0,0 +1,268 @@
+import argparse
+import csv
+import json
+import logging
+import os
+import shutil
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import numpy as np
+from artifacts import artifact_version
+from batch_io import DEFAULTS, FLAG_VALUES, REQUIRED_FIELDS, parse_columns, required_fields
+from features import DEFAULT_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+# Input columns for each field: Prisma field names (Risk model) or the database columns they map to
+COLUMN_ALIASES = {
+    "application_id": ("application_id", "applicationId"),
+    "age": ("age",),
+    "income": ("income",),
+    "num_people": ("num_people", "numPeople"),
+    "veteran": ("veteran",),
+    "benefits": ("benefits",),
+    "disabled": ("disabled",),
+    "risk_probability": ("risk_probability", "riskProbability"),
+    "risk_prediction": ("risk_prediction", "riskPrediction"),
+}
+REQUIRED_COLUMNS = ("application_id", "risk_prediction") + REQUIRED_FIELDS
+DELTA_FIELDS = ("application_id", "old_probability", "new_probability", "old_prediction", "new_prediction")
+PROGRESS_FILE = "progress.json"
+
+# Model loaded once per worker process by init_worker
+_scorer = None
+
+
+def input_format(path, explicit=None):
+    if explicit:
+        return explicit
+    return "parquet" if path.lower().endswith((".parquet", ".pq")) else "csv"
+
+
+def input_columns(path, fmt):
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        return pq.read_schema(path).names
+    with open(path, newline="") as f:
+        return next(csv.reader(f), [])
+
+
+def resolve_columns(available):
+    """Map each field to the input column holding it. Raises ValueError if a required one is missing."""
+    columns = {}
+    for field, aliases in COLUMN_ALIASES.items():
+        column = next((a for a in aliases if a in available), None)
+        if column is not None:
+            columns[field] = column
+    missing = [f for f in REQUIRED_COLUMNS if f not in columns]
+    if missing:
+        raise ValueError(f"Input is missing columns for {missing} (found {list(available)})")
+    return columns
+
+
+def read_partitions(path, fmt, partition_size, columns):
+    """Yield the input as DataFrames of up to partition_size rows, in file order."""
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=partition_size, columns=list(columns.values())):
+            yield batch.to_pandas()
+    else:
+        import pandas as pd
+        # Read as text so every partition parses the same way, whatever pandas would infer from it
+        yield from pd.read_csv(path, usecols=list(columns.values()), dtype=str, chunksize=partition_size)
+
+
+def partition_columns(frame, columns):
+    """Plain Python values per field, with None for nulls, as batch_io expects."""
+    return {
+        field: frame[column].astype(object).where(frame[column].notna(), None).tolist()
+        for field, column in columns.items()
+    }
+
+
+def init_worker(bundle_path):
+    global _scorer
+    from predictor_script import load_scorer
+    # One thread per process: the pool already uses every core
+    _scorer = load_scorer(bundle_path, n_threads=1)
+
+
+def score_partition(index, columns, threshold, part_path):
+    """
+    Rescore one partition and write the rows whose label changed to part_path.
+    Runs in a worker process. Returns the partition's counts.
+    """
+    encoder, predict_proba = _scorer
+    n = len(columns["application_id"])
+    required = required_fields(encoder)
+    for field, default in DEFAULTS.items():
+        if field in columns and field not in required:
+            columns[field] = [default if v is None else v for v in columns[field]]
+    raw, errors = parse_columns(columns, n, required=required)
+
+    old_pred = np.zeros(n, dtype=bool)
+    for i, value in enumerate(columns["risk_prediction"]):
+        flag = FLAG_VALUES.get(value.strip().lower() if isinstance(value, str) else value)
+        if flag is None:
+            errors[i] = errors[i] or f"Invalid risk_prediction: {value!r}"
+        else:
+            old_pred[i] = flag
+
+    valid = np.array([e is None for e in errors])
+    probs = np.zeros(n)
+    if valid.any():
+        probs[valid] = predict_proba(encoder.encode_batch(raw[valid]))
+    new_pred = probs >= threshold
+    changed = np.flatnonzero(valid & (new_pred != old_pred))
+
+    old_probs = columns.get("risk_probability", [None] * n)
+    tmp_path = f"{part_path}.tmp"
+    with open(tmp_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        for i in changed.tolist():
+            writer.writerow([
+                columns["application_id"][i], old_probs[i], round(float(probs[i]), 4),
+                str(bool(old_pred[i])).lower(), str(bool(new_pred[i])).lower(),
+            ])
+    os.replace(tmp_path, part_path)
+
+    rejected = [(columns["application_id"][i], e) for i, e in enumerate(errors) if e]
+    for application_id, error in rejected[:3]:
+        logger.warning(f"Partition {index}: could not score application {application_id}: {error}")
+    return {
+        "index": index,
+        "rows": n,
+        "scored": int(valid.sum()),
+        "errors": len(rejected),
+        "changed": len(changed),
+        "now_at_risk": int(new_pred[changed].sum()),
+    }
+
+
+class Checkpoint:
+    """
+    Progress of a rescoring run: the settings it was started with and the counts of every
+    finished partition, rewritten after each one so an interrupted run can resume.
+    """
+
+    def __init__(self, directory, config):
+        self.directory = directory
+        self.config = config
+        self.done = {}
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, PROGRESS_FILE)
+        if os.path.exists(path):
+            with open(path) as f:
+                saved = json.load(f)
+            if saved["config"] != config:
+                changed = sorted(k for k in config if saved["config"].get(k) != config[k])
+                raise ValueError(f"Checkpoint in {directory} is from a run with different {changed}; pass --restart to discard it")
+            self.done = {int(k): v for k, v in saved["done"].items()}
+
+    def part_path(self, index):
+        return os.path.join(self.directory, f"part-{index:06d}.csv")
+
+    def record(self, stats):
+        self.done[stats["index"]] = stats
+        path = os.path.join(self.directory, PROGRESS_FILE)
+        with open(f"{path}.tmp", "w") as f:
+            json.dump({"config": self.config, "done": self.done}, f)
+        os.replace(f"{path}.tmp", path)
+
+    def merge(self, n_partitions, delta_path):
+        """Concatenate the partitions' changed rows, in input order, into the delta file."""
+        tmp_path = f"{delta_path}.tmp"
+        with open(tmp_path, "w", newline="") as out:
+            csv.writer(out).writerow(DELTA_FIELDS)
+            for index in range(n_partitions):
+                with open(self.part_path(index), newline="") as part:
+                    shutil.copyfileobj(part, out)
+        os.replace(tmp_path, delta_path)
+
+
+def rescore(input_path, delta_path, bundle_path, threshold=DEFAULT_THRESHOLD, partition_size=50000, workers=None,
+            fmt=None, checkpoint_dir=None, restart=False, keep_checkpoint=False):
+    """
+    Rescore every application in an exported dataset and write the ones whose label changed.
+    Returns the totals over all partitions.
+    """
+    fmt = input_format(input_path, fmt)
+    columns = resolve_columns(input_columns(input_path, fmt))
+    checkpoint_dir = checkpoint_dir or f"{delta_path}.checkpoint"
+    if restart:
+        shutil.rmtree(checkpoint_dir, ignore_errors=True)
+    stat = os.stat(input_path)
+    checkpoint = Checkpoint(checkpoint_dir, {
+        "input": os.path.abspath(input_path),
+        "input_size": stat.st_size,
+        "input_mtime_ns": stat.st_mtime_ns,
+        "model_version": artifact_version(bundle_path),
+        "threshold": threshold,
+        "partition_size": partition_size,
+    })
+    if checkpoint.done:
+        logger.info(f"Resuming from {checkpoint_dir}: {len(checkpoint.done)} partitions already rescored")
+
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    rows_done = 0
+
+    def record(finished):
+        nonlocal rows_done
+        for future in finished:
+            stats = future.result()
+            checkpoint.record(stats)
+            rows_done += stats["rows"]
+            logger.info(f"Partition {stats['index']}: {stats['rows']} rows, {stats['changed']} changed "
+                        f"({rows_done / (time.perf_counter() - start):.0f} rows/s)")
+
+    n_partitions = 0
+    with ProcessPoolExecutor(workers, initializer=init_worker, initargs=(bundle_path,)) as pool:
+        pending = set()
+        for index, frame in enumerate(read_partitions(input_path, fmt, partition_size, columns)):
+            n_partitions = index + 1
+            if index in checkpoint.done:
+                continue
+            pending.add(pool.submit(score_partition, index, partition_columns(frame, columns), threshold,
+                                    checkpoint.part_path(index)))
+            # Bound what's read ahead of the workers, so memory doesn't grow with the input
+            if len(pending) >= 2 * workers:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                record(finished)
+        record(wait(pending).done)
+
+    checkpoint.merge(n_partitions, delta_path)
+    totals = {k: sum(s[k] for s in checkpoint.done.values()) for k in ("rows", "scored", "errors", "changed", "now_at_risk")}
+    logger.info(f"Rescored {totals['rows']} applications in {time.perf_counter() - start:.1f}s: "
+                f"{totals['changed']} changed label ({totals['now_at_risk']} now at risk), "
+                f"{totals['errors']} could not be scored. Delta written to {delta_path}")
+    if not keep_checkpoint:
+        shutil.rmtree(checkpoint_dir)
+    return totals
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Rescore stored applications with a new model and write the label changes.")
+    parser.add_argument("--input", type=str, required=True, help="Exported Risk rows (CSV or Parquet)")
+    parser.add_argument("--delta", type=str, default="risk_delta.csv", help="Where to write applications whose label changed")
+    parser.add_argument("--bundle", type=str, default="xgboost_risk_model.bundle.npz", help="Model bundle to score with")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Classification threshold (default: the service's, which produced the stored labels)")
+    parser.add_argument("--input-format", choices=["csv", "parquet"], help="Input format (default: from the file extension)")
+    parser.add_argument("--partition-size", type=int, default=50000, help="Rows per partition (the unit of work and of checkpointing)")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per CPU)")
+    parser.add_argument("--checkpoint-dir", type=str, help="Where progress is kept (default: <delta>.checkpoint)")
+    parser.add_argument("--restart", action="store_true", help="Discard an existing checkpoint instead of resuming")
+    parser.add_argument("--keep-checkpoint", action="store_true", help="Keep the checkpoint directory after a successful run")
+    args = parser.parse_args()
+
+    try:
+        rescore(args.input, args.delta, args.bundle, threshold=args.threshold, partition_size=args.partition_size,
+                workers=args.workers, fmt=args.input_format, checkpoint_dir=args.checkpoint_dir,
+                restart=args.restart, keep_checkpoint=args.keep_checkpoint)
+    except ValueError as e:
+        parser.error(str(e))
+
+if __name__ == "__main__":
+    main()
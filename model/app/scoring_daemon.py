@@ -0,0 +1,126 @@
+import json
+import logging
+import os
+import signal
+import socket
+import socketserver
+import tempfile
+import threading
+from batch_io import parse_records, required_fields
+
+logger = logging.getLogger(__name__)
+
+# Where the daemon listens unless --socket says otherwise (one socket per user)
+DEFAULT_SOCKET = os.environ.get("RISK_PREDICTOR_SOCKET") or os.path.join(
+    os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir(), f"risk-predictor-{os.getuid()}.sock"
+)
+
+# Requests and responses are single JSON lines:
+#   -> {"artifacts": [absolute paths], "applicants": [{"age": .., "income": .., ...}]}
+#   <- {"probabilities": [float or null], "errors": [str or null]}  or  {"error": "..."}
+REQUEST_TIMEOUT = 10.0
+
+
+def _signature(path):
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def request(socket_path, payload, timeout=REQUEST_TIMEOUT):
+    """Send one request to the daemon. Returns its response, or None if no daemon answered."""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(socket_path)
+            sock.sendall(json.dumps(payload).encode() + b"\n")
+            with sock.makefile("rb") as f:
+                line = f.readline()
+    except OSError:  # no socket, nobody listening, or the daemon went away mid-request
+        return None
+    return json.loads(line) if line else None
+
+
+class ScoringDaemon:
+    """
+    Keeps the model artifacts loaded and scores applicants sent over a Unix domain socket.
+    load_fn() returns (encoder, predict_proba) and is called again when an artifact changes on disk.
+    """
+
+    def __init__(self, socket_path, artifacts, load_fn):
+        self.socket_path = socket_path
+        self.artifacts = [os.path.abspath(p) for p in artifacts]
+        self.load_fn = load_fn
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        signatures = [_signature(p) for p in self.artifacts]
+        self.encoder, self.predict_proba = self.load_fn()
+        self.signatures = signatures
+
+    def _current(self):
+        """The loaded scorer, reloading first if an artifact was replaced since it was loaded."""
+        with self._lock:
+            if [_signature(p) for p in self.artifacts] != self.signatures:
+                logger.info(f"Artifacts changed on disk; reloading {self.artifacts}")
+                self._load()
+            return self.encoder, self.predict_proba
+
+    def handle(self, payload):
+        if payload.get("artifacts") != self.artifacts:
+            return {"error": f"Daemon serves {self.artifacts}"}
+        records = payload.get("applicants") or []
+        encoder, predict_proba = self._current()
+        raw, errors = parse_records(records, required_fields(encoder))
+        valid = [i for i, e in enumerate(errors) if e is None]
+        probabilities = [None] * len(records)
+        if valid:
+            for i, prob in zip(valid, predict_proba(encoder.encode_batch(raw[valid])).tolist()):
+                probabilities[i] = prob
+        return {"probabilities": probabilities, "errors": errors}
+
+    def serve_forever(self):
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                # A connection may send any number of requests, one per line
+                for line in self.rfile:
+                    try:
+                        response = daemon.handle(json.loads(line))
+                    except Exception as e:
+                        logger.error(f"Request failed: {e}")
+                        response = {"error": str(e)}
+                    self.wfile.write(json.dumps(response).encode() + b"\n")
+                    self.wfile.flush()
+
+        self._claim_socket()
+        old_umask = os.umask(0o177)  # socket usable by this user only
+        try:
+            server = socketserver.ThreadingUnixStreamServer(self.socket_path, Handler)
+        finally:
+            os.umask(old_umask)
+        server.daemon_threads = True
+        signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown).start())
+        logger.info(f"Scoring daemon listening on {self.socket_path} (pid {os.getpid()})")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            os.unlink(self.socket_path)
+            logger.info("Scoring daemon stopped")
+
+    def _claim_socket(self):
+        """Remove a stale socket file left by a daemon that died; refuse if one is still running."""
+        if not os.path.exists(self.socket_path):
+            return
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.connect(self.socket_path)
+        except OSError:
+            os.unlink(self.socket_path)
+            return
+        raise RuntimeError(f"A scoring daemon is already listening on {self.socket_path}")
+
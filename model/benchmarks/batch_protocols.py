@@ -0,0 +1,81 @@
+"""
+Compare the JSON batch endpoint with the binary batch protocol at several batch sizes.
+
+Requests go through Flask's test client in this process, so the numbers are server-side
+handling time (parsing, validation, encoding, inference, serialization) without network
+or client-side costs. The prediction cache is disabled so every row is scored.
+
+    XGBOOST_MODEL_PATH=app/xgboost_risk_model.pkl python benchmarks/batch_protocols.py --sizes 1 64 1000 5000
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+APP_DIR = Path(__file__).resolve().parent.parent / "app"
+sys.path.insert(0, str(APP_DIR))
+os.environ["RISK_CACHE_MAX_ENTRIES"] = "0"
+
+
+def time_requests(send, repeats):
+    send()
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        send()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON vs binary batch scoring overhead.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 64, 1000, 5000])
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+
+    import columnar
+    import main as service
+
+    client = service.app.test_client()
+    print("| rows | JSON /predict/batch (ms) | binary (ms) | Arrow (ms) | JSON µs/row | binary µs/row | speedup |")
+    print("|-----:|-------------------------:|------------:|-----------:|------------:|--------------:|--------:|")
+    for n in args.sizes:
+        applicants = service.synthetic_applicants(n, seed=n)
+        columns = [[a[field] for a in applicants] for field in columnar.RAW_FIELDS]
+        json_body = json.dumps({"applicants": applicants})
+        binary_body = columnar.encode_request(columns)
+
+        def send_json():
+            assert client.post("/predict/batch", data=json_body, content_type="application/json").status_code == 200
+
+        def send_binary():
+            assert client.post("/predict/binary", data=binary_body, content_type=columnar.CONTENT_TYPE).status_code == 200
+
+        t_json = time_requests(send_json, args.repeats)
+        t_binary = time_requests(send_binary, args.repeats)
+        t_arrow = float("nan")
+        try:
+            import pyarrow as pa
+            table = pa.table({field: np.asarray(col, dtype=np.float32) for field, col in zip(columnar.RAW_FIELDS, columns)})
+            sink = pa.BufferOutputStream()
+            with pa.ipc.new_stream(sink, table.schema) as writer:
+                writer.write_table(table)
+            arrow_body = sink.getvalue().to_pybytes()
+
+            def send_arrow():
+                assert client.post("/predict/binary", data=arrow_body, content_type=columnar.ARROW_CONTENT_TYPE).status_code == 200
+
+            t_arrow = time_requests(send_arrow, args.repeats)
+        except ImportError:
+            pass
+        print(f"| {n} | {t_json * 1e3:.2f} | {t_binary * 1e3:.2f} | {t_arrow * 1e3:.2f} | "
+              f"{t_json / n * 1e6:.1f} | {t_binary / n * 1e6:.1f} | {t_json / t_binary:.1f}x |")
+
+
+if __name__ == "__main__":
+    main()
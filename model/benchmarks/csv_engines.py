@@ -0,0 +1,79 @@
+"""
+Wall time and peak RSS to parse household.csv and person.csv with each of the pipeline's CSV
+engines: pandas' single-threaded C parser and pyarrow's reader. "in-memory" reads a file the way
+the in-memory pipeline does (pyarrow parses blocks on its thread pool); "streaming" reads it chunk
+by chunk as --streaming does (pyarrow's streaming reader is single-threaded). Each parse runs
+in a fresh process; pass --data-dir once per dataset.
+
+    python benchmarks/csv_engines.py --data-dir data
+    python benchmarks/synthetic_ahs.py --target-gb 10 --out /tmp/ahs-10g && \\
+        python benchmarks/csv_engines.py --data-dir /tmp/ahs-10g --modes streaming
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PIPELINE_DIR = Path(__file__).resolve().parent.parent / "pipeline"
+sys.path.insert(0, str(PIPELINE_DIR))
+
+
+def parse_once(engine, mode, path):
+    import logging
+    import data_processing as dp
+    logging.disable(logging.WARNING)
+    path = Path(path)
+    columns = dp.HOUSEHOLD_COLUMNS if path.name == "household.csv" else dp.PERSON_COLUMNS
+    start = time.perf_counter()
+    if mode == "in-memory":
+        rows = len(dp.read_ahs_csv(path, columns, engine))
+    else:
+        rows = sum(len(chunk) for chunk in dp.read_ahs_chunks(path, columns, engine=engine))
+    return {
+        "rows": rows,
+        "seconds": time.perf_counter() - start,
+        "peak_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def measure(engine, mode, path):
+    out = subprocess.run(
+        [sys.executable, __file__, "--worker", engine, mode, str(path)],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pipeline CSV parsing: C engine vs pyarrow engine.")
+    parser.add_argument("--data-dir", type=Path, action="append", help="Directory with household.csv and person.csv (repeatable)")
+    parser.add_argument("--modes", nargs="+", choices=("in-memory", "streaming"), default=["in-memory", "streaming"])
+    parser.add_argument("--worker", nargs=3, metavar=("ENGINE", "MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(parse_once(*args.worker)))
+        return
+
+    data_dirs = args.data_dir or [PIPELINE_DIR / ".." / "data"]
+    print(f"{os.cpu_count()} CPU(s)\n")
+    print("| file | size (GB) | rows | mode | c (s) | pyarrow (s) | speedup | c peak RSS (MB) | pyarrow peak RSS (MB) |")
+    print("|------|----------:|-----:|------|------:|------------:|--------:|----------------:|----------------------:|")
+    for data_dir in data_dirs:
+        for name in ("household.csv", "person.csv"):
+            path = data_dir / name
+            for mode in args.modes:
+                c, arrow = measure("c", mode, path), measure("pyarrow", mode, path)
+                if c["rows"] != arrow["rows"]:
+                    raise SystemExit(f"{path}: engines read different row counts ({c['rows']} vs {arrow['rows']})")
+                print(f"| {path} | {path.stat().st_size / 1e9:.2f} | {c['rows']} | {mode} | {c['seconds']:.2f} | "
+                      f"{arrow['seconds']:.2f} | {c['seconds'] / arrow['seconds']:.1f}x | {c['peak_mb']:.0f} | "
+                      f"{arrow['peak_mb']:.0f} |", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Size, write time and read-back time of the pipeline's final dataset in each output format
+(Parquet, Feather, CSV). Reads use the same calls as model_training.load_data, once for all
+columns and once projected to a few; each time is the best of --repeat runs.
+
+    python pipeline/data_processing.py --data-dir /tmp/ahs && \\
+        python benchmarks/dataset_formats.py --data-dir /tmp/ahs
+"""
+import argparse
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+PIPELINE_DIR = Path(__file__).resolve().parent.parent / "pipeline"
+sys.path.insert(0, str(PIPELINE_DIR))
+
+import data_processing as dp  # noqa: E402
+
+PROJECTED = ["HINCP", "AGE", "at_risk"]
+
+
+def read(path, columns=None):
+    if path.suffix == ".parquet":
+        return pd.read_parquet(path, columns=columns)
+    if path.suffix == ".feather":
+        return pd.read_feather(path, columns=columns)
+    return pd.read_csv(path, usecols=columns)
+
+
+def best_of(repeat, fn):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Final dataset: Parquet vs Feather vs CSV.")
+    parser.add_argument("--data-dir", type=Path, default=dp.DATA_DIR, help="Directory holding a final_df-v2.* written by the pipeline")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    source = next(args.data_dir / f"{dp.FINAL_OUTPUT}.{fmt}" for fmt in dp.OUTPUT_FORMATS
+                  if (args.data_dir / f"{dp.FINAL_OUTPUT}.{fmt}").exists())
+    df = read(source)
+    print(f"{len(df)} rows x {df.shape[1]} columns from {source}\n")
+    print(f"| format | size (MB) | write (s) | read all (s) | read {len(PROJECTED)} columns (s) |")
+    print("|--------|----------:|----------:|-------------:|----------------:|")
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        for fmt in dp.OUTPUT_FORMATS:
+            path = tmp / f"{dp.FINAL_OUTPUT}.{fmt}"
+            write = best_of(args.repeat, lambda: dp.save_dataframe(df, dp.FINAL_OUTPUT, tmp, fmt))
+            read_all = best_of(args.repeat, lambda: read(path))
+            read_some = best_of(args.repeat, lambda: read(path, PROJECTED))
+            print(f"| {fmt} | {path.stat().st_size / 1e6:.1f} | {write:.3f} | {read_all:.3f} | {read_some:.3f} |", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Memory and time to load household.csv and person.csv with the pipeline's dtype plan,
+compared with the previous loader (default read_csv, then a to_numeric over a quote-stripped
+string copy of every column, ending in int64). Each load runs in a fresh process so peak
+RSS belongs to that load alone.
+
+    python benchmarks/pipeline_memory.py --data-dir data
+    python benchmarks/synthetic_ahs.py --households 1000000 --out /tmp/ahs && \\
+        python benchmarks/pipeline_memory.py --data-dir /tmp/ahs
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PIPELINE_DIR = Path(__file__).resolve().parent.parent / "pipeline"
+sys.path.insert(0, str(PIPELINE_DIR))
+
+
+# The household and person loaders as they were before the dtype plan
+def legacy_load(path, columns, coerce):
+    import pandas as pd
+    df = pd.read_csv(path, usecols=columns)
+    for col in coerce:
+        df[col] = pd.to_numeric(df[col].astype(str).str.replace("'", ""), errors='coerce').fillna(0).astype(int)
+    return df
+
+
+def load_once(loader, name, data_dir):
+    import data_processing as dp
+    path = Path(data_dir) / name
+    columns = dp.HOUSEHOLD_COLUMNS if name == "household.csv" else dp.PERSON_COLUMNS
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    start = time.perf_counter()
+    if loader == "legacy":
+        coerce = [c for c in columns if c != "CONTROL"] if name == "household.csv" else ["MIL"]
+        df = legacy_load(path, columns, coerce)
+    else:
+        df = dp.read_ahs_csv(path, columns)
+    seconds = time.perf_counter() - start
+    return {
+        "rows": len(df),
+        "frame_mb": dp.memory_mb(df),
+        "peak_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "baseline_mb": baseline,
+        "seconds": seconds,
+    }
+
+
+def measure(loader, name, data_dir):
+    out = subprocess.run(
+        [sys.executable, __file__, "--worker", loader, name, "--data-dir", str(data_dir)],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pipeline load memory: dtype plan vs previous loader.")
+    parser.add_argument("--data-dir", type=Path, default=PIPELINE_DIR / ".." / "data")
+    parser.add_argument("--worker", nargs=2, metavar=("LOADER", "FILE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(load_once(*args.worker, args.data_dir)))
+        return
+
+    rows = []
+    for name in ("household.csv", "person.csv"):
+        rows.append((name, measure("legacy", name, args.data_dir), measure("planned", name, args.data_dir)))
+
+    print(f"Peak RSS includes {rows[0][2]['baseline_mb']:.0f} MB for the interpreter, pandas and NumPy\n")
+    print("| file | rows | previous frame (MB) | planned frame (MB) | previous peak RSS (MB) | planned peak RSS (MB) | previous (s) | planned (s) |")
+    print("|------|-----:|--------------------:|-------------------:|-----------------------:|----------------------:|-------------:|------------:|")
+    for name, old, new in rows:
+        print(f"| {name} | {new['rows']} | {old['frame_mb']:.1f} | {new['frame_mb']:.1f} | {old['peak_mb']:.0f} | "
+              f"{new['peak_mb']:.0f} | {old['seconds']:.2f} | {new['seconds']:.2f} |", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Per-request cost of parsing, validating and serializing /predict and /search, comparing
+the declared schemas in common/schema.py with the previous request.get_json + hand-written
+checks + jsonify path. Model inference and search are left out: both paths get the same
+prepared result to serialize.
+
+    XGBOOST_MODEL_PATH=app/xgboost_risk_model.pkl python benchmarks/request_schemas.py
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parent.parent / "app"
+sys.path.insert(0, str(APP_DIR))
+sys.path.insert(0, str(APP_DIR.parent / "common"))
+os.environ.setdefault("RISK_WARMUP_REQUESTS", "0")
+
+
+# The validation /predict used before request schemas
+def legacy_validate_applicant(data):
+    if not isinstance(data, dict):
+        return None, 'Applicant must be a JSON object'
+    required = ['age', 'income', 'num_people', 'veteran', 'benefits']
+    missing = [f for f in required if f not in data]
+    if missing:
+        return None, f"Missing fields: {missing}"
+    try:
+        age = int(data['age'])
+        income = float(data['income'])
+        num_people = int(data['num_people'])
+    except (ValueError, TypeError):
+        return None, 'Invalid input types for age, income, or num_people'
+    if not isinstance(data['veteran'], bool) or not isinstance(data['benefits'], bool):
+        return None, 'Invalid input types for veteran or benefits'
+    return (age, income, num_people, data['veteran'], data['benefits'], bool(data.get('disabled', False))), None
+
+
+def build_search_schemas(schema):
+    # Mirrors SEARCH_REQUEST / SEARCH_RESPONSE in semantic_search/main.py, which needs
+    # sentence-transformers to import
+    request_schema = schema.Request(
+        [schema.Field("query", "any"), schema.Field("top_n", "int", required=False, default=3)],
+        missing_error="Missing query parameter",
+    )
+    response_schema = schema.Object([
+        schema.Field("query", "str"),
+        schema.Field("results", schema.ListOf(schema.Object([
+            schema.Field("provider", "str"),
+            schema.Field("services", "str"),
+            schema.Field("similarity_score", "float"),
+        ]))),
+    ])
+    return request_schema, response_schema
+
+
+def per_call_us(fn, number):
+    fn()
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Request schemas vs get_json/jsonify request overhead.")
+    parser.add_argument("--number", type=int, default=20000, help="Calls per timing run")
+    args = parser.parse_args()
+
+    import schema
+    import main as service
+    from flask import jsonify, request
+
+    app = service.app
+    search_request, search_response = build_search_schemas(schema)
+    providers_path = APP_DIR.parent / "semantic_search" / "providers.json"
+    providers = json.loads(providers_path.read_text()) if providers_path.exists() else [
+        {"Provider": f"Provider {i}", "Services": "Housing Services Emergency shelter " * 20} for i in range(7)
+    ]
+
+    applicant = {"age": 35, "income": 32000, "num_people": 3, "veteran": False, "benefits": False}
+    result = service.format_result(0.35271)
+    search = {"query": "help paying rent", "top_n": 3}
+    search_result = {
+        "query": search["query"],
+        "results": [
+            {"provider": p["Provider"], "services": p["Services"], "similarity_score": 0.5123456789 - i / 10}
+            for i, p in enumerate(providers[:3])
+        ],
+    }
+
+    def legacy_predict():
+        data = request.get_json(force=True, cache=False)
+        legacy_validate_applicant(data)
+        jsonify(result)
+
+    def schema_predict():
+        data = json.loads(request.get_data())
+        service.APPLICANT_SCHEMA.validate(data)
+        service.schema_response(service.RESULT_SCHEMA, result)
+
+    def legacy_search():
+        data = request.get_json(force=True, cache=False)
+        if "query" in data:
+            data["query"], int(data.get("top_n", 3))
+        jsonify(search_result)
+
+    def schema_search():
+        data = json.loads(request.get_data())
+        search_request.validate(data)
+        service.schema_response(search_response, search_result)
+
+    rows = []
+    for endpoint, body, legacy, declared in (
+        ("/predict", applicant, legacy_predict, schema_predict),
+        ("/search", search, legacy_search, schema_search),
+    ):
+        with app.test_request_context(endpoint, method="POST", data=json.dumps(body), content_type="application/json"):
+            request.get_data()  # read the body once; both paths then parse the cached bytes
+            t_legacy = per_call_us(legacy, args.number)
+            t_declared = per_call_us(declared, args.number)
+        rows.append((endpoint, t_legacy, t_declared))
+
+    print("Parse + validate + serialize per request (best of 5 runs)\n")
+    print("| endpoint | get_json + checks + jsonify (µs) | schema (µs) | speedup |")
+    print("|----------|---------------------------------:|------------:|--------:|")
+    for endpoint, t_legacy, t_declared in rows:
+        print(f"| {endpoint} | {t_legacy:.1f} | {t_declared:.1f} | {t_legacy / t_declared:.1f}x |")
+
+
+if __name__ == "__main__":
+    main()
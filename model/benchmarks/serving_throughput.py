@@ -0,0 +1,181 @@
+"""
+Measure /predict throughput of the risk service against worker count.
+
+Starts `gunicorn -c gunicorn.conf.py main:app` (or, with --server uvicorn, the ASGI variant
+`uvicorn asgi:app`) from model/app once per worker count, drives it with keep-alive HTTP
+clients spread over several processes, and prints a Markdown table of requests/second,
+latency percentiles and requests shed with 503.
+
+    python benchmarks/serving_throughput.py --workers 1 2 4 8 --duration 20 --concurrency 64
+    RISK_INFERENCE_QUEUE=8 python benchmarks/serving_throughput.py --server uvicorn --workers 1 --concurrency 64
+
+Set XGBOOST_MODEL_PATH (or place xgboost_risk_model.pkl in app/) before running.
+"""
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import signal
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parent.parent / "app"
+
+
+def random_payload(rng):
+    return json.dumps({
+        "age": rng.randint(18, 90),
+        "income": rng.randint(0, 150000),
+        "num_people": rng.randint(1, 8),
+        "veteran": rng.random() < 0.1,
+        "benefits": rng.random() < 0.3,
+        "disabled": rng.random() < 0.15,
+    })
+
+
+def client_process(host, port, threads, stop_at, results):
+    """Run `threads` keep-alive clients until stop_at; report (count, shed, errors, latencies)."""
+    latencies, counts = [], [0, 0, 0]
+    lock = threading.Lock()
+
+    def loop(seed):
+        rng = random.Random(seed)
+        conn = http.client.HTTPConnection(host, port, timeout=30)
+        local, ok, shed, errors = [], 0, 0, 0
+        headers = {"Content-Type": "application/json"}
+        while time.time() < stop_at:
+            body = random_payload(rng)
+            start = time.perf_counter()
+            try:
+                conn.request("POST", "/predict", body, headers)
+                resp = conn.getresponse()
+                resp.read()
+                if resp.status == 200:
+                    ok += 1
+                    local.append(time.perf_counter() - start)
+                elif resp.status == 503:
+                    shed += 1
+                else:
+                    errors += 1
+            except (OSError, http.client.HTTPException):
+                errors += 1
+                conn.close()
+                conn = http.client.HTTPConnection(host, port, timeout=30)
+        with lock:
+            latencies.extend(local)
+            counts[0] += ok
+            counts[1] += shed
+            counts[2] += errors
+
+    workers = [threading.Thread(target=loop, args=(os.getpid() * 1000 + i,)) for i in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    results.put((counts[0], counts[1], counts[2], latencies))
+
+
+def wait_until_up(host, port, timeout=120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection(host, port, timeout=2)
+            conn.request("POST", "/predict", random_payload(random.Random(0)), {"Content-Type": "application/json"})
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError("service did not come up")
+
+
+def percentile(values, q):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def run_one(n_workers, args):
+    env = dict(os.environ, WEB_CONCURRENCY=str(n_workers), PORT=str(args.port))
+    if args.server == "uvicorn":
+        command = ["uvicorn", "asgi:app", "--port", str(args.port), "--workers", str(n_workers), "--log-level", "warning"]
+    else:
+        command = ["gunicorn", "-c", "gunicorn.conf.py", "main:app"]
+    server = subprocess.Popen(
+        [sys.executable, "-m", *command],
+        cwd=APP_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_until_up("127.0.0.1", args.port)
+        # Warm every worker before measuring
+        warm_until = time.time() + args.warmup
+        results = multiprocessing.Queue()
+        procs = [
+            multiprocessing.Process(target=client_process,
+                                    args=("127.0.0.1", args.port, args.concurrency // args.client_procs, warm_until, results))
+            for _ in range(args.client_procs)
+        ]
+        for p in procs:
+            p.start()
+        for _ in procs:
+            results.get()
+        for p in procs:
+            p.join()
+
+        stop_at = time.time() + args.duration
+        procs = [
+            multiprocessing.Process(target=client_process,
+                                    args=("127.0.0.1", args.port, args.concurrency // args.client_procs, stop_at, results))
+            for _ in range(args.client_procs)
+        ]
+        for p in procs:
+            p.start()
+        ok = shed = errors = 0
+        latencies = []
+        for _ in procs:
+            c, s, e, lat = results.get()
+            ok, shed, errors = ok + c, shed + s, errors + e
+            latencies.extend(lat)
+        for p in procs:
+            p.join()
+        return {
+            "workers": n_workers,
+            "rps": ok / args.duration,
+            "p50_ms": percentile(latencies, 0.50) * 1000,
+            "p99_ms": percentile(latencies, 0.99) * 1000,
+            "shed": shed,
+            "errors": errors,
+        }
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark /predict throughput vs worker count.")
+    parser.add_argument("--server", choices=["gunicorn", "uvicorn"], default="gunicorn",
+                        help="gunicorn main:app (WSGI) or uvicorn asgi:app (ASGI, bounded inference pool)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--duration", type=float, default=15, help="Seconds measured per configuration")
+    parser.add_argument("--warmup", type=float, default=3, help="Seconds of unmeasured load first")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent client connections")
+    parser.add_argument("--client-procs", type=int, default=4, help="Client processes generating load")
+    parser.add_argument("--port", type=int, default=5055)
+    args = parser.parse_args()
+
+    print(f"CPUs visible: {os.cpu_count()}, concurrency: {args.concurrency}, duration: {args.duration}s\n")
+    print("| workers | req/s | p50 (ms) | p99 (ms) | shed (503) | errors |")
+    print("|--------:|------:|---------:|---------:|-----------:|-------:|")
+    for n in args.workers:
+        r = run_one(n, args)
+        print(f"| {r['workers']} | {r['rps']:.0f} | {r['p50_ms']:.2f} | {r['p99_ms']:.2f} | {r['shed']} | {r['errors']} |", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Compare cold-start import time and resident memory of the risk service across inference modes.
+
+Each run imports model/app/main.py in a fresh interpreter (model load and warmup included)
+and reports the import time, resident set size afterwards and which heavy libraries got
+imported. Prints a Markdown table of medians.
+
+    python benchmarks/startup_footprint.py --pipeline app/xgboost_risk_model.pkl \
+        --slim app/xgboost_risk_model.bundle.npz --runs 5
+
+xgboost imports scikit-learn (and through it pandas) whenever they are installed, so in a
+full development environment the slim run hides them, to measure what the slim image
+(app/requirements-slim.txt) actually loads. Pass --as-installed to skip that.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parent.parent / "app"
+HEAVY_MODULES = ("pandas", "sklearn", "scipy", "joblib", "xgboost")
+NOT_IN_SLIM_IMAGE = ("sklearn", "pandas", "joblib")
+
+CHILD = """
+import json, os, sys, time
+start = time.perf_counter()
+for name in {blocked!r}:
+    sys.modules[name] = None  # ImportError on import, as if not installed
+sys.path.insert(0, {app_dir!r})
+os.chdir({app_dir!r})
+import main
+elapsed = time.perf_counter() - start
+with open("/proc/self/status") as f:
+    status = dict(line.split(":", 1) for line in f)
+print(json.dumps({{
+    "import_s": elapsed,
+    "rss_mb": int(status["VmRSS"].split()[0]) / 1024,
+    "peak_rss_mb": int(status["VmHWM"].split()[0]) / 1024,
+    "modules": len(sys.modules),
+    "heavy": [m for m in {heavy!r} if sys.modules.get(m) is not None],
+}}))
+"""
+
+
+def measure(mode, model_path, blocked):
+    env = dict(os.environ, RISK_INFERENCE_MODE=mode, XGBOOST_MODEL_PATH=str(Path(model_path).resolve()))
+    code = CHILD.format(blocked=tuple(blocked), app_dir=str(APP_DIR), heavy=HEAVY_MODULES)
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    result["process_s"] = time.perf_counter() - start
+    return result
+
+
+def summarize(mode, runs):
+    return {
+        "mode": mode,
+        "import_s": statistics.median(r["import_s"] for r in runs),
+        "process_s": statistics.median(r["process_s"] for r in runs),
+        "rss_mb": statistics.median(r["rss_mb"] for r in runs),
+        "peak_rss_mb": statistics.median(r["peak_rss_mb"] for r in runs),
+        "modules": runs[0]["modules"],
+        "heavy": ", ".join(runs[0]["heavy"]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure risk service import time and RSS per inference mode.")
+    parser.add_argument("--pipeline", type=str, default=str(APP_DIR / "xgboost_risk_model.pkl"),
+                        help="Pickled pipeline served by the pipeline and fast modes")
+    parser.add_argument("--slim", type=str, default=str(APP_DIR / "xgboost_risk_model.bundle.npz"),
+                        help="Model bundle served by slim mode")
+    parser.add_argument("--modes", nargs="+", default=["pipeline", "fast", "slim"])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--as-installed", action="store_true",
+                        help="Don't hide scikit-learn/pandas from the slim run")
+    args = parser.parse_args()
+
+    rows = []
+    for mode in args.modes:
+        slim = mode == "slim"
+        blocked = NOT_IN_SLIM_IMAGE if slim and not args.as_installed else ()
+        runs = [measure(mode, args.slim if slim else args.pipeline, blocked) for _ in range(args.runs)]
+        rows.append(summarize(mode, runs))
+
+    print(f"Medians over {args.runs} cold starts (import of main.py, including model load and warmup)\n")
+    print("| mode | import (s) | process (s) | RSS (MB) | peak RSS (MB) | modules | heavy libraries loaded |")
+    print("|------|-----------:|------------:|---------:|--------------:|--------:|------------------------|")
+    for r in rows:
+        print(f"| {r['mode']} | {r['import_s']:.2f} | {r['process_s']:.2f} | {r['rss_mb']:.0f} | "
+              f"{r['peak_rss_mb']:.0f} | {r['modules']} | {r['heavy']} |")
+
+
+if __name__ == "__main__":
+    main()
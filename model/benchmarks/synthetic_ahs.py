@@ -0,0 +1,105 @@
+"""
+Write synthetic household.csv / person.csv files shaped like the AHS public use files, for
+benchmarking the data pipeline without the real download (or at sizes beyond it).
+
+Values follow the AHS conventions the pipeline relies on: coded answers in single quotes,
+-6/-9 for "not applicable"/"not reported", one to four persons per household, and a few
+person records whose CONTROL matches no household. Filler columns pad each row towards
+the width of the real files, which the parser has to skip over.
+
+    python benchmarks/synthetic_ahs.py --households 1000000 --out /tmp/ahs
+    python benchmarks/synthetic_ahs.py --target-gb 10 --out /tmp/ahs-10g
+"""
+import argparse
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Households written per batch, so memory stays flat for any output size
+BATCH_HOUSEHOLDS = 200_000
+# Approximate bytes per household across both files with the default filler width
+BYTES_PER_HOUSEHOLD = 338
+
+
+def quoted(values):
+    return np.char.add(np.char.add("'", values.astype(str)), "'")
+
+
+def household_batch(rng, control, extra_columns):
+    n = len(control)
+    columns = {
+        "CONTROL": quoted(control),
+        "HINCP": np.where(rng.random(n) < 0.03, -6, rng.integers(0, 250_000, n)),
+        "DISHH": quoted(rng.choice([1, 2, -6], n, p=[0.2, 0.75, 0.05])),
+        "FS": quoted(rng.choice([1, 2, -6], n, p=[0.1, 0.85, 0.05])),
+        "HUDSUB": quoted(rng.choice([1, 2, 3, -6], n)),
+        "RENTSUB": quoted(rng.choice([1, 2, 3, 4, 5, 6, 7, -6, -9], n)),
+        "RENTCNTRL": quoted(rng.choice([1, 2, -6], n)),
+        "NUMPEOPLE": rng.integers(1, 9, n),
+        "PERPOVLVL": rng.integers(0, 502, n),
+        "HIHALF": quoted(rng.choice([1, 2, -6], n)),
+        "HIBEHINDFRQ": quoted(rng.choice([1, 2, 3, 4, -6, -9], n, p=[0.7, 0.05, 0.05, 0.05, 0.1, 0.05])),
+        "HIMORTFORC": quoted(rng.choice([1, 2, -6], n, p=[0.02, 0.5, 0.48])),
+        "HIEVICNOTE": quoted(rng.choice([1, 2, -6], n, p=[0.02, 0.5, 0.48])),
+        "HINFORC": quoted(rng.choice([1, 2, -6], n, p=[0.02, 0.5, 0.48])),
+        "MILHH": quoted(rng.choice([1, 2, 3, 4, 5, 6, -6], n)),
+    }
+    filler = quoted(rng.integers(-9, 10, n))
+    for i in range(extra_columns):
+        columns[f"X{i:03d}"] = filler
+    return pd.DataFrame(columns)
+
+
+def person_batch(rng, control, extra_columns):
+    per_household = rng.integers(1, 5, len(control))
+    person_control = np.repeat(control, per_household)
+    # Roughly 2% of persons belong to no household
+    orphans = np.arange(len(person_control) // 50) + 90_000_000_000 + control[0]
+    person_control = np.concatenate([person_control, orphans])
+    n = len(person_control)
+    columns = {
+        "CONTROL": quoted(person_control),
+        "AGE": np.where(rng.random(n) < 0.01, -9, rng.integers(0, 95, n)),
+        "PAP": np.where(rng.random(n) < 0.5, -6, rng.integers(0, 20_000, n) * (rng.random(n) < 0.1)),
+        "MIL": quoted(rng.choice([1, 2, 3, 4, -6, -9], n)),
+    }
+    filler = quoted(rng.integers(-9, 10, n))
+    for i in range(extra_columns):
+        columns[f"X{i:03d}"] = filler
+    return pd.DataFrame(columns)
+
+
+def write_synthetic_ahs(out_dir, households, extra_columns=20, seed=0):
+    """Write household.csv and person.csv with the given number of households to out_dir."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    for start in range(0, households, BATCH_HOUSEHOLDS):
+        control = np.arange(start, min(start + BATCH_HOUSEHOLDS, households), dtype=np.int64) + 11_000_000_001
+        first = start == 0
+        household_batch(rng, control, extra_columns).to_csv(
+            out_dir / "household.csv", index=False, mode="w" if first else "a", header=first)
+        person_batch(rng, control, extra_columns // 2).to_csv(
+            out_dir / "person.csv", index=False, mode="w" if first else "a", header=first)
+    return sum(os.path.getsize(out_dir / name) for name in ("household.csv", "person.csv"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write synthetic AHS-shaped household.csv and person.csv.")
+    parser.add_argument("--out", type=Path, required=True)
+    size = parser.add_mutually_exclusive_group(required=True)
+    size.add_argument("--households", type=int)
+    size.add_argument("--target-gb", type=float, help="Approximate combined size of the two files")
+    parser.add_argument("--extra-columns", type=int, default=20, help="Filler columns per household row (half as many per person row)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    households = args.households or int(args.target_gb * 1e9 / BYTES_PER_HOUSEHOLD)
+    total = write_synthetic_ahs(args.out, households, args.extra_columns, args.seed)
+    print(f"Wrote {households} households ({total / 1e9:.2f} GB) to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+import asyncio
+import io
+import json
+import math
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# ASGI front end for the Flask services: the event loop reads request bodies and writes
+# responses, and the Flask app itself runs on a bounded pool. A slow client then holds
+# only a coroutine, not a worker, and a burst beyond the pool's queue limit gets an
+# immediate 503 with Retry-After instead of waiting in an unbounded backlog.
+#
+# Shared by app/ and semantic_search/, like schema.py.
+
+# Largest request body read into memory
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+
+class Overloaded(Exception):
+    """Raised by BoundedExecutor.submit when its queue is full."""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Overloaded; retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class BoundedExecutor:
+    """
+    A thread pool that accepts at most workers + max_queue tasks at a time.
+    Tasks beyond that are refused with Overloaded, carrying a Retry-After estimate taken
+    from how long recent tasks spent between submission and completion.
+    """
+
+    def __init__(self, workers, max_queue, name="pool", registry=None, metric_prefix=None):
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix=name)
+        self.workers = workers
+        self.max_queue = max_queue
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._latency = None  # EWMA of submit-to-done seconds
+
+        self._rejected = self._pending_gauge = None
+        if registry is not None:
+            self._pending_gauge = registry.gauge(f"{metric_prefix}_pool_pending", "Tasks queued or running on the inference pool")
+            self._rejected = registry.counter(f"{metric_prefix}_pool_rejected_total", "Requests refused with 503 because the inference queue was full")
+
+    @property
+    def pending(self):
+        return self._pending
+
+    def retry_after(self):
+        """Whole seconds a refused client should wait: roughly one task latency at the current backlog."""
+        latency = self._latency or 0.0
+        return max(1, math.ceil(latency))
+
+    def submit(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.workers + self.max_queue:
+                if self._rejected is not None:
+                    self._rejected.inc()
+                raise Overloaded(self.retry_after())
+            self._pending += 1
+        if self._pending_gauge is not None:
+            self._pending_gauge.inc()
+        submitted = time.perf_counter()
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._task_done(submitted)
+            raise
+        future.add_done_callback(lambda _: self._task_done(submitted))
+        return future
+
+    def _task_done(self, submitted):
+        elapsed = time.perf_counter() - submitted
+        with self._lock:
+            self._pending -= 1
+            self._latency = elapsed if self._latency is None else 0.8 * self._latency + 0.2 * elapsed
+        if self._pending_gauge is not None:
+            self._pending_gauge.dec()
+
+    async def run(self, fn, *args):
+        """Run fn(*args) on the pool from a coroutine. Raises Overloaded if the queue is full."""
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def read_body(receive, limit=MAX_BODY_BYTES):
+    """Read the whole request body; None if it exceeds limit."""
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return b"".join(chunks)
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > limit:
+            return None
+        chunks.append(chunk)
+        if not message.get("more_body", False):
+            return b"".join(chunks)
+
+
+async def send_response(send, status, body, headers=()):
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(k.encode("latin-1"), v.encode("latin-1")) for k, v in headers]
+                   + [(b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def send_json(send, status, obj, headers=()):
+    body = (json.dumps(obj, separators=(",", ":")) + "\n").encode()
+    await send_response(send, status, body, [("content-type", "application/json"), *headers])
+
+
+def wsgi_environ(scope, body):
+    """WSGI environ for an ASGI HTTP scope and its already-read body."""
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": str(server[0]),
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": str(client[0]),
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    for name, value in scope.get("headers", []):
+        key = name.decode("latin-1").upper().replace("-", "_")
+        value = value.decode("latin-1")
+        if key == "CONTENT_TYPE":
+            environ["CONTENT_TYPE"] = value
+        elif key != "CONTENT_LENGTH":
+            key = f"HTTP_{key}"
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+def call_wsgi(wsgi_app, environ):
+    """Run a WSGI app to completion; returns (status code, headers, body)."""
+    response = {}
+
+    def start_response(status, headers, exc_info=None):
+        response["status"] = int(status.split(" ", 1)[0])
+        response["headers"] = headers
+
+    result = wsgi_app(environ, start_response)
+    try:
+        body = b"".join(result)
+    finally:
+        if hasattr(result, "close"):
+            result.close()
+    headers = [(k, v) for k, v in response["headers"] if k.lower() != "content-length"]
+    return response["status"], headers, body
+
+
+class WsgiPoolApp:
+    """
+    ASGI app that serves a WSGI app on a BoundedExecutor.
+    The body is read on the event loop; the WSGI call (parsing, validation, inference and
+    serialization) runs on the pool; a full pool answers 503 with Retry-After.
+    """
+
+    def __init__(self, wsgi_app, pool, on_shutdown=None):
+        self.wsgi_app = wsgi_app
+        self.pool = pool
+        self.on_shutdown = on_shutdown
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+        body = await read_body(receive)
+        if body is None:
+            await send_json(send, 413, {"error": f"Request body exceeds {MAX_BODY_BYTES} bytes"})
+            return
+        try:
+            status, headers, payload = await self.pool.run(call_wsgi, self.wsgi_app, wsgi_environ(scope, body))
+        except Overloaded as e:
+            await send_json(send, 503, {"error": "Server overloaded, retry later"},
+                            [("retry-after", str(e.retry_after))])
+            return
+        await send_response(send, status, payload, headers)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.pool.shutdown()
+                if self.on_shutdown is not None:
+                    self.on_shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
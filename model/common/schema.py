@@ -0,0 +1,150 @@
+import json
+from json.encoder import encode_basestring_ascii
+
+# Request and response schemas, declared once per endpoint. A Request turns its fields into
+# a list of (name, converter) steps when it is built, so validating a body is one pass over
+# that list: no Flask JSON provider, no hand-written checks per endpoint. Error messages are
+# part of the declaration, so endpoints keep their exact wording.
+#
+# Shared by app/ and semantic_search/: a source checkout imports it from here, and each
+# service's Docker build copies it next to main.py (see docker-compose.yaml).
+
+
+def _strict_bool(value):
+    if value.__class__ is not bool:
+        raise TypeError(f"expected a JSON boolean, got {value!r}")
+    return value
+
+
+def _strict_str(value):
+    if value.__class__ is not str:
+        raise TypeError(f"expected a JSON string, got {value!r}")
+    return value
+
+
+def _as_is(value):
+    return value
+
+
+# How request fields are converted: "int"/"float" cast with int()/float(), "bool" and "str"
+# must be a JSON boolean and string, "flag" is coerced with bool(), "any" is taken as is
+REQUEST_CONVERTERS = {
+    "int": int,
+    "float": float,
+    "bool": _strict_bool,
+    "str": _strict_str,
+    "flag": bool,
+    "any": _as_is,
+}
+
+
+def _int(value):
+    return int.__repr__(int(value))
+
+
+def _float(value):
+    value = float(value)
+    return float.__repr__(value) if value - value == 0.0 else json.dumps(value)  # NaN/Infinity as json does
+
+
+def _bool(value):
+    return "true" if value else "false"
+
+
+def _any(value):
+    return json.dumps(value, separators=(",", ":"), sort_keys=True)
+
+
+# How response fields are written, matching Flask's jsonify byte for byte
+# (sorted keys, compact separators, ASCII-escaped strings)
+RESPONSE_ENCODERS = {
+    "int": _int,
+    "float": _float,
+    "str": encode_basestring_ascii,
+    "bool": _bool,
+    "any": _any,
+}
+
+
+class Field:
+    """
+    One field of a JSON object.
+    kind: a REQUEST_CONVERTERS key for requests; a RESPONSE_ENCODERS key, Object or ListOf for responses
+    error: message returned when a request value can't be converted (None lets the exception propagate)
+    """
+
+    def __init__(self, name, kind, required=True, default=None, error=None):
+        self.name = name
+        self.kind = kind
+        self.required = required
+        self.default = default
+        self.error = error
+
+
+class Request:
+    """
+    A request body schema. validate(data) and decode(body) return (values, None), with
+    values a tuple in field order, or (None, error_message).
+    missing_error may use {missing}, the list of absent required fields.
+    """
+
+    def __init__(self, fields, missing_error, not_object_error=None):
+        self.fields = fields
+        self.required = [f.name for f in fields if f.required]
+        self.missing_error = missing_error
+        self.not_object_error = not_object_error or missing_error.format(missing=self.required)
+        self._steps = []
+        for field in fields:
+            if field.kind not in REQUEST_CONVERTERS:
+                raise ValueError(f"Unknown request field kind {field.kind!r} for {field.name}")
+            self._steps.append((field.name, field.required, field.default, REQUEST_CONVERTERS[field.kind], field.error))
+
+    def validate(self, data):
+        if not isinstance(data, dict):
+            return None, self.not_object_error
+        missing = [name for name in self.required if name not in data]
+        if missing:
+            return None, self.missing_error.format(missing=missing)
+        values = []
+        for name, required, default, convert, error in self._steps:
+            try:
+                values.append(convert(data[name] if required else data.get(name, default)))
+            except (ValueError, TypeError):
+                if error is None:
+                    raise
+                return None, error
+        return tuple(values), None
+
+    def decode(self, body):
+        """Parse a JSON body and validate it. Malformed JSON raises ValueError."""
+        return self.validate(json.loads(body))
+
+
+class Object:
+    """A response object schema; dumps(obj) -> str gives the same bytes as jsonify, minus its newline."""
+
+    def __init__(self, fields):
+        self.fields = fields
+        self._parts = []
+        for i, field in enumerate(sorted(fields, key=lambda f: f.name)):
+            if isinstance(field.kind, (Object, ListOf)):
+                encode = field.kind.dumps
+            else:
+                encode = RESPONSE_ENCODERS[field.kind]
+            prefix = ("{" if i == 0 else ",") + json.dumps(field.name) + ":"
+            self._parts.append((prefix, field.name, encode))
+
+    def dumps(self, obj):
+        if not self._parts:
+            return "{}"
+        return "".join([prefix + encode(obj[name]) for prefix, name, encode in self._parts]) + "}"
+
+
+class ListOf:
+    """A response field holding a list of objects."""
+
+    def __init__(self, item):
+        self.item = item
+
+    def dumps(self, items):
+        return "[" + ",".join([self.item.dumps(x) for x in items]) + "]"
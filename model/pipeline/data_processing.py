@@ -1,7 +1,13 @@
+import argparse
+import csv
+import numpy as np
 import pandas as pd
 from pathlib import Path
 import logging
 import os
+from functools import partial
+
+from stage_cache import Stage, StageCache, run_stages
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -11,31 +17,206 @@ logger = logging.getLogger(__name__)
 SCRIPT_DIR = Path(__file__).parent
 DATA_DIR = SCRIPT_DIR / ".." / "data"
 
-def load_household_data() -> pd.DataFrame:
+# AHS columns read from each input file
+HOUSEHOLD_COLUMNS = [
+    "CONTROL", "HINCP", "DISHH", "FS", "HUDSUB", "RENTSUB", "RENTCNTRL",
+    "NUMPEOPLE", "PERPOVLVL", "HIHALF", "HIBEHINDFRQ", "HIMORTFORC",
+    "HIEVICNOTE", "HINFORC", "MILHH"
+]
+PERSON_COLUMNS = ["CONTROL", "AGE", "PAP", "MIL"]
+
+# Type of every AHS column the pipeline reads, and the value given to blanks and non-numeric
+# entries (None drops the row). Coded answers and small counts fit int8; dollar amounts need
+# int32. AGE is filled with -1 so unparseable ages fail the AGE >= 0 check, as they always did.
+DTYPE_PLAN = {
+    "CONTROL": (np.int64, None),
+    "HINCP": (np.int32, 0),
+    "DISHH": (np.int8, 0),
+    "FS": (np.int8, 0),
+    "HUDSUB": (np.int8, 0),
+    "RENTSUB": (np.int8, 0),
+    "RENTCNTRL": (np.int8, 0),
+    "NUMPEOPLE": (np.int8, 0),
+    "PERPOVLVL": (np.int16, 0),
+    "HIHALF": (np.int8, 0),
+    "HIBEHINDFRQ": (np.int8, 0),
+    "HIMORTFORC": (np.int8, 0),
+    "HIEVICNOTE": (np.int8, 0),
+    "HINFORC": (np.int8, 0),
+    "MILHH": (np.int8, 0),
+    "AGE": (np.int8, -1),
+    "PAP": (np.int32, 0),
+    "MIL": (np.int8, 0),
+}
+
+# Rows read per chunk in streaming mode
+DEFAULT_CHUNK_SIZE = 250_000
+
+# CSV parsers: pandas' single-threaded C parser, or pyarrow's multi-threaded reader. pyarrow
+# (already needed for the Parquet output) parsed every benchmarked file 1.7-2.2x faster than
+# the C parser, even on one core; see the developer guide, section "CSV engine".
+CSV_ENGINES = ("c", "pyarrow")
+DEFAULT_CSV_ENGINE = "pyarrow"
+# Bytes of CSV per block when pyarrow parses a whole file; blocks are parsed in parallel
+ARROW_BLOCK_SIZE = 4 << 20
+
+# Formats the cleaned and final datasets can be written in. Parquet (zstd) is compact and
+# typed; Feather (Arrow IPC, uncompressed) is the fastest to write and read back; CSV is the
+# text export the pipeline used to write.
+OUTPUT_FORMATS = ("parquet", "feather", "csv")
+DEFAULT_OUTPUT_FORMAT = "parquet"
+# Output datasets, without the format extension
+HOUSEHOLD_OUTPUT = "household_cleaned-v2"
+PERSON_OUTPUT = "person_cleaned-v2"
+FINAL_OUTPUT = "final_df-v2"
+# Where stage outputs are cached, inside the data directory
+CACHE_DIR_NAME = ".stage_cache"
+# Worker processes for stages that can run at once (households and persons). One runs
+# everything in this process; concurrent ingest (--processes 2) is opt-in until its
+# speedup has been measured on a multi-core machine.
+DEFAULT_PROCESSES = 1
+
+def memory_mb(df: pd.DataFrame) -> float:
+    return df.memory_usage(deep=True).sum() / 1e6
+
+def apply_dtype_plan(df: pd.DataFrame, source: str) -> pd.DataFrame:
+    """Fill missing values and cast each column to its DTYPE_PLAN type (int64 is kept if the values don't fit)."""
+    for col in df.columns:
+        dtype, fill = DTYPE_PLAN[col]
+        values = df[col]
+        if not pd.api.types.is_integer_dtype(values):
+            values = pd.to_numeric(values, errors='coerce')
+            missing = values.isna()
+            if missing.any():
+                if fill is None:
+                    logger.warning(f"{source}: dropping {missing.sum()} rows with missing or non-numeric {col}")
+                    df, values = df[~missing], values[~missing]
+                else:
+                    logger.warning(f"{source}: {missing.sum()} missing or non-numeric {col} values set to {fill}")
+                    values = values.fillna(fill)
+        info = np.iinfo(dtype)
+        if len(values) and (values.min() < info.min or values.max() > info.max):
+            logger.warning(f"{source}: {col} has values outside {np.dtype(dtype).name}; keeping it as int64")
+            dtype = np.int64
+        df[col] = values.astype(dtype)
+    return df
+
+def csv_header(input_path: Path, columns: list) -> list:
+    """The given columns in the order they appear in the file (the order pandas' usecols gives)."""
+    with open(input_path, newline="") as f:
+        header = next(csv.reader(f, quotechar="'"))
+    return [col for col in header if col in columns]
+
+def arrow_csv_options(columns: list, **read_options):
+    """pyarrow.csv options equivalent to the C parser settings: AHS quotes stripped, columns parsed as int64."""
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+    except ImportError:
+        raise ImportError("The pyarrow CSV engine needs pyarrow installed (pip install pyarrow)") from None
+    return dict(
+        read_options=pacsv.ReadOptions(use_threads=True, **read_options),
+        parse_options=pacsv.ParseOptions(quote_char="'"),
+        convert_options=pacsv.ConvertOptions(include_columns=columns, column_types={col: pa.int64() for col in columns}),
+    )
+
+def read_arrow_chunks(input_path: Path, columns: list, chunk_size: int, parallel: bool = False):
+    """
+    Yield pyarrow tables of chunk_size rows. With parallel, the whole file is parsed at once
+    on Arrow's thread pool and then sliced; otherwise pyarrow's streaming reader (single-threaded, default
+    1 MB blocks) keeps memory bounded. Blanks come back as nulls (NaN once converted);
+    non-numeric values raise pyarrow's ArrowInvalid, a ValueError, like the C parser does.
+    """
+    options = arrow_csv_options(columns, block_size=ARROW_BLOCK_SIZE) if parallel else arrow_csv_options(columns)
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+
+    if parallel:
+        table = pacsv.read_csv(input_path, **options)
+        for start in range(0, table.num_rows, chunk_size):
+            yield table.slice(start, chunk_size)
+        return
+
+    reader = pacsv.open_csv(input_path, **options)
+    pending, pending_rows = [], 0
+    for batch in reader:
+        pending.append(batch)
+        pending_rows += batch.num_rows
+        while pending_rows >= chunk_size:
+            table = pa.Table.from_batches(pending)
+            yield table.slice(0, chunk_size)
+            rest = table.slice(chunk_size)
+            pending, pending_rows = rest.to_batches(), rest.num_rows
+    if pending_rows:
+        yield pa.Table.from_batches(pending)
+
+def read_ahs_chunks(input_path: Path, columns: list, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                    engine: str = DEFAULT_CSV_ENGINE, parallel: bool = False):
+    """
+    Yield the given columns of an AHS CSV in frames of chunk_size rows, typed by DTYPE_PLAN.
+    The parser strips the AHS single quotes and reads values straight into int64, so no
+    string column is ever built; each chunk is then range-checked and narrowed. If the parser
+    meets a non-numeric value (or, with the C engine, a blank), the rest of the file is
+    re-read by the C parser without types and coerced column by column.
+    engine is "c" or "pyarrow"; both yield identical frames. parallel has the pyarrow engine
+    parse the whole file on Arrow's thread pool before yielding (see read_arrow_chunks).
+    """
+    rows_read = 0
+    try:
+        if engine == "pyarrow":
+            order = csv_header(input_path, columns)
+            for table in read_arrow_chunks(input_path, columns, chunk_size, parallel):
+                # One block per column, so a column kept as int64 (CONTROL) pins only itself
+                frame = table.to_pandas(split_blocks=True)[order]
+                frame.index += rows_read
+                rows_read += len(frame)
+                yield apply_dtype_plan(frame, input_path.name)
+            return
+        reader = pd.read_csv(input_path, usecols=columns, quotechar="'", chunksize=chunk_size,
+                             dtype={col: np.int64 for col in columns})
+        for frame in reader:
+            rows_read += len(frame)
+            yield apply_dtype_plan(frame, input_path.name)
+        return
+    except FileNotFoundError:
+        logger.error(f"File not found: {input_path}")
+        raise
+    except (ValueError, OverflowError) as e:
+        logger.warning(f"{input_path.name}: non-integer values after row {rows_read} ({e}); parsing the rest without the dtype plan")
+    reader = pd.read_csv(input_path, usecols=columns, quotechar="'", chunksize=chunk_size,
+                         skiprows=range(1, rows_read + 1))
+    for frame in reader:
+        frame.index += rows_read
+        yield apply_dtype_plan(frame, input_path.name)
+
+def read_ahs_csv(input_path: Path, columns: list, engine: str = DEFAULT_CSV_ENGINE) -> pd.DataFrame:
+    """
+    Read the given columns of an AHS CSV typed by DTYPE_PLAN, narrowed chunk by chunk. With the
+    C engine only one chunk is ever int64; the pyarrow engine parses the whole file into int64
+    Arrow columns on Arrow's thread pool first, trading that memory for parse speed.
+    """
+    return pd.concat(read_ahs_chunks(input_path, columns, engine=engine, parallel=True), ignore_index=True)
+
+def clean_household_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Drop households with negative HINCP."""
+    return df[df["HINCP"] >= 0]
+
+def clean_person_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Drop persons with negative AGE."""
+    return df[df["AGE"] >= 0]
+
+def load_household_data(data_dir: Path = DATA_DIR, engine: str = DEFAULT_CSV_ENGINE) -> pd.DataFrame:
     """Load and clean household data from CSV."""
-    input_path = DATA_DIR / "household.csv"
+    input_path = data_dir / "household.csv"
     try:
-        cols = [
-            "CONTROL", "HINCP", "DISHH", "FS", "HUDSUB", "RENTSUB", "RENTCNTRL",
-            "NUMPEOPLE", "PERPOVLVL", "HIHALF", "HIBEHINDFRQ", "HIMORTFORC",
-            "HIEVICNOTE", "HINFORC", "MILHH"
-        ]
-        df = pd.read_csv(input_path, usecols=cols)
-        logger.info(f"Loaded {len(df)} households from {input_path}")
-        
-        # Log NaN values before coercion
-        nan_counts = df.isna().sum()
-        if nan_counts.sum() > 0:
-            logger.warning(f"NaN values found before coercion: {nan_counts[nan_counts > 0].to_dict()}")
-        
-        # Convert columns to int, removing quotes
-        for col in df.columns:
-            if col != "CONTROL":
-                df[col] = pd.to_numeric(df[col].astype(str).str.replace("'", ""), errors='coerce').fillna(0).astype(int)
+        df = read_ahs_csv(input_path, HOUSEHOLD_COLUMNS, engine)
+        logger.info(
+            f"Loaded {len(df)} households from {input_path}: {memory_mb(df):.1f} MB "
+            f"({len(df) * df.shape[1] * 8 / 1e6:.1f} MB as int64)"
+        )
         
-        # Filter rows where HINCP >= 0
         rows_before = len(df)
-        df = df[df["HINCP"] >= 0]
+        df = clean_household_frame(df)
         logger.info(f"Rows after cleaning HINCP: {len(df)} (dropped {rows_before - len(df)} rows)")
         
         return df
@@ -56,7 +237,7 @@ def create_at_risk_column(df: pd.DataFrame) -> pd.DataFrame:
             (df["HIEVICNOTE"] == 1) |   # Eviction notice
             (df["HIBEHINDFRQ"].isin([2, 3, 4])) |  # Frequent missed payments
             (df["HINFORC"] == 1)        # Other foreclosure issues
-        ).astype(int)
+        ).astype("int8")
         
         # Drop columns used for at_risk calculation
         df = df.drop(columns=[
@@ -69,23 +250,18 @@ def create_at_risk_column(df: pd.DataFrame) -> pd.DataFrame:
         logger.error(f"Error creating at_risk column: {str(e)}")
         raise
 
-def load_person_data() -> pd.DataFrame:
+def load_person_data(data_dir: Path = DATA_DIR, engine: str = DEFAULT_CSV_ENGINE) -> pd.DataFrame:
     """Load and clean person data from CSV."""
-    input_path = DATA_DIR / "person.csv"
+    input_path = data_dir / "person.csv"
     try:
-        df = pd.read_csv(input_path, usecols=["CONTROL", "AGE", "PAP", "MIL"])
-        
-        # Log NaN values before coercion
-        nan_counts = df.isna().sum()
-        if nan_counts.sum() > 0:
-            logger.warning(f"NaN values in person data: {nan_counts[nan_counts > 0].to_dict()}")
-        
-        # Convert MIL to numeric
-        df["MIL"] = pd.to_numeric(df["MIL"].astype(str).str.replace("'", ""), errors='coerce').fillna(0).astype(int)
+        df = read_ahs_csv(input_path, PERSON_COLUMNS, engine)
+        logger.info(
+            f"Loaded {len(df)} persons from {input_path}: {memory_mb(df):.1f} MB "
+            f"({len(df) * df.shape[1] * 8 / 1e6:.1f} MB as int64)"
+        )
         
-        # Validate AGE
         rows_before = len(df)
-        df = df[df["AGE"] >= 0]
+        df = clean_person_frame(df)
         logger.info(f"Rows after cleaning AGE: {len(df)} (dropped {rows_before - len(df)} rows)")
         
         logger.info(f"Loaded and cleaned person data from {input_path}")
@@ -128,7 +304,7 @@ def create_gov_assistance_column(df: pd.DataFrame) -> pd.DataFrame:
             (df["FS"] == 1) |                       # Food stamps/SNAP
             (df["PAP"] > 0) |                       # Public assistance income
             (df["HUDSUB"] == 1)                     # HUD subsidies
-        ).astype(int)
+        ).astype("int8")
         
         # Drop columns used for gov_assistance
         df = df.drop(columns=["FS", "PAP", "HUDSUB", "RENTSUB", "RENTCNTRL"])
@@ -151,8 +327,8 @@ def finalize_data(df: pd.DataFrame) -> pd.DataFrame:
         
         # Convert MILHH and DISHH to binary
         # Note: MILHH=1 for values 1-5 (veteran or active military household); verify data dictionary
-        df["MILHH"] = df["MILHH"].isin([1, 2, 3, 4, 5]).astype(int)
-        df["DISHH"] = (df["DISHH"] == 1).astype(int)
+        df["MILHH"] = df["MILHH"].isin([1, 2, 3, 4, 5]).astype("int8")
+        df["DISHH"] = (df["DISHH"] == 1).astype("int8")
         
         # Ensure final feature order
         final_columns = ["HINCP", "AGE", "NUMPEOPLE", "DISHH", "MILHH", "gov_assistance", "at_risk"]
@@ -164,17 +340,210 @@ def finalize_data(df: pd.DataFrame) -> pd.DataFrame:
         logger.error(f"Error finalizing data: {str(e)}")
         raise
 
-def save_dataframe(df: pd.DataFrame, filename: str) -> None:
-    """Save DataFrame to CSV."""
-    output_path = DATA_DIR / filename
+def dataset_path(name: str, data_dir: Path = DATA_DIR, fmt: str = DEFAULT_OUTPUT_FORMAT) -> Path:
+    return data_dir / f"{name}.{fmt}"
+
+def load_dataset(name: str, data_dir: Path = DATA_DIR, fmt: str = DEFAULT_OUTPUT_FORMAT) -> pd.DataFrame:
+    """Read back a dataset written by save_dataframe."""
+    path = dataset_path(name, data_dir, fmt)
     try:
-        DATA_DIR.mkdir(parents=True, exist_ok=True)
-        df.to_csv(output_path, index=False)
+        if fmt == "parquet":
+            return pd.read_parquet(path)
+        if fmt == "feather":
+            return pd.read_feather(path)
+        return pd.read_csv(path)
+    except Exception as e:
+        logger.error(f"Error loading {path}: {str(e)}")
+        raise
+
+def widen_schema(schema, other):
+    """schema with each integer field widened to other's type where that is wider."""
+    import pyarrow as pa
+    fields = []
+    for field, new in zip(schema, other):
+        if pa.types.is_integer(field.type) and pa.types.is_integer(new.type) and new.type.bit_width > field.type.bit_width:
+            field = field.with_type(new.type)
+        fields.append(field)
+    return pa.schema(fields)
+
+class DatasetWriter:
+    """
+    Writes one pipeline output, frame by frame, to <name>.<fmt> in data_dir. The file is built
+    under a temporary name and renamed into place on close, so a reader never sees a partial
+    dataset. Columnar formats keep the frames' dtypes; if a later frame needs a wider integer
+    type than the first (a chunk kept a column as int64), the rows written so far are
+    rewritten with the wider schema.
+    """
+
+    def __init__(self, name: str, data_dir: Path = DATA_DIR, fmt: str = DEFAULT_OUTPUT_FORMAT):
+        if fmt not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown output format {fmt!r}; expected one of {OUTPUT_FORMATS}")
+        self.path = dataset_path(name, data_dir, fmt)
+        self.fmt = fmt
+        self.rows = 0
+        self._tmp_path = self.path.with_name(self.path.name + ".tmp")
+        self._writer = None
+        self._schema = None
+        self._started = False
+
+    def _open(self, schema):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self._schema = schema
+        if self.fmt == "parquet":
+            self._writer = pq.ParquetWriter(self._tmp_path, schema, compression="zstd")
+        else:
+            self._writer = pa.ipc.new_file(str(self._tmp_path), schema)
+
+    def _reopen_wider(self, schema):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self._writer.close()
+        # Read into memory (not memory-mapped): the file is about to be overwritten
+        if self.fmt == "parquet":
+            written = pq.read_table(self._tmp_path, memory_map=False)
+        else:
+            with pa.OSFile(str(self._tmp_path)) as source:
+                written = pa.ipc.open_file(source).read_all()
+        widened = [f"{new.name} to {new.type}" for old, new in zip(self._schema, schema) if old.type != new.type]
+        logger.warning(f"{self.path.name}: widening {', '.join(widened)} after {self.rows} rows")
+        self._open(schema)
+        self._writer.write_table(written.cast(schema))
+
+    def write(self, df: pd.DataFrame) -> None:
+        if not self._started:
+            self._tmp_path.parent.mkdir(parents=True, exist_ok=True)
+        if self.fmt == "csv":
+            df.to_csv(self._tmp_path, index=False, mode="a" if self._started else "w", header=not self._started)
+            self._started = True
+            self.rows += len(df)
+            return
+        import pyarrow as pa
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if not self._started:
+            self._open(table.schema)
+            self._started = True
+        elif table.schema != self._schema:
+            wider = widen_schema(self._schema, table.schema)
+            if wider != self._schema:
+                self._reopen_wider(wider)
+            table = table.cast(self._schema)
+        self._writer.write_table(table)
+        self.rows += len(df)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        if not self._started:
+            logger.warning(f"Nothing to write to {self.path}")
+            return
+        os.replace(self._tmp_path, self.path)
+
+    def discard(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        self._tmp_path.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+def save_dataframe(df: pd.DataFrame, name: str, data_dir: Path = DATA_DIR, fmt: str = DEFAULT_OUTPUT_FORMAT) -> Path:
+    """Save DataFrame as data_dir/<name>.<fmt> (see DatasetWriter) and return its path."""
+    output_path = dataset_path(name, data_dir, fmt)
+    try:
+        data_dir.mkdir(parents=True, exist_ok=True)
+        with DatasetWriter(name, data_dir, fmt) as writer:
+            writer.write(df)
         logger.info(f"Saved DataFrame to {output_path}")
+        return output_path
     except Exception as e:
         logger.error(f"Error saving DataFrame to {output_path}: {str(e)}")
         raise
 
+def stream_household_index(data_dir: Path, chunk_size: int, engine: str = DEFAULT_CSV_ENGINE,
+                           fmt: str = DEFAULT_OUTPUT_FORMAT) -> pd.DataFrame:
+    """
+    Clean and label household.csv chunk by chunk, writing the cleaned households as it goes.
+    Returns the cleaned households (typed by DTYPE_PLAN) indexed on CONTROL for the person join.
+    """
+    try:
+        parts = []
+        loaded = 0
+        with DatasetWriter(HOUSEHOLD_OUTPUT, data_dir, fmt) as writer:
+            for chunk in read_ahs_chunks(data_dir / "household.csv", HOUSEHOLD_COLUMNS, chunk_size, engine):
+                loaded += len(chunk)
+                chunk = create_at_risk_column(clean_household_frame(chunk))
+                writer.write(chunk)
+                parts.append(chunk)
+        logger.info(f"Saved DataFrame to {writer.path}")
+
+        household = pd.concat(parts, ignore_index=True).set_index("CONTROL")
+        if not household.index.is_unique:
+            raise ValueError("household.csv has duplicate CONTROL values; the person join needs one row per household")
+        logger.info(
+            f"Built household index: {len(household)} of {loaded} households kept, "
+            f"{household.memory_usage(deep=True).sum() / 1e6:.1f} MB"
+        )
+        return household
+    except Exception as e:
+        logger.error(f"Error building household index: {str(e)}")
+        raise
+
+def join_household(person_df: pd.DataFrame, household: pd.DataFrame, positions: np.ndarray) -> pd.DataFrame:
+    """Inner-join person rows to their household's columns (positions from household.index.get_indexer)."""
+    matched = positions >= 0
+    joined = person_df[matched].reset_index(drop=True)
+    household_rows = household.iloc[positions[matched]].reset_index(drop=True)
+    return pd.concat([joined, household_rows], axis=1)
+
+def run_streaming(data_dir: Path = DATA_DIR, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                  engine: str = DEFAULT_CSV_ENGINE, fmt: str = DEFAULT_OUTPUT_FORMAT) -> int:
+    """
+    Out-of-core version of the pipeline for inputs that don't fit in memory. Households are
+    cleaned and labelled into a CONTROL index; person.csv is then read chunk by chunk, and
+    each chunk is cleaned, joined against the index, given gov_assistance, finalized and
+    appended to the outputs. Peak memory is the household index plus one chunk.
+    Writes the same files as the in-memory pipeline; returns the number of final rows.
+    """
+    try:
+        household = stream_household_index(data_dir, chunk_size, engine, fmt)
+        matched_households = np.zeros(len(household), dtype=bool)
+        person_rows = unmatched_persons = final_rows = at_risk = 0
+
+        with DatasetWriter(PERSON_OUTPUT, data_dir, fmt) as person_writer, \
+                DatasetWriter(FINAL_OUTPUT, data_dir, fmt) as final_writer:
+            for chunk in read_ahs_chunks(data_dir / "person.csv", PERSON_COLUMNS, chunk_size, engine):
+                chunk = clean_person_frame(chunk)
+                person_rows += len(chunk)
+                person_writer.write(chunk)
+
+                positions = household.index.get_indexer(chunk["CONTROL"])
+                unmatched_persons += int((positions < 0).sum())
+                matched_households[positions[positions >= 0]] = True
+
+                final = finalize_data(create_gov_assistance_column(join_household(chunk, household, positions)))
+                final_writer.write(final)
+                final_rows += len(final)
+                at_risk += int(final["at_risk"].sum())
+
+        logger.info(f"Cleaned {person_rows} person records")
+        if unmatched_persons:
+            logger.warning(f"{unmatched_persons} person records unmatched")
+        unmatched_households = int((~matched_households).sum())
+        if unmatched_households:
+            logger.warning(f"{unmatched_households} household records unmatched")
+        logger.info(f"Streaming pipeline wrote {final_rows} rows ({at_risk / max(final_rows, 1):.1%} at risk) to {final_writer.path}")
+        return final_rows
+    except Exception as e:
+        logger.error(f"Error in streaming pipeline: {str(e)}")
+        raise
+
 def print_data_summary(df: pd.DataFrame) -> None:
     """Print summary statistics of the dataset."""
     try:
@@ -200,36 +569,130 @@ def print_data_summary(df: pd.DataFrame) -> None:
         logger.error(f"Error printing data summary: {str(e)}")
         raise
 
-def main():
-    """Main function to orchestrate data processing."""
-    try:
-        # Process household data
-        household_df = load_household_data()
-        household_df = create_at_risk_column(household_df)
-        save_dataframe(household_df, "household_cleaned-v2.csv")
+# Pipeline stages. Each stage's cache key covers its input files, its params and the source
+# of the functions listed in its code, so only the functions it runs belong there. The CSV
+# engine and chunk size are left out of the keys: they don't change what is written.
+
+def household_stage(data_dir: Path, engine: str, fmt: str, frames: dict) -> None:
+    """Clean and label household.csv; keeps the frame in frames for the final stage."""
+    household_df = create_at_risk_column(load_household_data(data_dir, engine))
+    save_dataframe(household_df, HOUSEHOLD_OUTPUT, data_dir, fmt)
+    frames[HOUSEHOLD_OUTPUT] = household_df
 
-        # Process person data
-        person_df = load_person_data()
-        save_dataframe(person_df, "person_cleaned-v2.csv")
+def person_stage(data_dir: Path, engine: str, fmt: str, frames: dict) -> None:
+    """Clean person.csv; keeps the frame in frames for the final stage."""
+    person_df = load_person_data(data_dir, engine)
+    save_dataframe(person_df, PERSON_OUTPUT, data_dir, fmt)
+    frames[PERSON_OUTPUT] = person_df
 
-        # Merge datasets
-        main_df = merge_datasets(household_df, person_df)
+def final_stage(data_dir: Path, fmt: str, frames: dict) -> None:
+    """Merge the cleaned tables (from this run, or read back if their stages were cached) into the training dataset."""
+    household_df = frames.pop(HOUSEHOLD_OUTPUT, None)
+    if household_df is None:
+        household_df = load_dataset(HOUSEHOLD_OUTPUT, data_dir, fmt)
+    person_df = frames.pop(PERSON_OUTPUT, None)
+    if person_df is None:
+        person_df = load_dataset(PERSON_OUTPUT, data_dir, fmt)
 
-        # Create government assistance column
-        main_df = create_gov_assistance_column(main_df)
+    main_df = merge_datasets(household_df, person_df)
+    main_df = create_gov_assistance_column(main_df)
+    main_df = finalize_data(main_df)
+    save_dataframe(main_df, FINAL_OUTPUT, data_dir, fmt)
+    print_data_summary(main_df)
 
-        # Finalize data
-        main_df = finalize_data(main_df)
+READ_CODE = (csv_header, arrow_csv_options, read_arrow_chunks, read_ahs_chunks, read_ahs_csv, apply_dtype_plan)
+WRITE_CODE = (widen_schema, DatasetWriter, save_dataframe)
 
-        # Save final dataset
-        save_dataframe(main_df, "final_df-v2.csv")
+def build_stages(data_dir: Path = DATA_DIR, streaming: bool = False, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 engine: str = DEFAULT_CSV_ENGINE, fmt: str = DEFAULT_OUTPUT_FORMAT) -> list:
+    """The pipeline as stages: households, persons and final, or a single streaming stage."""
+    outputs = {name: dataset_path(name, data_dir, fmt) for name in (HOUSEHOLD_OUTPUT, PERSON_OUTPUT, FINAL_OUTPUT)}
+    dtype_plan = {col: [np.dtype(dtype).name, fill] for col, (dtype, fill) in DTYPE_PLAN.items()}
+    household_params = {"format": fmt, "columns": HOUSEHOLD_COLUMNS, "dtype_plan": dtype_plan}
+    person_params = {"format": fmt, "columns": PERSON_COLUMNS, "dtype_plan": dtype_plan}
+    final_code = (merge_datasets, create_gov_assistance_column, finalize_data, load_dataset)
 
-        # Print summary
-        print_data_summary(main_df)
+    if streaming:
+        return [Stage(
+            "streaming", partial(run_streaming, data_dir, chunk_size, engine, fmt),
+            inputs=[data_dir / "household.csv", data_dir / "person.csv"],
+            outputs=list(outputs.values()),
+            params={"household": household_params, "person": person_params},
+            code=(run_streaming, stream_household_index, join_household, clean_household_frame,
+                  create_at_risk_column, clean_person_frame) + final_code + READ_CODE + WRITE_CODE,
+        )]
 
+    frames = {}
+    return [
+        Stage(
+            "households", partial(household_stage, data_dir, engine, fmt, frames),
+            inputs=[data_dir / "household.csv"], outputs=[outputs[HOUSEHOLD_OUTPUT]], params=household_params,
+            code=(household_stage, load_household_data, clean_household_frame, create_at_risk_column) + READ_CODE + WRITE_CODE,
+        ),
+        Stage(
+            "persons", partial(person_stage, data_dir, engine, fmt, frames),
+            inputs=[data_dir / "person.csv"], outputs=[outputs[PERSON_OUTPUT]], params=person_params,
+            code=(person_stage, load_person_data, clean_person_frame) + READ_CODE + WRITE_CODE,
+        ),
+        Stage(
+            "final", partial(final_stage, data_dir, fmt, frames),
+            inputs=[outputs[HOUSEHOLD_OUTPUT], outputs[PERSON_OUTPUT]], outputs=[outputs[FINAL_OUTPUT]],
+            params={"format": fmt}, code=(final_stage,) + final_code + WRITE_CODE,
+        ),
+    ]
+
+def main(data_dir: Path = DATA_DIR, streaming: bool = False, chunk_size: int = DEFAULT_CHUNK_SIZE,
+         engine: str = DEFAULT_CSV_ENGINE, fmt: str = DEFAULT_OUTPUT_FORMAT, cache: bool = True,
+         force: tuple = (), processes: int = DEFAULT_PROCESSES) -> list:
+    """
+    Main function to orchestrate data processing. Stages whose inputs, code and params are
+    unchanged since a cached run are skipped; stages named in force always run. With
+    processes above 1 the households and persons stages run in separate processes at once,
+    and the final stage reads their outputs back. Returns the run_stages report.
+    """
+    try:
+        stages = build_stages(data_dir, streaming, chunk_size, engine, fmt)
+        unknown = set(force) - {stage.name for stage in stages}
+        if unknown:
+            raise ValueError(f"Unknown stages {sorted(unknown)}; this run has {[stage.name for stage in stages]}")
+        stage_cache = StageCache(data_dir / CACHE_DIR_NAME) if cache else None
+        return run_stages(stages, stage_cache, force, processes)
     except Exception as e:
         logger.error(f"Error in main pipeline: {str(e)}")
         raise
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Clean the AHS household and person files and build the training dataset.")
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR, help="Directory holding household.csv and person.csv; outputs are written here")
+    parser.add_argument("--streaming", action="store_true", help="Process the inputs in chunks with bounded memory (no summary printout)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per chunk in streaming mode")
+    parser.add_argument("--csv-engine", choices=CSV_ENGINES, default=DEFAULT_CSV_ENGINE,
+                        help="CSV parser: pandas' C parser or pyarrow's multi-threaded reader (same output)")
+    parser.add_argument("--output-format", choices=OUTPUT_FORMATS, default=DEFAULT_OUTPUT_FORMAT,
+                        help="Format of the cleaned and final datasets (csv is the plain-text export)")
+    parser.add_argument("--force", nargs="+", default=[], metavar="STAGE",
+                        help="Run these stages even if cached (households, persons, final, or streaming; 'all' for every stage)")
+    parser.add_argument("--invalidate", nargs="+", metavar="STAGE",
+                        help="Delete the cached results of these stages ('all' for every stage) and exit")
+    parser.add_argument("--no-cache", action="store_true", help="Run every stage without reading or writing the stage cache")
+    parser.add_argument("--processes", type=int, default=DEFAULT_PROCESSES,
+                        help="Worker processes for the households and persons stages (1 runs them one after the other in this process)")
+    args = parser.parse_args()
+
+    if args.invalidate:
+        stage_cache = StageCache(args.data_dir / CACHE_DIR_NAME)
+        known = [stage.name for streaming in (False, True) for stage in build_stages(args.data_dir, streaming)]
+        names = known if "all" in args.invalidate else args.invalidate
+        unknown = set(names) - set(known)
+        if unknown:
+            parser.error(f"unknown stages {sorted(unknown)}; expected some of {known}")
+        for name in names:
+            logger.info(f"Invalidated {stage_cache.invalidate(name)} cached result(s) of stage {name}")
+    else:
+        known = [stage.name for stage in build_stages(args.data_dir, args.streaming)]
+        force = known if "all" in args.force else args.force
+        unknown = set(force) - set(known)
+        if unknown:
+            parser.error(f"unknown stages {sorted(unknown)}; this run has {known}")
+        main(args.data_dir, streaming=args.streaming, chunk_size=args.chunk_size, engine=args.csv_engine,
+             fmt=args.output_format, cache=not args.no_cache, force=tuple(force), processes=args.processes)
\ No newline at end of file
@@ -14,9 +14,11 @@ from sklearn.inspection import permutation_importance
 import seaborn as sns
 import matplotlib.pyplot as plt
 from pathlib import Path
+import argparse
 import logging
 import joblib
 import os
+import sys
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -32,17 +34,49 @@ DATA_DIR = SCRIPT_DIR / ".." / "data"
 OUTPUT_DIR = SCRIPT_DIR / ".." / "model_outputs"
 MODEL_DIR = SCRIPT_DIR / ".." / "app"
 MODEL_PATH = MODEL_DIR / "xgboost_risk_model.pkl"
+BUNDLE_PATH = MODEL_DIR / "xgboost_risk_model.bundle.npz"
 PLOT_DIR = OUTPUT_DIR / "plots"
 
-def load_data(file_path: Path) -> pd.DataFrame:
-    """Load the processed dataset and validate columns."""
+# Columns the trainer reads from the processed dataset
+DATASET_COLUMNS = ["HINCP", "AGE", "NUMPEOPLE", "DISHH", "MILHH", "gov_assistance", "at_risk"]
+# The processed dataset as written by data_processing.py, in each of its output formats
+DATASET_NAME = "final_df-v2"
+DATASET_FORMATS = ("parquet", "feather", "csv")
+
+def find_dataset(data_dir: Path = DATA_DIR) -> Path:
+    """The most recently written final_df-v2.{parquet,feather,csv} in data_dir."""
+    candidates = [data_dir / f"{DATASET_NAME}.{fmt}" for fmt in DATASET_FORMATS]
+    existing = [path for path in candidates if path.exists()]
+    if not existing:
+        logger.error(f"No processed dataset in {data_dir}; run data_processing.py first")
+        raise FileNotFoundError(f"None of {[path.name for path in candidates]} found in {data_dir}")
+    return max(existing, key=lambda path: path.stat().st_mtime)
+
+def dataset_columns(file_path: Path) -> list:
+    """Column names of a Parquet, Feather or CSV dataset, read from its schema or header only."""
+    if file_path.suffix == ".parquet":
+        import pyarrow.parquet as pq
+        return pq.read_schema(file_path).names
+    if file_path.suffix == ".feather":
+        import pyarrow as pa
+        with pa.memory_map(str(file_path)) as source:
+            return pa.ipc.open_file(source).schema.names
+    return list(pd.read_csv(file_path, nrows=0).columns)
+
+def load_data(file_path: Path, columns: list = DATASET_COLUMNS) -> pd.DataFrame:
+    """Load the given columns of the processed dataset (Parquet, Feather or CSV) and validate them."""
     try:
-        df = pd.read_csv(file_path)
-        expected_cols = ["HINCP", "AGE", "NUMPEOPLE", "DISHH", "MILHH", "gov_assistance", "at_risk"]
-        if not all(col in df.columns for col in expected_cols):
-            missing = [col for col in expected_cols if col not in df.columns]
+        available = dataset_columns(file_path)
+        missing = [col for col in columns if col not in available]
+        if missing:
             logger.error(f"Missing columns: {missing}")
             raise ValueError(f"Missing columns: {missing}")
+        if file_path.suffix == ".parquet":
+            df = pd.read_parquet(file_path, columns=columns)
+        elif file_path.suffix == ".feather":
+            df = pd.read_feather(file_path, columns=columns)
+        else:
+            df = pd.read_csv(file_path, usecols=columns)[columns]
         logger.info(f"Loaded data from {file_path} with shape {df.shape}")
         return df
     except FileNotFoundError:
@@ -224,17 +258,58 @@ def save_model(model: Pipeline, model_path: Path) -> None:
     """Save the trained model to disk."""
     try:
         MODEL_DIR.mkdir(parents=True, exist_ok=True)
-        joblib.dump(model, model_path)
+        # Write to a temporary file and rename it into place, so a running service
+        # watching model_path never picks up a half-written model
+        tmp_path = model_path.with_name(model_path.name + ".tmp")
+        joblib.dump(model, tmp_path)
+        os.replace(tmp_path, model_path)
         logger.info(f"Saved model to {model_path}")
     except Exception as e:
         logger.error(f"Error saving model: {str(e)}")
         raise
 
-def main():
+def export_bundle(model: Pipeline, X: pd.DataFrame, metrics: dict, bundle_path: Path) -> dict:
+    """Export the model as a versioned bundle (native booster, scaler arrays, schema, metrics)."""
+    try:
+        # The bundle format is shared with the serving code in app/
+        if str(MODEL_DIR) not in sys.path:
+            sys.path.insert(0, str(MODEL_DIR))
+        from bundle import feature_type
+        from predictors import FastPredictor
+
+        predictor = FastPredictor.from_pipeline(model)
+        types = {col: feature_type(dtype) for col, dtype in X.dtypes.items()}
+        manifest = predictor.save(
+            bundle_path,
+            feature_types=[types[name] for name in predictor.feature_names],
+            metrics={
+                'roc_auc': float(metrics['roc_auc']),
+                'avg_precision': float(metrics['avg_precision']),
+                'cv_roc_auc_mean': float(metrics['cv_scores'].mean()),
+                'cv_roc_auc_std': float(metrics['cv_scores'].std()),
+                'train_roc_auc': float(metrics['train_roc_auc']),
+            },
+            training_rows=int(len(X)),
+            random_seed=RANDOM_SEED,
+        )
+
+        # The bundle has to score exactly like the pipeline it was exported from
+        exported = FastPredictor.load(bundle_path)
+        X_check = X[exported.feature_names].to_numpy(dtype=np.float32)
+        diff = np.max(np.abs(model.predict_proba(X[exported.feature_names])[:, 1] - exported.predict_proba(X_check)))
+        if diff > 1e-6:
+            raise ValueError(f"Exported bundle disagrees with the pipeline (max difference {diff:.3g})")
+        logger.info(f"Exported model bundle {manifest['content_hash'][:12]} to {bundle_path}")
+        return manifest
+    except Exception as e:
+        logger.error(f"Error exporting model bundle: {str(e)}")
+        raise
+
+def main(data_path: Path = None):
     """Main function to orchestrate model training and evaluation."""
     try:
         # Load data
-        final_df = load_data(DATA_DIR / "final_df-v2.csv")
+        final_df = load_data(data_path or find_dataset(DATA_DIR))
 
         # Prepare features and target
         X, y, continuous_cols, cat_cols = prepare_features_and_target(final_df)
@@ -260,6 +335,7 @@ def main():
 
         # Save model
         save_model(model_pipeline, MODEL_PATH)
+        export_bundle(model_pipeline, X, metrics, BUNDLE_PATH)
 
         # Save metrics
         metrics_df = pd.DataFrame({
@@ -274,4 +350,7 @@ def main():
         raise
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Train and evaluate the risk model on the processed dataset.")
+    parser.add_argument("--data", type=Path, help="Processed dataset to train on (default: the newest final_df-v2.* in data/)")
+    args = parser.parse_args()
+    main(args.data)
@@ -0,0 +1,251 @@
+import hashlib
+import importlib.metadata
+import inspect
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Content-hash caching for pipeline stages. A stage declares its input files, output files,
+# parameters and the functions that make up its code; its cache key is a SHA-256 over all of
+# them (input files by content) plus the Python and library versions. After a stage runs, its
+# outputs are hard-linked (or copied) into <cache dir>/<stage>/<key>/; a later run with the
+# same key restores them from there instead of running the stage.
+
+# Cache entries kept per stage, most recently used first
+ENTRIES_PER_STAGE = 3
+# Libraries whose version is part of every key (they decide what a stage writes)
+KEY_LIBRARIES = ("numpy", "pandas", "pyarrow")
+
+
+class Stage:
+    """
+    One named step of the pipeline.
+    run: callable taking no arguments that writes every path in outputs
+    inputs / outputs: files read / written; params: JSON-serializable settings;
+    code: functions (or classes) whose source is part of the key
+    """
+
+    def __init__(self, name, run, inputs, outputs, params=None, code=()):
+        self.name = name
+        self.run = run
+        self.inputs = [Path(path) for path in inputs]
+        self.outputs = [Path(path) for path in outputs]
+        self.params = params or {}
+        self.code = code
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def library_versions():
+    versions = {"python": sys.version.split()[0]}
+    for name in KEY_LIBRARIES:
+        try:
+            versions[name] = importlib.metadata.version(name)
+        except importlib.metadata.PackageNotFoundError:
+            versions[name] = None
+    return versions
+
+
+class StageCache:
+    """
+    Cache of stage outputs under root. File digests are remembered by (size, mtime, inode),
+    so an unchanged multi-gigabyte input is hashed once, not on every run.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self._digests_path = self.root / "digests.json"
+        try:
+            self._digests = json.loads(self._digests_path.read_text())
+        except (OSError, ValueError):
+            self._digests = {}
+
+    def digest(self, path):
+        path = Path(path).resolve()
+        st = path.stat()
+        stamp = [st.st_size, st.st_mtime_ns, st.st_ino]
+        known = self._digests.get(str(path))
+        if known and known[:3] == stamp:
+            return known[3]
+        digest = file_digest(path)
+        self._digests[str(path)] = stamp + [digest]
+        return digest
+
+    def save_digests(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        # Forget files that no longer exist so the index doesn't grow forever
+        self._digests = {path: entry for path, entry in self._digests.items() if os.path.exists(path)}
+        tmp_path = self._digests_path.with_name(self._digests_path.name + ".tmp")
+        tmp_path.write_text(json.dumps(self._digests))
+        os.replace(tmp_path, self._digests_path)
+
+    def key(self, stage):
+        """SHA-256 over the stage's name, params, code, input contents and library versions."""
+        missing = [str(path) for path in stage.inputs if not path.exists()]
+        if missing:
+            raise FileNotFoundError(f"Stage {stage.name}: missing inputs {missing}")
+        description = {
+            "stage": stage.name,
+            "params": stage.params,
+            "code": [inspect.getsource(obj) for obj in stage.code],
+            "inputs": [[path.name, self.digest(path)] for path in stage.inputs],
+            "outputs": [path.name for path in stage.outputs],
+            "versions": library_versions(),
+        }
+        return hashlib.sha256(json.dumps(description, sort_keys=True, default=repr).encode()).hexdigest()
+
+    def _entry(self, stage, key):
+        return self.root / stage.name / key
+
+    def restore(self, stage, key):
+        """Put the cached outputs for key in place; False if there is no complete entry."""
+        entry = self._entry(stage, key)
+        try:
+            manifest = json.loads((entry / "manifest.json").read_text())
+        except (OSError, ValueError):
+            return False
+        cached = [entry / path.name for path in stage.outputs]
+        if not all(path.exists() for path in cached):
+            return False
+        for path, source in zip(stage.outputs, cached):
+            if path.exists() and self.digest(path) == manifest["outputs"].get(path.name):
+                continue
+            link_or_copy(source, path)
+        os.utime(entry)
+        return True
+
+    def store(self, stage, key):
+        """Record the stage's freshly written outputs under key."""
+        entry = self._entry(stage, key)
+        tmp_entry = entry.with_name(entry.name + ".tmp")
+        shutil.rmtree(tmp_entry, ignore_errors=True)
+        tmp_entry.mkdir(parents=True)
+        for path in stage.outputs:
+            link_or_copy(path, tmp_entry / path.name)
+        manifest = {
+            "stage": stage.name,
+            "params": stage.params,
+            "outputs": {path.name: self.digest(path) for path in stage.outputs},
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        (tmp_entry / "manifest.json").write_text(json.dumps(manifest, indent=2, default=repr))
+        shutil.rmtree(entry, ignore_errors=True)
+        os.replace(tmp_entry, entry)
+        self.prune(stage.name)
+
+    def prune(self, stage_name, keep=ENTRIES_PER_STAGE):
+        stage_dir = self.root / stage_name
+        entries = sorted((p for p in stage_dir.iterdir() if p.is_dir()), key=lambda p: p.stat().st_mtime, reverse=True)
+        for old in entries[keep:]:
+            shutil.rmtree(old, ignore_errors=True)
+
+    def invalidate(self, stage_name):
+        """Drop every cached entry of a stage; returns how many were removed."""
+        stage_dir = self.root / stage_name
+        if not stage_dir.exists():
+            return 0
+        removed = sum(1 for p in stage_dir.iterdir() if p.is_dir())
+        shutil.rmtree(stage_dir)
+        return removed
+
+
+def link_or_copy(source, target):
+    """Hard-link source to target (replacing target), copying when linking isn't possible."""
+    tmp_path = Path(target).with_name(Path(target).name + ".link")
+    tmp_path.unlink(missing_ok=True)
+    try:
+        os.link(source, tmp_path)
+    except OSError:
+        shutil.copy2(source, tmp_path)
+    os.replace(tmp_path, target)
+
+
+def stage_waves(stages):
+    """
+    Split stages, in order, into waves of stages that don't read each other's outputs; the
+    stages of one wave can run concurrently once the previous waves are done.
+    """
+    waves = []
+    written = set()
+    for stage in stages:
+        inputs = {path.resolve() for path in stage.inputs}
+        if not waves or inputs & written:
+            waves.append([])
+            written = set()
+        waves[-1].append(stage)
+        written |= {path.resolve() for path in stage.outputs}
+    return waves
+
+
+def timed_run(stage):
+    """Run a stage and return how long it took (used in worker processes)."""
+    start = time.perf_counter()
+    stage.run()
+    return time.perf_counter() - start
+
+
+def run_stages(stages, cache=None, force=(), processes=1):
+    """
+    Run stages in order, skipping each one whose key has a cached entry (restoring its
+    outputs) unless it is named in force. Without a cache every stage runs. With processes
+    above 1, the stages of a wave that need to run go to that many spawned worker processes
+    at once; anything they would pass on in memory is lost, so later stages must read their
+    outputs. Returns [(stage name, "ran" or "cached", seconds)].
+    """
+    report = []
+    total_start = time.perf_counter()
+    for wave in stage_waves(stages):
+        wave_start = time.perf_counter()
+        results = {}
+        pending = []
+        for stage in wave:
+            start = time.perf_counter()
+            key = cache.key(stage) if cache else None
+            if cache and stage.name not in force and cache.restore(stage, key):
+                seconds = time.perf_counter() - start
+                logger.info(f"Stage {stage.name}: cached in {seconds:.2f}s (key {key[:12]})")
+                results[stage.name] = "cached", seconds
+            else:
+                pending.append((stage, key))
+
+        if len(pending) > 1 and processes > 1:
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=min(processes, len(pending)), mp_context=context) as pool:
+                futures = [pool.submit(timed_run, stage) for stage, _ in pending]
+                durations = [future.result() for future in futures]
+        else:
+            durations = [timed_run(stage) for stage, _ in pending]
+
+        for (stage, key), seconds in zip(pending, durations):
+            if cache:
+                cache.store(stage, key)
+            logger.info(f"Stage {stage.name}: ran in {seconds:.2f}s" + (f" (key {key[:12]})" if key else ""))
+            results[stage.name] = "ran", seconds
+        report.extend((stage.name, *results[stage.name]) for stage in wave)
+        if len(pending) > 1:
+            mode = f"concurrently in {min(processes, len(pending))} processes" if processes > 1 else "one after another"
+            logger.info(
+                f"Stages {', '.join(stage.name for stage, _ in pending)} ran {mode}: "
+                f"{time.perf_counter() - wave_start:.2f}s wall for {sum(durations):.2f}s of stage time"
+            )
+    if cache:
+        cache.save_digests()
+    logger.info(
+        f"Pipeline finished in {time.perf_counter() - total_start:.2f}s: "
+        + ", ".join(f"{name} {status} {seconds:.2f}s" for name, status, seconds in report)
+    )
+    return report
@@ -0,0 +1,59 @@
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import encoder_pool
+import main  # loads the model and data and warms up (and puts ../common on sys.path)
+from asgi_support import BoundedExecutor, WsgiPoolApp
+
+# ASGI entry point for the search service, for running under uvicorn:
+#   uvicorn asgi:app --app-dir semantic_search --port 5001
+#
+# Serves the same Flask endpoints as main:app, with each request's handler running on a
+# bounded pool. When every worker is busy and the queue is full, the request is answered
+# immediately with 503 and Retry-After instead of waiting.
+#
+# SEARCH_ENCODER_POOL=thread (default) encodes queries on the handler threads.
+# SEARCH_ENCODER_POOL=process encodes them in SEARCH_ENCODER_WORKERS spawned processes, each
+# with its own copy of the model, so encoding isn't limited by one interpreter's GIL or
+# torch thread pool. Handler threads then only parse, rank and serialize.
+
+logger = logging.getLogger(__name__)
+
+ENCODER_POOL = os.getenv("SEARCH_ENCODER_POOL", "thread")
+ENCODER_WORKERS = int(os.getenv("SEARCH_ENCODER_WORKERS", 2))
+# Requests allowed to wait for a worker before new ones are refused with 503
+ENCODER_QUEUE = int(os.getenv("SEARCH_ENCODER_QUEUE", 32))
+
+if ENCODER_POOL not in ("thread", "process"):
+    raise ValueError(f"SEARCH_ENCODER_POOL must be 'thread' or 'process', got {ENCODER_POOL!r}")
+
+encoders = None
+if ENCODER_POOL == "process":
+    # One handler thread per encoder process; admission is bounded by the handler pool,
+    # so the process pool never has more than ENCODER_WORKERS queries outstanding
+    encoders = ProcessPoolExecutor(
+        ENCODER_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=encoder_pool.init_encoder,
+        initargs=(main.MODEL_NAME, main.WARMUP_QUERIES[0]),
+    )
+    # Start every worker now (the pool spawns lazily) so no request waits for a model load
+    for future in [encoders.submit(encoder_pool.encode, main.WARMUP_QUERIES[0]) for _ in range(ENCODER_WORKERS)]:
+        future.result()
+
+    def encode_query(query):
+        return encoders.submit(encoder_pool.encode, query).result()
+
+    main.encode_query = encode_query
+
+
+def shutdown_encoders():
+    if encoders is not None:
+        encoders.shutdown(cancel_futures=True)
+
+
+pool = BoundedExecutor(ENCODER_WORKERS, ENCODER_QUEUE, name="search")
+app = WsgiPoolApp(main.app.wsgi_app, pool, on_shutdown=shutdown_encoders)
+logger.info(f"ASGI app serving with {ENCODER_WORKERS} {ENCODER_POOL} encoder worker(s), queue limit {ENCODER_QUEUE}")
@@ -0,0 +1,21 @@
+import logging
+
+# Sentence encoder for worker processes of the ASGI search service (SEARCH_ENCODER_POOL=process).
+# Kept free of Flask and the provider data so a spawned worker only loads the model.
+
+logger = logging.getLogger(__name__)
+
+model = None
+
+
+def init_encoder(model_name, warmup_query):
+    """Process pool initializer: load the model once per worker and run one query through it."""
+    global model
+    from sentence_transformers import SentenceTransformer
+    model = SentenceTransformer(model_name)
+    model.encode([warmup_query])
+    logger.info(f"Encoder worker ready with {model_name}")
+
+
+def encode(query):
+    return model.encode([query])
@@ -1,12 +1,20 @@
 import json
 import logging
 import os
+import sys
+import time
 import numpy as np
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
 from sentence_transformers import SentenceTransformer
 from sklearn.metrics.pairwise import cosine_similarity
 
+# Modules shared with app/ live in ../common; Docker builds copy them next to this file
+COMMON_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common")
+if os.path.isdir(COMMON_DIR) and COMMON_DIR not in sys.path:
+    sys.path.append(COMMON_DIR)
+import schema
+
 
 # Setup logging
 def setup_logger():
@@ -22,6 +30,42 @@ logger = setup_logger()
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 PROVIDERS_PATH = os.path.join(BASE_DIR, "providers.json")  # Path to saved providers
 EMBEDDINGS_PATH = os.path.join(BASE_DIR, "embeddings.npy")  # Path to saved embeddings
+MODEL_NAME = "all-MiniLM-L6-v2"  # Sentence transformer used for queries and provider embeddings
+
+# Startup warmup: synthetic /search requests run before /readyz reports ready (0 disables)
+WARMUP_REQUESTS = int(os.getenv("SEARCH_WARMUP_REQUESTS", 8))
+
+# Queries of varying length, so the tokenizer and model see a spread of sequence shapes
+WARMUP_QUERIES = [
+    "food",
+    "help paying rent",
+    "emergency shelter for families tonight",
+    "legal aid for tenants facing eviction and unsafe housing conditions",
+    "job training, childcare and transportation assistance for single parents looking for stable housing",
+]
+
+# Request and response schemas, declared once (see common/schema.py)
+SEARCH_REQUEST = schema.Request(
+    [
+        schema.Field("query", "str", error="query must be a string"),
+        schema.Field("top_n", "int", required=False, default=3),
+    ],
+    missing_error="Missing query parameter",
+)
+SEARCH_RESPONSE = schema.Object([
+    schema.Field("query", "str"),
+    schema.Field("results", schema.ListOf(schema.Object([
+        schema.Field("provider", "str"),
+        schema.Field("services", "str"),
+        schema.Field("similarity_score", "float"),
+    ]))),
+])
+
+
+# JSON response from a response schema (same body as jsonify)
+def schema_response(response_schema, obj):
+    return Response(response_schema.dumps(obj) + "\n", mimetype="application/json")
+
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -29,10 +73,9 @@ CORS(app)
 
 # Load model and create embeddings on startup
 def load_model_and_data():
-    model_name = "all-MiniLM-L6-v2"
     try:
-        logger.info(f"Loading sentence transformer model: {model_name}")
-        model = SentenceTransformer(model_name)
+        logger.info(f"Loading sentence transformer model: {MODEL_NAME}")
+        model = SentenceTransformer(MODEL_NAME)
 
         logger.info(f"Loading providers data from {PROVIDERS_PATH}...")
         with open(PROVIDERS_PATH, "r") as f:
@@ -62,17 +105,20 @@ except Exception as e:
     raise
 
 
+# Query embedding for /search; asgi.py swaps this for an encoder process pool
+def encode_query(query):
+    return model.encode([query])
+
+
 @app.route("/search", methods=["POST"])
 def search_endpoint():
     """Search endpoint"""
     try:
-        data = request.get_json(force=True)
-
-        if "query" not in data:
-            return jsonify({"error": "Missing query parameter"}), 400
-
-        query = data["query"]
-        top_n = int(data.get("top_n", 3))
+        data = json.loads(request.get_data(cache=False))
+        values, error = SEARCH_REQUEST.validate(data)
+        if error:
+            return jsonify({"error": error}), 400
+        query, top_n = values
 
         # Validate top_n
         if top_n < 1 or top_n > len(providers):
@@ -82,7 +128,7 @@ def search_endpoint():
             )
 
         # Generate query embedding
-        query_embedding = model.encode([query])
+        query_embedding = encode_query(query)
 
         # Calculate similarities
         similarities = cosine_similarity(query_embedding, embeddings)[0]
@@ -99,13 +145,70 @@ def search_endpoint():
                 }
             )
 
-        return jsonify({"query": query, "results": results})
+        return schema_response(SEARCH_RESPONSE, {"query": query, "results": results})
 
     except Exception as e:
         logger.error(f"Search error: {e}")
         return jsonify({"error": "Search processing error"}), 500
 
 
+@app.route("/healthz", methods=["GET"])
+def healthz_endpoint():
+    """Liveness: the process is up and serving HTTP"""
+    return jsonify({"status": "ok"})
+
+
+@app.route("/readyz", methods=["GET"])
+def readyz_endpoint():
+    """Readiness: this process has finished its warmup"""
+    if ready_pid != os.getpid():
+        return jsonify({"status": "warming up"}), 503
+    return jsonify({"status": "ready", "warmup_seconds": round(warmup_seconds, 3)})
+
+
+# Process that completed warmup (a worker forked after warmup has to warm up again)
+ready_pid = None
+warmup_seconds = None
+
+
+def warmup():
+    """
+    Send WARMUP_REQUESTS synthetic queries through /search with the Flask test client so
+    the first real search doesn't pay for torch's first-call overhead, then mark this
+    process ready for /readyz.
+    """
+    global ready_pid, warmup_seconds
+    if ready_pid == os.getpid():
+        return
+    start = time.perf_counter()
+    client = app.test_client()
+    latencies = []
+    for i in range(WARMUP_REQUESTS):
+        payload = {"query": WARMUP_QUERIES[i % len(WARMUP_QUERIES)], "top_n": min(3, len(providers))}
+        sent = time.perf_counter()
+        resp = client.post("/search", json=payload)
+        latencies.append(time.perf_counter() - sent)
+        if resp.status_code != 200:
+            raise RuntimeError(f"Warmup /search failed with {resp.status_code}: {resp.get_data(as_text=True)}")
+
+    warmup_seconds = time.perf_counter() - start
+    ready_pid = os.getpid()
+    if latencies:
+        logger.info(
+            f"Warmup finished in {warmup_seconds:.3f}s ({len(latencies)} requests; "
+            f"first request {latencies[0] * 1000:.1f}ms, last {latencies[-1] * 1000:.1f}ms)"
+        )
+    else:
+        logger.info("Warmup disabled")
+
+
+try:
+    warmup()
+except Exception as e:
+    logger.critical(f"Warmup failed: {e}")
+    raise
+
+
 if __name__ == "__main__":
     port = int(os.getenv("PORT", 5001))
     app.run(host="0.0.0.0", port=port)
@@ -0,0 +1,10 @@
+import os
+import sys
+
+# In-process unit tests import the service and pipeline modules directly, the same way
+# they import each other when run from their own directories
+MODEL_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for subdir in ("app", "common", "pipeline"):
+    path = os.path.join(MODEL_DIR, subdir)
+    if path not in sys.path:
+        sys.path.insert(0, path)
@@ -0,0 +1,97 @@
+import threading
+import time
+import pytest
+from admission import ConcurrencyLimiter, RateLimiter, Rejected, check_deadline, parse_deadline
+
+
+# 1) Deadline headers parse from epoch milliseconds; absent, malformed or non-finite values are ignored
+def test_parse_deadline():
+    assert parse_deadline("1700000000500") == 1700000000.5
+    for value in (None, "", "soon", "nan", "inf"):
+        assert parse_deadline(value) is None
+
+
+# 2) A deadline that has passed is rejected with 504; a future or missing one is not
+def test_check_deadline():
+    with pytest.raises(Rejected) as info:
+        check_deadline(100.0, now=100.0)
+    assert info.value.status == 504 and info.value.reason == "expired"
+    assert info.value.retry_after is None
+    check_deadline(100.5, now=100.0)
+    check_deadline(None, now=100.0)
+
+
+# 3) Slots are handed out up to max_concurrent, and a release lets a queued request in
+def test_concurrency_slot_handoff():
+    limiter = ConcurrencyLimiter(max_concurrent=1, max_queue=1, queue_timeout=5)
+    limiter.acquire()
+    acquired = threading.Event()
+
+    def waiter():
+        limiter.acquire()
+        acquired.set()
+
+    thread = threading.Thread(target=waiter)
+    thread.start()
+    time.sleep(0.05)
+    assert not acquired.is_set() and limiter._waiting == 1
+    limiter.release()
+    thread.join(timeout=5)
+    assert acquired.is_set() and limiter._active == 1 and limiter._waiting == 0
+    limiter.release()
+    assert limiter._active == 0
+
+
+# 4) With the queue full, a new request is refused at once with 503 and Retry-After
+def test_concurrency_queue_full():
+    limiter = ConcurrencyLimiter(max_concurrent=1, max_queue=0, queue_timeout=2.5)
+    limiter.acquire()
+    start = time.monotonic()
+    with pytest.raises(Rejected) as info:
+        limiter.acquire()
+    assert time.monotonic() - start < 0.5
+    assert info.value.status == 503 and info.value.reason == "queue_full"
+    assert info.value.retry_after == 3
+
+
+# 5) A queued request gives up after queue_timeout with 503, or earlier with 504 if its deadline passes first
+def test_concurrency_queue_timeout_and_deadline():
+    limiter = ConcurrencyLimiter(max_concurrent=1, max_queue=4, queue_timeout=0.05)
+    limiter.acquire()
+    with pytest.raises(Rejected) as info:
+        limiter.acquire()
+    assert info.value.status == 503 and info.value.reason == "queue_timeout"
+
+    limiter.queue_timeout = 5
+    start = time.monotonic()
+    with pytest.raises(Rejected) as info:
+        limiter.acquire(deadline=time.time() + 0.05)
+    assert time.monotonic() - start < 1
+    assert info.value.status == 504 and info.value.reason == "expired"
+    assert limiter._waiting == 0 and limiter._active == 1
+
+
+# 6) A caller may spend its burst at once, then gets 429 until tokens refill at `rate` per second
+def test_rate_limit_burst_then_429():
+    limiter = RateLimiter(rate=2, burst=3)
+    for _ in range(3):
+        limiter.check("a", now=10.0)
+    with pytest.raises(Rejected) as info:
+        limiter.check("a", now=10.0)
+    assert info.value.status == 429 and info.value.reason == "rate_limited"
+    assert info.value.retry_after == 1
+    limiter.check("a", now=10.5)
+    with pytest.raises(Rejected):
+        limiter.check("a", now=10.5)
+
+
+# 7) Buckets are per caller, and only the max_callers most recent callers are remembered
+def test_rate_limit_per_caller():
+    limiter = RateLimiter(rate=1, burst=1, max_callers=2)
+    limiter.check("user:a", now=0.0)
+    limiter.check("user:b", now=0.0)
+    with pytest.raises(Rejected):
+        limiter.check("user:a", now=0.0)
+    limiter.check("ip:10.0.0.1", now=0.0)  # evicts user:b, the least recently seen
+    assert list(limiter._buckets) == ["user:a", "ip:10.0.0.1"]
+    limiter.check("user:b", now=0.0)
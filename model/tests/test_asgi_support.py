@@ -0,0 +1,91 @@
+import asyncio
+import json
+import threading
+import pytest
+from asgi_support import MAX_BODY_BYTES, BoundedExecutor, Overloaded, WsgiPoolApp
+
+
+class BlockingWsgiApp:
+    """WSGI app whose requests hold their pool thread until release is set."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = threading.Semaphore(0)
+
+    def __call__(self, environ, start_response):
+        self.started.release()
+        self.release.wait(10)
+        start_response("200 OK", [("Content-Type", "application/json")])
+        return [b'{"ok":true}']
+
+
+async def call(app, path="/predict", body=b"{}"):
+    """Send one HTTP request through the ASGI app; returns (status, headers dict, body)."""
+    sent = []
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "POST", "path": path, "headers": [(b"content-type", b"application/json")]}
+    await app(scope, receive, send)
+    start, body = sent
+    return start["status"], {k.decode(): v.decode() for k, v in start["headers"]}, body["body"]
+
+
+# 1) Once workers + max_queue requests are in flight, the next one is answered 503 at once with Retry-After
+def test_full_queue_sheds_with_503():
+    wsgi = BlockingWsgiApp()
+    pool = BoundedExecutor(1, 1, name="test-pool")
+    app = WsgiPoolApp(wsgi, pool)
+
+    async def scenario():
+        admitted = [asyncio.ensure_future(call(app)) for _ in range(2)]
+        await asyncio.to_thread(wsgi.started.acquire, True, 5)  # one running, one queued
+        while pool.pending < 2:
+            await asyncio.sleep(0.001)
+        status, headers, body = await call(app)
+        wsgi.release.set()
+        return (status, headers, body), await asyncio.gather(*admitted)
+
+    try:
+        (status, headers, body), admitted = asyncio.run(scenario())
+    finally:
+        wsgi.release.set()
+        pool.shutdown()
+    assert status == 503
+    assert headers["retry-after"] == "1"
+    assert json.loads(body) == {"error": "Server overloaded, retry later"}
+    assert [s for s, _, _ in admitted] == [200, 200]
+    assert pool.pending == 0
+
+
+# 2) Retry-After is whole seconds, at least 1, from the recent submit-to-done latency
+def test_retry_after_estimate():
+    pool = BoundedExecutor(1, 0, name="test-pool")
+    gate = threading.Event()
+    try:
+        pool._latency = 2.3
+        pool.submit(gate.wait, 5)
+        with pytest.raises(Overloaded) as excinfo:
+            pool.submit(gate.wait, 5)
+        assert excinfo.value.retry_after == 3
+    finally:
+        gate.set()
+        pool.shutdown()
+
+
+# 3) Bodies over the limit get 413 without reaching the pool
+def test_body_limit():
+    wsgi = BlockingWsgiApp()
+    wsgi.release.set()
+    pool = BoundedExecutor(1, 0, name="test-pool")
+    try:
+        status, _, _ = asyncio.run(call(WsgiPoolApp(wsgi, pool), body=b"x" * (MAX_BODY_BYTES + 1)))
+    finally:
+        pool.shutdown()
+    assert status == 413
+    assert not wsgi.started.acquire(blocking=False)
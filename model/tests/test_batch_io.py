@@ -0,0 +1,48 @@
+import io
+import json
+import numpy as np
+from batch_io import JsonlWriter, parse_records, required_fields, score_chunks
+from features import FEATURE_MAP, FEATURE_ORDER, FeatureEncoder
+import predictor_script
+
+SERVICE_ENCODER = FeatureEncoder(FEATURE_MAP, FEATURE_ORDER)
+LEGACY_ENCODER = FeatureEncoder(predictor_script.FEATURE_MAP, predictor_script.FEATURE_ORDER)
+
+APPLICANT = {"age": 35, "income": 32000, "veteran": False, "benefits": True}
+
+
+# 1) num_people is required exactly when the model reads it
+def test_required_fields_follow_the_model():
+    assert "num_people" in required_fields(SERVICE_ENCODER)
+    assert "num_people" not in required_fields(LEGACY_ENCODER)
+    assert "num_people" not in LEGACY_ENCODER.raw_fields
+
+
+# 2) For the service's model, a record without num_people is a per-row error, not a one-person household
+def test_missing_num_people_is_a_row_error():
+    records = [{**APPLICANT, "num_people": 3}, dict(APPLICANT), {**APPLICANT, "num_people": None}]
+    raw, errors = parse_records(records, required_fields(SERVICE_ENCODER))
+    assert errors == [None, "Missing or invalid num_people", "Missing or invalid num_people"]
+    assert raw[0].tolist() == [35, 32000, 3, 0, 1, 0]
+
+    # ... also when no record in the chunk has it
+    _, errors = parse_records([dict(APPLICANT)] * 2, required_fields(SERVICE_ENCODER))
+    assert errors == ["Missing or invalid num_people"] * 2
+
+
+# 3) Models that don't read num_people still score records without it
+def test_num_people_optional_for_legacy_model():
+    raw, errors = parse_records([dict(APPLICANT)], required_fields(LEGACY_ENCODER))
+    assert errors == [None]
+    assert raw[0].tolist() == [35, 32000, 1, 0, 1, 0]
+
+
+# 4) Bulk scoring writes the error for the incomplete row and scores the rest
+def test_score_chunks_reports_missing_num_people():
+    out = io.StringIO()
+    records = [{**APPLICANT, "num_people": 2}, dict(APPLICANT)]
+    stats = score_chunks([records], SERVICE_ENCODER, lambda X: np.full(len(X), 0.7), JsonlWriter(out), threshold=0.4)
+    lines = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert stats == {"rows": 2, "scored": 1, "errors": 1}
+    assert lines[0]["prediction"] == 1 and lines[0]["label"] == "At risk"
+    assert lines[1]["error"] == "Missing or invalid num_people"
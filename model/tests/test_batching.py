@@ -0,0 +1,125 @@
+import threading
+import time
+import numpy as np
+import pytest
+from batching import MicroBatcher
+
+N_FEATURES = 3
+
+
+class RecordingModel:
+    """predict_fn stand-in: remembers the size of every batch and returns each row's first feature."""
+
+    def __init__(self, fail=False, delay=0.0):
+        self.batches = []
+        self.fail = fail
+        self.delay = delay
+
+    def __call__(self, X):
+        self.batches.append(len(X))
+        time.sleep(self.delay)
+        if self.fail:
+            raise ValueError("model exploded")
+        return X[:, 0].copy()
+
+
+def submit_rows(batcher, n):
+    return [batcher.submit(np.full(N_FEATURES, i, dtype=np.float32)) for i in range(n)]
+
+
+# 1) A full batch is flushed as soon as max_batch_size rows are queued, without waiting out the window
+def test_flush_on_size():
+    model = RecordingModel()
+    batcher = MicroBatcher(model, N_FEATURES, max_batch_size=4, max_wait_ms=10_000)
+    try:
+        start = time.perf_counter()
+        futures = submit_rows(batcher, 4)
+        assert [f.result(timeout=5) for f in futures] == [0.0, 1.0, 2.0, 3.0]
+        assert time.perf_counter() - start < 5
+        assert model.batches == [4]
+    finally:
+        batcher.close()
+
+
+# 2) A partial batch is flushed once max_wait_ms has passed since its first row arrived
+def test_flush_on_timeout():
+    model = RecordingModel()
+    batcher = MicroBatcher(model, N_FEATURES, max_batch_size=64, max_wait_ms=50)
+    try:
+        start = time.perf_counter()
+        futures = submit_rows(batcher, 3)
+        assert [f.result(timeout=5) for f in futures] == [0.0, 1.0, 2.0]
+        assert time.perf_counter() - start >= 0.05
+        assert model.batches == [3]
+    finally:
+        batcher.close()
+
+
+# 3) Rows from concurrent threads are coalesced and every caller gets its own probability
+def test_concurrent_callers_get_their_own_result():
+    model = RecordingModel(delay=0.01)
+    batcher = MicroBatcher(model, N_FEATURES, max_batch_size=8, max_wait_ms=20)
+    results = {}
+
+    def call(i):
+        results[i] = batcher.predict(np.full(N_FEATURES, i, dtype=np.float32), timeout=5)
+
+    try:
+        threads = [threading.Thread(target=call, args=(i,)) for i in range(20)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert results == {i: float(i) for i in range(20)}
+        assert sum(model.batches) == 20
+        assert max(model.batches) <= 8
+        assert len(model.batches) < 20
+    finally:
+        batcher.close()
+
+
+# 4) A failing model call reaches every waiter of that batch, and the batcher keeps serving
+def test_error_reaches_every_waiter():
+    model = RecordingModel(fail=True)
+    batcher = MicroBatcher(model, N_FEATURES, max_batch_size=3, max_wait_ms=10_000)
+    try:
+        futures = submit_rows(batcher, 3)
+        for future in futures:
+            with pytest.raises(ValueError, match="model exploded"):
+                future.result(timeout=5)
+        model.fail = False
+        assert [f.result(timeout=5) for f in submit_rows(batcher, 3)] == [0.0, 1.0, 2.0]
+    finally:
+        batcher.close()
+
+
+# 5) A closed batcher refuses new rows
+def test_submit_after_close():
+    batcher = MicroBatcher(RecordingModel(), N_FEATURES)
+    batcher.close()
+    with pytest.raises(RuntimeError):
+        batcher.submit(np.zeros(N_FEATURES))
+
+
+# 6) Each row is scored by the predictor it was submitted with, even when a batch mixes two models
+def test_rows_scored_by_their_pinned_predictor():
+    class Predictor:
+        def __init__(self, offset):
+            self.offset = offset
+            self.batches = []
+
+        def predict_proba(self, X):
+            self.batches.append(len(X))
+            return X[:, 0] + self.offset
+
+    old, new = Predictor(100), Predictor(200)
+    batcher = MicroBatcher(None, N_FEATURES, max_batch_size=4, max_wait_ms=10_000)
+    try:
+        rows = [np.full(N_FEATURES, i, dtype=np.float32) for i in range(4)]
+        futures = [batcher.submit(row, old if i % 2 else new) for i, row in enumerate(rows)]
+        assert [f.result(timeout=5) for f in futures] == [200.0, 101.0, 202.0, 103.0]
+        assert old.batches == [2] and new.batches == [2]
+        with pytest.raises(ValueError):
+            batcher.submit(rows[0])
+    finally:
+        batcher.close()
@@ -0,0 +1,67 @@
+import sys
+import time
+import numpy as np
+from cache import ENTRY_OVERHEAD_BYTES, PredictionCache
+
+
+def key(i):
+    return PredictionCache.key_for(np.array([i, 1, 2], dtype=np.float32))
+
+
+# 1) The least recently used entry is evicted once max_entries is exceeded
+def test_evicts_least_recently_used():
+    cache = PredictionCache(max_entries=2)
+    cache.put(key(1), 0.1)
+    cache.put(key(2), 0.2)
+    assert cache.get(key(1)) == 0.1  # key(2) is now the least recently used
+    cache.put(key(3), 0.3)
+    assert len(cache) == 2
+    assert cache.get(key(2)) is None
+    assert cache.get(key(1)) == 0.1
+    assert cache.get(key(3)) == 0.3
+    assert cache.evictions == 1
+
+
+# 2) The byte budget evicts as well, and re-putting a key doesn't count it twice
+def test_evicts_over_byte_budget():
+    entry_size = sys.getsizeof(key(0)) + ENTRY_OVERHEAD_BYTES
+    cache = PredictionCache(max_entries=100, max_bytes=3 * entry_size)
+    for i in range(3):
+        cache.put(key(i), 0.5)
+    cache.put(key(2), 0.6)
+    assert len(cache) == 3 and cache.evictions == 0
+    cache.put(key(3), 0.5)
+    assert len(cache) == 3 and cache.evictions == 1
+    assert cache.get(key(0)) is None
+
+
+# 3) Entries expire after the TTL
+def test_ttl_expiry():
+    cache = PredictionCache(ttl_seconds=0.01)
+    cache.put(key(1), 0.1)
+    time.sleep(0.02)
+    assert cache.get(key(1)) is None
+    assert cache.expirations == 1 and len(cache) == 0
+
+
+# 4) Equal feature values share a key whatever dtype, layout or sign of zero they arrive with
+def test_key_normalization():
+    expected = PredictionCache.key_for(np.array([35, 32000, 0], dtype=np.float32))
+    assert PredictionCache.key_for(np.array([35.0, 32000.0, -0.0])) == expected
+    assert PredictionCache.key_for(np.array([[35, 32000, 0]], dtype=np.int64)) == expected
+    wide = np.array([[35, 99, 32000, 99, 0]], dtype=np.float32)
+    assert PredictionCache.key_for(wide[0, ::2]) == expected
+    assert PredictionCache.key_for(np.array([35, 32001, 0], dtype=np.float32)) != expected
+
+
+# 5) Binding a new model version clears the cache, and stale results are never stored
+def test_bind_drops_other_versions():
+    cache = PredictionCache()
+    cache.bind("v1")
+    cache.put(key(1), 0.1, "v1")
+    cache.bind("v2")
+    assert len(cache) == 0
+    cache.put(key(1), 0.1, "v1")
+    assert cache.get(key(1)) is None
+    cache.put(key(1), 0.2, "v2")
+    assert cache.get(key(1)) == 0.2
@@ -0,0 +1,54 @@
+import pandas as pd
+import pytest
+from data_processing import CSV_ENGINES, PERSON_COLUMNS, read_ahs_chunks, read_ahs_csv
+
+HEADER = "CONTROL,FILLER,AGE,PAP,MIL\n"
+
+
+def write_person_csv(path, rows):
+    path.write_text(HEADER + "".join(f"{line}\n" for line in rows))
+    return path
+
+
+def read_all(path, engine, streaming):
+    if streaming:
+        return pd.concat(read_ahs_chunks(path, PERSON_COLUMNS, chunk_size=2, engine=engine))
+    return read_ahs_csv(path, PERSON_COLUMNS, engine)
+
+
+def assert_engines_agree(path, streaming):
+    frames = [read_all(path, engine, streaming) for engine in CSV_ENGINES]
+    for frame in frames[1:]:
+        pd.testing.assert_frame_equal(frame, frames[0])
+    return frames[0]
+
+
+# 1) Quoted AHS codes parse to the dtype plan, identically with both engines, whole or in chunks
+@pytest.mark.parametrize("streaming", [False, True])
+def test_engines_agree_on_quoted_codes(tmp_path, streaming):
+    path = write_person_csv(tmp_path / "person.csv", [
+        "'11000001','x',34,1200,'1'",
+        "'11000001','x',-9,0,'2'",
+        "'11000002','y',71,'-6','-6'",
+        "'11000003','z',19,35000,'1'",
+        "'11000004','z',88,0,'2'",
+    ])
+    frame = assert_engines_agree(path, streaming)
+    assert list(frame.columns) == ["CONTROL", "AGE", "PAP", "MIL"]
+    assert [str(t) for t in frame.dtypes] == ["int64", "int8", "int32", "int8"]
+    assert frame["PAP"].tolist() == [1200, 0, -6, 35000, 0]
+
+
+# 2) Blanks are filled from the dtype plan, and a non-numeric value falls back to the C parser, with both engines
+@pytest.mark.parametrize("streaming", [False, True])
+def test_engines_agree_on_blanks_and_text(tmp_path, streaming):
+    path = write_person_csv(tmp_path / "person.csv", [
+        "'11000001','x',34,,'1'",
+        "'11000002','x',,500,'2'",
+        "'11000003','y',52,600,'1'",
+        "'11000004','y',40,n/a,'1'",
+        "'11000005','z',23,700,'2'",
+    ])
+    frame = assert_engines_agree(path, streaming)
+    assert frame["AGE"].tolist() == [34, -1, 52, 40, 23]
+    assert frame["PAP"].tolist() == [0, 500, 600, 0, 700]
@@ -0,0 +1,37 @@
+import numpy as np
+from features import FEATURE_MAP, FEATURE_ORDER, FeatureEncoder, constant, negated, passthrough
+import predictor_script
+
+INCOME_ONLY = {"HINCP": passthrough("income"), "KIDS": constant(0), "NO_KIDS": constant(1), "NOT_VET": negated("veteran")}
+
+
+# 1) Constant columns read no raw field, so they hold their value whatever the row contains
+def test_constants_ignore_raw_fields():
+    encoder = FeatureEncoder(INCOME_ONLY)
+    assert encoder.raw_fields == ("income", "veteran")
+    row = encoder.encode(float("nan"), 32000, float("nan"), True, False, float("inf"))
+    assert row.tolist() == [[32000, 0, 1, 0]]
+    batch = encoder.encode_batch([(float("nan"), 1000, 1, False, False, False), (30, 2000, 2, True, True, True)])
+    assert batch.tolist() == [[1000, 0, 1, 1], [2000, 0, 1, 0]]
+
+
+# 2) Column-wise encoding needs only the fields the model reads
+def test_encode_columns_without_unread_fields():
+    encoder = FeatureEncoder(INCOME_ONLY)
+    income = np.array([1000, 2000], dtype=np.float32)
+    veteran = np.array([1, 0], dtype=np.float32)
+    X = encoder.encode_columns(["veteran", "income"], [veteran, income])
+    assert X.tolist() == [[1000, 0, 1, 0], [2000, 0, 1, 1]]
+
+
+# 3) The legacy CLI map keeps its seven constant columns fixed, and the service map has none
+def test_legacy_map_constants():
+    legacy = FeatureEncoder(predictor_script.FEATURE_MAP, predictor_script.FEATURE_ORDER)
+    X = legacy.encode(35, 32000, 3, True, False, False)
+    values = dict(zip(predictor_script.FEATURE_ORDER, X[0].tolist()))
+    assert values["disabled_person_in_household_no"] == 1 and values["HHADLTKIDS"] == 0
+    assert values["military_1person_veteran"] == 1 and values["military_no_service"] == 0
+    assert values["government_assistance"] == 0 and values["no_government_assistance"] == 1
+    service = FeatureEncoder(FEATURE_MAP, FEATURE_ORDER)
+    assert service.raw_fields == ("age", "income", "num_people", "veteran", "benefits", "disabled")
+    assert service.encode(35, 32000, 3, True, False, False).tolist() == [[32000, 35, 3, 0, 1, 0]]
@@ -0,0 +1,45 @@
+import os
+import numpy as np
+from features import FEATURE_MAP, FEATURE_ORDER, FeatureEncoder
+from lookup_table import ProbabilityTable
+
+
+class IncomeModel:
+    """Predictor stand-in whose probability falls with income and rises with household size."""
+
+    def __init__(self, encoder):
+        self.income = encoder.feature_names.index("HINCP")
+        self.people = encoder.feature_names.index("NUMPEOPLE")
+
+    def predict_proba(self, X):
+        return (1.0 / (1.0 + X[:, self.income] / (5000.0 * X[:, self.people]))).astype(np.float32)
+
+
+def small_table():
+    encoder = FeatureEncoder(FEATURE_MAP, FEATURE_ORDER)
+    table = ProbabilityTable.build(
+        IncomeModel(encoder), encoder, age_range=(18, 30), people_range=(1, 4),
+        income_max=20000, income_step=5000, interpolation="previous",
+    )
+    table.metadata["model_version"] = "abc123"
+    return table, encoder
+
+
+# 1) save writes exactly the path it is given (no ".npz" appended) and load reads back the same table
+def test_save_load_round_trip(tmp_path):
+    table, encoder = small_table()
+    for name in ("risk_table", "risk_table.npz"):
+        path = tmp_path / name
+        table.save(str(path))
+        assert os.listdir(tmp_path).count(name) == 1
+
+        loaded = ProbabilityTable.load(str(path))
+        np.testing.assert_array_equal(loaded.table, table.table)
+        np.testing.assert_array_equal(loaded.income_nodes, table.income_nodes)
+        assert loaded.feature_names == table.feature_names
+        assert loaded.interpolation == "previous"
+        assert loaded.metadata["model_version"] == "abc123"
+
+        X = encoder.encode_batch([(20, 7500.0, 2, False, True, False), (29, 15000.0, 4, True, False, True)])
+        np.testing.assert_array_equal(loaded.predict_proba(X), table.predict_proba(X))
+    assert sorted(os.listdir(tmp_path)) == ["risk_table", "risk_table.npz"]
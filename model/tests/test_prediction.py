@@ -1,10 +1,17 @@
 import os
+import json
+import struct
+import time
 import pytest
 import requests
 
 # Base URL of the running Flask service
 BASE_URL = os.getenv("API_URL", "http://127.0.0.1:5000")
 ENDPOINT = f"{BASE_URL}/predict"
+BATCH_ENDPOINT = f"{BASE_URL}/predict/batch"
+HEALTH_ENDPOINT = f"{BASE_URL}/healthz"
+READY_ENDPOINT = f"{BASE_URL}/readyz"
+BINARY_ENDPOINT = f"{BASE_URL}/predict/binary"
 
 def assert_valid_response(resp, threshold=0.4):
     """Assert the response is valid with the fixed threshold of 0.4."""
@@ -132,4 +139,96 @@ def test_issue_55_prediction():
     assert_valid_response(resp, threshold=0.4)
     data = resp.json()
     assert data["prediction"] == 0, f"Expected 'Not at risk' for prob={data['probability']}"
-    assert data["label"] == "Not at risk"
\ No newline at end of file
+    assert data["label"] == "Not at risk"
+
+# 9) Batch endpoint scores every valid applicant and reports per-item errors
+def test_batch_mixed_validity():
+    applicants = [
+        {"age": 35, "income": 32000, "num_people": 3, "veteran": False, "benefits": False},
+        {"age": 30, "income": 10000},  # Missing num_people, veteran, benefits
+        {"age": 40, "income": 30000, "num_people": 3, "veteran": "yes", "benefits": False},
+        {"age": 50, "income": 20000, "num_people": 3, "veteran": False, "benefits": True, "disabled": True},
+    ]
+    resp = requests.post(BATCH_ENDPOINT, json={"applicants": applicants})
+    assert resp.status_code == 200, f"{resp.status_code} / {resp.text}"
+    data = resp.json()
+    assert data["count"] == 4
+    assert data["errors"] == 2
+    results = data["results"]
+    assert [r["index"] for r in results] == [0, 1, 2, 3]
+    assert "Missing fields" in results[1]["error"]
+    assert results[2]["error"] == "Invalid input types for veteran or benefits"
+    for i in (0, 3):
+        assert results[i]["prediction"] in (0, 1)
+        assert results[i]["label"] == ("At risk" if results[i]["prediction"] else "Not at risk")
+
+# 10) Batch results match single-applicant predictions
+def test_batch_matches_single():
+    applicants = [
+        {"age": 35, "income": 32000, "num_people": 3, "veteran": False, "benefits": False},
+        {"age": 40, "income": 30000, "num_people": 3, "veteran": True, "benefits": False, "disabled": True},
+    ]
+    resp = requests.post(BATCH_ENDPOINT, json={"applicants": applicants})
+    assert resp.status_code == 200, f"{resp.status_code} / {resp.text}"
+    for applicant, result in zip(applicants, resp.json()["results"]):
+        single = requests.post(ENDPOINT, json=applicant).json()
+        assert result["probability"] == single["probability"]
+        assert result["prediction"] == single["prediction"]
+
+# 11) Batch endpoint requires an applicants list
+@pytest.mark.parametrize("payload", [{}, {"applicants": {"age": 30}}, [1, 2]])
+def test_batch_requires_list(payload):
+    resp = requests.post(BATCH_ENDPOINT, json=payload)
+    assert resp.status_code == 400
+
+# 12) Every response reports the model version that served it
+def test_model_version_header():
+    payload = {"age": 35, "income": 32000, "num_people": 3, "veteran": False, "benefits": False}
+    versions = {
+        requests.post(ENDPOINT, json=payload).headers.get("X-Model-Version"),
+        requests.post(ENDPOINT, json={}).headers.get("X-Model-Version"),
+        requests.post(BATCH_ENDPOINT, json={"applicants": [payload]}).headers.get("X-Model-Version"),
+    }
+    assert len(versions) == 1 and None not in versions, f"Inconsistent model versions: {versions}"
+
+# 13) Liveness and readiness probes (the service is warmed up once it accepts test traffic)
+def test_health_and_readiness():
+    resp = requests.get(HEALTH_ENDPOINT)
+    assert resp.status_code == 200
+    assert resp.json()["status"] == "ok"
+    resp = requests.get(READY_ENDPOINT)
+    assert resp.status_code == 200, f"{resp.status_code} / {resp.text}"
+    assert resp.json()["status"] == "ready"
+
+# 14) Binary batch protocol returns the same probabilities as the JSON batch endpoint
+def test_binary_matches_json_batch():
+    applicants = [
+        {"age": 35, "income": 32000, "num_people": 3, "veteran": False, "benefits": False, "disabled": False},
+        {"age": 40, "income": 30000, "num_people": 3, "veteran": True, "benefits": False, "disabled": True},
+        {"age": 67, "income": 85000, "num_people": 2, "veteran": True, "benefits": True, "disabled": False},
+    ]
+    names = ["income", "age", "num_people", "veteran", "benefits", "disabled"]
+    schema = json.dumps(names).encode()
+    schema += b" " * (-(16 + len(schema)) % 4)
+    values = [float(a[name]) for name in names for a in applicants]
+    body = struct.pack("<4sBBHII", b"RSKC", 1, 1, 0, len(applicants), len(schema)) + schema + struct.pack(f"<{len(values)}f", *values)
+
+    resp = requests.post(BINARY_ENDPOINT, data=body, headers={"Content-Type": "application/x-risk-columns"})
+    assert resp.status_code == 200, f"{resp.status_code} / {resp.text}"
+    probs = struct.unpack(f"<{len(applicants)}f", resp.content)
+    expected = requests.post(BATCH_ENDPOINT, json={"applicants": applicants}).json()["results"]
+    for prob, result in zip(probs, expected):
+        assert round(prob, 4) == pytest.approx(result["probability"], abs=1e-4)
+
+    resp = requests.post(BINARY_ENDPOINT, data=body[:-4], headers={"Content-Type": "application/x-risk-columns"})
+    assert resp.status_code == 400
+
+# 15) Requests whose deadline has already passed are dropped; a future deadline is served normally
+def test_request_deadline():
+    payload = {"age": 35, "income": 32000, "num_people": 3, "veteran": False, "benefits": False}
+    now_ms = int(time.time() * 1000)
+    resp = requests.post(ENDPOINT, json=payload, headers={"X-Request-Deadline": str(now_ms - 1000)})
+    assert resp.status_code == 504, f"{resp.status_code} / {resp.text}"
+    assert resp.json()["error"] == "Request deadline exceeded"
+    resp = requests.post(ENDPOINT, json=payload, headers={"X-Request-Deadline": str(now_ms + 60000)})
+    assert_valid_response(resp)
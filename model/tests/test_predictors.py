@@ -0,0 +1,22 @@
+import os
+import subprocess
+import sys
+import pytest
+from predictors import INFERENCE_MODES, build_predictor
+
+APP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app")
+
+
+# 1) build_predictor refuses a mode it doesn't know instead of quietly using the Pipeline
+def test_build_predictor_rejects_unknown_mode():
+    with pytest.raises(ValueError, match="'fasst'"):
+        build_predictor(None, "fasst")
+
+
+# 2) The service refuses to start with a mistyped RISK_INFERENCE_MODE, before loading any model
+def test_service_rejects_unknown_mode():
+    env = dict(os.environ, RISK_INFERENCE_MODE="fasst", XGBOOST_MODEL_PATH="/nonexistent.pkl")
+    result = subprocess.run([sys.executable, "-c", "import main"], cwd=APP_DIR, env=env,
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode != 0
+    assert f"Unknown RISK_INFERENCE_MODE 'fasst'; expected one of {', '.join(INFERENCE_MODES)}" in result.stderr
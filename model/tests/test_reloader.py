@@ -0,0 +1,125 @@
+import multiprocessing
+import os
+import time
+import pytest
+from reloader import ModelReloader
+
+
+class Candidate:
+    def __init__(self, version):
+        self.version = version
+
+
+def make_reloader(path, served):
+    """A reloader whose 'model' is the artifact's text, recorded in served['version']."""
+
+    def load(p):
+        with open(p) as f:
+            return Candidate(f.read())
+
+    def swap(candidate):
+        served["version"] = candidate.version
+
+    return ModelReloader(str(path), load, lambda candidate: None, swap, lambda: served["version"])
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def child(reloader, served, conn):
+    # A worker forked before the reload request: it only learns about it by polling
+    conn.recv()
+    reloader.poll_requests()
+    wait_for(lambda: served["version"] != "v1")
+    conn.send(served["version"])
+
+
+# 1) A reload requested in one process is picked up by every process forked from the same reloader
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_reload_request_reaches_forked_workers(tmp_path):
+    path = tmp_path / "model.txt"
+    path.write_text("v1")
+    served = {"version": "v1"}
+    reloader = make_reloader(path, served)
+
+    parent_conn, child_conn = multiprocessing.get_context("fork").Pipe()
+    worker = multiprocessing.get_context("fork").Process(target=child, args=(reloader, served, child_conn))
+    worker.start()
+    try:
+        path.write_text("v2")
+        result = reloader.request_reload(wait=True)
+        assert result["status"] == "swapped" and served["version"] == "v2"
+        parent_conn.send("go")
+        assert parent_conn.poll(10)
+        assert parent_conn.recv() == "v2"
+    finally:
+        worker.join(10)
+    assert worker.exitcode == 0
+
+
+# 2) The process that made the request doesn't reload a second time when it polls
+def test_requesting_process_reloads_once(tmp_path):
+    path = tmp_path / "model.txt"
+    path.write_text("v1")
+    served = {"version": "v0"}
+    reloader = make_reloader(path, served)
+    loads = []
+    load = reloader.load_fn
+    reloader.load_fn = lambda p: loads.append(p) or load(p)
+
+    reloader.request_reload(force=True, wait=True)
+    reloader.poll_requests()
+    time.sleep(0.05)
+    assert served["version"] == "v1"
+    assert len(loads) == 1
+
+
+# 3) A golden check that breaks (here: the golden file is missing) fails the reload and keeps the model
+def test_broken_golden_check_fails_reload(tmp_path):
+    path = tmp_path / "model.txt"
+    path.write_text("v2")
+    served = {"version": "v1"}
+    reloader = make_reloader(path, served)
+    outcomes = []
+
+    def check(candidate):
+        with open(tmp_path / "missing-golden.json") as f:
+            f.read()
+
+    reloader.check_fn = check
+    reloader.reloads = type("Counter", (), {"inc": lambda self, outcome: outcomes.append(outcome)})()
+    result = reloader.request_reload(wait=True)
+    assert result["status"] == "failed" and result["candidate"] == "v2"
+    assert "FileNotFoundError" in result["error"]
+    assert served["version"] == "v1"
+    assert reloader.last_result is result and outcomes == ["failed"]
+
+
+# 4) The file watch outlives a reload that raises, and picks up the next artifact
+def test_watch_survives_failed_reload(tmp_path):
+    path = tmp_path / "model.txt"
+    path.write_text("v1")
+    served = {"version": "v1"}
+    reloader = make_reloader(path, served)
+    reloader.interval = 0.01
+    swap = reloader.swap_fn
+
+    def swap_once_broken(candidate):
+        if candidate.version == "v2":
+            raise RuntimeError("swap exploded")
+        swap(candidate)
+
+    reloader.swap_fn = swap_once_broken
+    reloader.ensure_watching()
+    time.sleep(0.05)
+    path.write_text("v2")
+    time.sleep(0.1)
+    assert served["version"] == "v1"
+    path.write_text("v3")
+    assert wait_for(lambda: served["version"] == "v3")
@@ -0,0 +1,52 @@
+import csv
+import numpy as np
+import xgboost as xgb
+from features import DEFAULT_THRESHOLD, FEATURE_MAP, FEATURE_ORDER, FeatureEncoder
+from predictors import FastPredictor
+from rescore import rescore
+
+
+def write_bundle(path):
+    """Train a small booster on the raw features (no scaling) and save it as a model bundle."""
+    rng = np.random.default_rng(0)
+    X = np.column_stack([
+        rng.uniform(0, 100000, 2000), rng.integers(18, 90, 2000), rng.integers(1, 8, 2000),
+        rng.integers(0, 2, (2000, 3)),
+    ]).astype(np.float32)
+    y = (X[:, 0] / X[:, 2] + rng.normal(0, 8000, 2000) < 12000).astype(int)
+    booster = xgb.train({"objective": "binary:logistic", "max_depth": 3}, xgb.DMatrix(X, y), num_boost_round=20)
+    n = len(FEATURE_ORDER)
+    predictor = FastPredictor(booster, np.arange(n), np.zeros(n), np.ones(n), feature_names=FEATURE_ORDER)
+    predictor.save(str(path))
+    return predictor
+
+
+# 1) Rescoring with the model that produced the stored labels reports no changes at the default threshold
+def test_unchanged_model_gives_empty_delta(tmp_path):
+    predictor = write_bundle(tmp_path / "model.bundle.npz")
+    encoder = FeatureEncoder(FEATURE_MAP, FEATURE_ORDER)
+    rng = np.random.default_rng(1)
+    applicants = [
+        (int(rng.integers(18, 90)), float(rng.integers(0, 60000)), int(rng.integers(1, 8)),
+         bool(rng.integers(0, 2)), bool(rng.integers(0, 2)), bool(rng.integers(0, 2)))
+        for _ in range(500)
+    ]
+    probs = predictor.predict_proba(encoder.encode_batch(applicants))
+    # The stored labels are what the service returned; make sure some sit between 0.4 and 0.5
+    assert np.any((probs >= DEFAULT_THRESHOLD) & (probs < 0.5))
+
+    export = tmp_path / "risk.csv"
+    with open(export, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["applicationId", "age", "income", "numPeople", "veteran", "benefits", "disabled",
+                         "riskProbability", "riskPrediction"])
+        for i, (applicant, prob) in enumerate(zip(applicants, probs)):
+            stored = "t" if prob >= DEFAULT_THRESHOLD else "f"
+            writer.writerow([f"app-{i}", *applicant, round(float(prob), 4), stored])
+
+    delta = tmp_path / "delta.csv"
+    totals = rescore(str(export), str(delta), str(tmp_path / "model.bundle.npz"), workers=1, partition_size=200)
+    assert totals["rows"] == 500 and totals["errors"] == 0
+    assert totals["changed"] == 0
+    with open(delta, newline="") as f:
+        assert list(csv.reader(f)) == [["application_id", "old_probability", "new_probability", "old_prediction", "new_prediction"]]
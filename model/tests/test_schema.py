@@ -0,0 +1,104 @@
+import json
+import pytest
+import schema
+
+TYPE_ERROR = "Invalid input types for age, income, or num_people"
+BOOL_ERROR = "Invalid input types for veteran or benefits"
+
+# Same declaration as APPLICANT_SCHEMA in app/main.py
+APPLICANT = schema.Request(
+    [
+        schema.Field("age", "int", error=TYPE_ERROR),
+        schema.Field("income", "float", error=TYPE_ERROR),
+        schema.Field("num_people", "int", error=TYPE_ERROR),
+        schema.Field("veteran", "bool", error=BOOL_ERROR),
+        schema.Field("benefits", "bool", error=BOOL_ERROR),
+        schema.Field("disabled", "flag", required=False, default=False),
+    ],
+    missing_error="Missing fields: {missing}",
+    not_object_error="Applicant must be a JSON object",
+)
+VALID = {"age": 30, "income": 10000, "num_people": 3, "veteran": False, "benefits": True}
+
+
+def jsonify_body(obj):
+    """The body Flask's jsonify writes (without its trailing newline)."""
+    return json.dumps(obj, separators=(",", ":"), sort_keys=True)
+
+
+# 1) A valid body becomes a tuple in field order, with casts applied and the optional field defaulted
+def test_valid_values():
+    assert APPLICANT.validate(VALID) == ((30, 10000.0, 3, False, True, False), None)
+    values, error = APPLICANT.validate(dict(VALID, age="41", num_people=2.7, disabled=1))
+    assert error is None
+    assert values == (41, 10000.0, 2, False, True, True)
+    assert type(values[1]) is float
+
+
+# 2) Missing required fields are listed in declaration order; a non-object body gets its own message
+@pytest.mark.parametrize("data,expected", [
+    ({}, "Missing fields: ['age', 'income', 'num_people', 'veteran', 'benefits']"),
+    ({"age": 30, "income": 10000}, "Missing fields: ['num_people', 'veteran', 'benefits']"),
+    ({"age": 30, "num_people": 3, "veteran": False, "benefits": False, "disabled": True}, "Missing fields: ['income']"),
+    ([1, 2], "Applicant must be a JSON object"),
+    (None, "Applicant must be a JSON object"),
+])
+def test_missing_fields(data, expected):
+    assert APPLICANT.validate(data) == (None, expected)
+
+
+# 3) Values that can't be converted return the field's error; booleans must be JSON booleans
+@pytest.mark.parametrize("override,expected", [
+    ({"age": "thirty"}, TYPE_ERROR),
+    ({"income": None}, TYPE_ERROR),
+    ({"num_people": [3]}, TYPE_ERROR),
+    ({"veteran": "False"}, BOOL_ERROR),
+    ({"benefits": 1}, BOOL_ERROR),
+])
+def test_type_errors(override, expected):
+    assert APPLICANT.validate(dict(VALID, **override)) == (None, expected)
+
+
+# 4) Extra fields are ignored
+def test_extra_fields_ignored():
+    assert APPLICANT.validate(dict(VALID, foo="bar", baz=123)) == APPLICANT.validate(VALID)
+
+
+# 5) A field declared without an error lets the conversion error propagate; unknown kinds are refused
+def test_field_without_error_propagates():
+    search = schema.Request([schema.Field("query", "str", error="query must be a string"),
+                             schema.Field("top_n", "int", required=False, default=3)],
+                            missing_error="Missing query parameter")
+    assert search.decode('{"query": "rent"}') == (("rent", 3), None)
+    assert search.validate({}) == (None, "Missing query parameter")
+    assert search.validate("rent") == (None, "Missing query parameter")
+    for query in (42, ["rent"], {"q": "rent"}, None, True):
+        assert search.validate({"query": query}) == (None, "query must be a string")
+    with pytest.raises(ValueError):
+        search.validate({"query": "rent", "top_n": "many"})
+    with pytest.raises(ValueError):
+        schema.Request([schema.Field("x", "decimal")], missing_error="Missing x")
+
+
+# 6) Response objects are written exactly as jsonify writes them, nested lists included
+def test_dumps_matches_jsonify():
+    result = schema.Object([schema.Field("prediction", "int"), schema.Field("probability", "float"), schema.Field("label", "str")])
+    obj = {"prediction": 1, "probability": 0.4372, "label": "At risk"}
+    assert result.dumps(obj) == jsonify_body(obj)
+
+    response = schema.Object([
+        schema.Field("query", "str"),
+        schema.Field("results", schema.ListOf(schema.Object([
+            schema.Field("provider", "str"), schema.Field("similarity_score", "float"), schema.Field("open", "bool"),
+        ]))),
+        schema.Field("extra", "any"),
+    ])
+    obj = {
+        "query": "café \"shelter\"\n",
+        "results": [{"provider": "Ünited Way", "similarity_score": 0.5, "open": True},
+                    {"provider": "A", "similarity_score": float("nan"), "open": False}],
+        "extra": {"b": [1, 2], "a": None},
+    }
+    assert response.dumps(obj) == jsonify_body(obj)
+    assert response.dumps(dict(obj, results=[])) == jsonify_body(dict(obj, results=[]))
+    assert schema.Object([]).dumps({}) == "{}"
@@ -0,0 +1,93 @@
+import json
+import multiprocessing
+import os
+import socket
+import time
+import numpy as np
+import pytest
+from features import FEATURE_MAP, FEATURE_ORDER, FeatureEncoder
+from scoring_daemon import ScoringDaemon, request
+
+APPLICANT = {"age": 35, "income": 32000, "num_people": 3, "veteran": False, "benefits": False}
+
+
+def load_scorer():
+    """Stand-in scorer: the probability is the encoded income divided by 100000."""
+    encoder = FeatureEncoder(FEATURE_MAP, FEATURE_ORDER)
+    return encoder, lambda X: X[:, FEATURE_ORDER.index("HINCP")] / 100000.0
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    if not hasattr(os, "fork"):
+        pytest.skip("needs fork")
+    artifact = tmp_path / "model.bundle.npz"
+    artifact.write_bytes(b"model")
+    socket_path = str(tmp_path / "d.sock")
+    scorer = ScoringDaemon(socket_path, [str(artifact)], load_scorer)
+    # serve_forever installs a SIGTERM handler, so it runs in its own (forked) process
+    process = multiprocessing.get_context("fork").Process(target=scorer.serve_forever)
+    process.start()
+    deadline = time.monotonic() + 10
+    while not os.path.exists(socket_path) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    yield socket_path, scorer.artifacts
+    process.terminate()
+    process.join(10)
+
+
+# 1) One JSON line in, one JSON line out, with per-applicant probabilities and errors in request order
+def test_request_response(daemon):
+    socket_path, artifacts = daemon
+    response = request(socket_path, {"artifacts": artifacts, "applicants": [APPLICANT, {"age": 30}, dict(APPLICANT, income=50000)]})
+    assert response["probabilities"][0] == pytest.approx(0.32)
+    assert response["probabilities"][1] is None
+    assert response["probabilities"][2] == pytest.approx(0.5)
+    assert response["errors"][0] is None and response["errors"][2] is None
+    assert response["errors"][1] == "Missing or invalid income"
+
+
+# 2) A connection may carry several requests; a malformed line gets an error line and the connection stays usable
+def test_several_requests_per_connection(daemon):
+    socket_path, artifacts = daemon
+    good = json.dumps({"artifacts": artifacts, "applicants": [APPLICANT]}).encode() + b"\n"
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(10)
+        sock.connect(socket_path)
+        sock.sendall(good + b"{not json\n" + good)
+        with sock.makefile("rb") as f:
+            responses = [json.loads(f.readline()) for _ in range(3)]
+    assert responses[0] == responses[2]
+    assert responses[0]["probabilities"] == [pytest.approx(0.32)]
+    assert set(responses[1]) == {"error"}
+
+
+# 3) A daemon serving other artifacts refuses the request instead of scoring with the wrong model
+def test_other_artifacts_refused(daemon):
+    socket_path, _ = daemon
+    response = request(socket_path, {"artifacts": ["/elsewhere/model.pkl"], "applicants": [APPLICANT]})
+    assert "probabilities" not in response
+    assert response["error"].startswith("Daemon serves")
+
+
+# 4) No daemon listening: request returns None so the caller scores in-process
+def test_no_daemon(tmp_path):
+    assert request(str(tmp_path / "missing.sock"), {"artifacts": [], "applicants": []}) is None
+
+
+# 5) handle() reloads the scorer when an artifact is replaced on disk
+def test_reload_on_artifact_change(tmp_path):
+    artifact = tmp_path / "model.bundle.npz"
+    artifact.write_bytes(b"v1")
+    loads = []
+
+    def load():
+        loads.append(1)
+        encoder, _ = load_scorer()
+        return encoder, lambda X: np.full(len(X), float(len(loads)))
+
+    scorer = ScoringDaemon(str(tmp_path / "d.sock"), [str(artifact)], load)
+    payload = {"artifacts": scorer.artifacts, "applicants": [APPLICANT]}
+    assert scorer.handle(payload)["probabilities"] == [1.0]
+    artifact.write_bytes(b"v2, a different size")
+    assert scorer.handle(payload)["probabilities"] == [2.0]
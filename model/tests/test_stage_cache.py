@@ -0,0 +1,121 @@
+import os
+import pytest
+from stage_cache import Stage, StageCache, run_stages
+
+
+def write(target, text):
+    # Outputs are hard-linked into the cache, so stages replace them rather than write in place
+    tmp_path = target.with_name(target.name + ".tmp")
+    tmp_path.write_text(text)
+    os.replace(tmp_path, target)
+
+
+def shout(source, target):
+    write(target, source.read_text().upper())
+
+
+def whisper(source, target):
+    write(target, source.read_text().lower())
+
+
+def count(source, target):
+    write(target, str(len(source.read_text())))
+
+
+def make_stages(tmp_path, calls, transform=shout):
+    """Two chained stages: "transform" rewrites in.txt to mid.txt, "count" writes its length to out.txt."""
+    src, mid, out = tmp_path / "in.txt", tmp_path / "mid.txt", tmp_path / "out.txt"
+
+    def run(fn, source, target):
+        def stage_run():
+            calls.append(fn.__name__)
+            fn(source, target)
+        return stage_run
+
+    return [
+        Stage("transform", run(transform, src, mid), inputs=[src], outputs=[mid], code=[transform]),
+        Stage("count", run(count, mid, out), inputs=[mid], outputs=[out], code=[count]),
+    ]
+
+
+def statuses(report):
+    return {name: status for name, status, _ in report}
+
+
+@pytest.fixture
+def workdir(tmp_path):
+    (tmp_path / "in.txt").write_text("hello")
+    return tmp_path
+
+
+# 1) A second run with nothing changed restores every stage from the cache without running it
+def test_unchanged_rerun_is_cached(workdir):
+    cache, calls = StageCache(workdir / "cache"), []
+    assert statuses(run_stages(make_stages(workdir, calls), cache)) == {"transform": "ran", "count": "ran"}
+    (workdir / "mid.txt").unlink()
+    (workdir / "out.txt").unlink()
+
+    calls.clear()
+    assert statuses(run_stages(make_stages(workdir, calls), StageCache(workdir / "cache"))) == {"transform": "cached", "count": "cached"}
+    assert calls == []
+    assert (workdir / "mid.txt").read_text() == "HELLO"
+    assert (workdir / "out.txt").read_text() == "5"
+
+
+# 2) Changing an input's content reruns the stage that reads it, and the one after only if its input changed
+def test_input_change_invalidates(workdir):
+    cache, calls = StageCache(workdir / "cache"), []
+    run_stages(make_stages(workdir, calls), cache)
+
+    (workdir / "in.txt").write_text("HeLLo")  # same transform output, so count stays cached
+    assert statuses(run_stages(make_stages(workdir, calls), cache)) == {"transform": "ran", "count": "cached"}
+
+    (workdir / "in.txt").write_text("hello, world")
+    calls.clear()
+    assert statuses(run_stages(make_stages(workdir, calls), cache)) == {"transform": "ran", "count": "ran"}
+    assert calls == ["shout", "count"]
+    assert (workdir / "out.txt").read_text() == "12"
+
+
+# 3) Changing a stage's code changes its key, and switching back restores the earlier entry
+def test_code_change_invalidates(workdir):
+    cache, calls = StageCache(workdir / "cache"), []
+    run_stages(make_stages(workdir, calls), cache)
+
+    report = run_stages(make_stages(workdir, calls, transform=whisper), cache)
+    assert statuses(report)["transform"] == "ran"
+    assert (workdir / "mid.txt").read_text() == "hello"
+
+    calls.clear()
+    report = run_stages(make_stages(workdir, calls), cache)
+    assert statuses(report)["transform"] == "cached"
+    assert (workdir / "mid.txt").read_text() == "HELLO"
+
+
+# 4) A stage named in force runs even when it is cached
+def test_force_reruns_stage(workdir):
+    cache, calls = StageCache(workdir / "cache"), []
+    run_stages(make_stages(workdir, calls), cache)
+
+    calls.clear()
+    report = run_stages(make_stages(workdir, calls), cache, force={"count"})
+    assert statuses(report) == {"transform": "cached", "count": "ran"}
+    assert calls == ["count"]
+
+
+# 5) invalidate drops a stage's entries, so its next run can't be restored
+def test_invalidate(workdir):
+    cache, calls = StageCache(workdir / "cache"), []
+    run_stages(make_stages(workdir, calls), cache)
+
+    assert cache.invalidate("transform") == 1
+    assert cache.invalidate("transform") == 0
+    assert statuses(run_stages(make_stages(workdir, calls), cache)) == {"transform": "ran", "count": "cached"}
+
+
+# 6) Without a cache every stage runs, every time
+def test_no_cache_runs_everything(workdir):
+    calls = []
+    run_stages(make_stages(workdir, calls), None)
+    run_stages(make_stages(workdir, calls), None)
+    assert calls == ["shout", "count", "shout", "count"]